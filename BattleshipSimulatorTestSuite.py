@@ -1,6 +1,7 @@
 import unittest
 import battleship_simulator
 import sys
+import io
 
 
 class TestBattleshipSimulator(unittest.TestCase):
@@ -25,6 +26,21 @@ class TestBattleshipSimulator(unittest.TestCase):
         """
         battleship_simulator.__main__()
 
+    def test_batch(self):
+        """
+        Tests the batch mode. The scripted game is played as a batch line, and broken lines
+        are reported without stopping the batch.
+        :return: None
+        """
+        line = battleship_simulator.to_batch_line(sys.stdin.read())
+        assert battleship_simulator.play_batch_line(line) is True
+        out = io.StringIO()
+        batch = [line, "", "# comment", line + " 1,1", " ".join(line.split()[:-3])]
+        assert battleship_simulator.run_batch(batch, out) == (3, 1, 2)
+        results = out.getvalue().split("\n")
+        assert results[0] == "1 won"
+        assert results[1].startswith("2 error") and results[2].startswith("3 error")
+
     def tearDown(self):
         """
         Close the input file and restore the stdin to the system's stdin.
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import time
+import tracemalloc
+from random import Random
+from Networking.GameServer import GameServer, GameSession
+from Networking import WireProtocol
+
+
+def measure_sessions(num_sessions: int) -> dict:
+    """
+    Utility function to measure the state of idle matches on their own: sessions with both
+    players joined and both fleets placed, and the idle sweep over all of them.
+    :param num_sessions: Number of sessions.
+    :return: Dictionary of the bytes per session and the sweep time per session in nanoseconds.
+    """
+    rng = Random(0)
+    tracemalloc.start()
+    sessions = {}
+    for session_id in range(num_sessions):
+        session = GameSession(session_id, 2 * session_id, rng=rng)
+        session.join(2 * session_id + 1)
+        sessions[session_id] = session
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    server = GameServer(idle_timeout=3600.0)
+    server.sessions = sessions
+    start = time.perf_counter()
+    server.sweep()  # Nothing is idle for long enough, so this is the cost of looking
+    sweep = time.perf_counter() - start
+    return {"bytes": used / num_sessions, "sweep_ns": sweep / num_sessions * 1e9}
+
+
+async def measure_connections(num_sessions: int, idle: float) -> dict:
+    """
+    Utility function to measure idle matches on a GameServer, with their players connected
+    over localhost from the same process.
+    :param num_sessions: Number of sessions, every one of them takes 4 file descriptors here.
+    :param idle: Seconds to stay idle while measuring the CPU time.
+    :return: Dictionary of the bytes per session, both ends included, and the CPU per idle
+             session in microseconds per second.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    server = GameServer("127.0.0.1", idle_timeout=3600.0, seed=0)
+    addr = await server.start()
+    players = []
+    for _ in range(2 * num_sessions):
+        reader, writer = await asyncio.open_connection(*addr)
+        writer.write(WireProtocol.frame(WireProtocol.encode_hello()))
+        players.append((reader, writer))
+    while server.games < num_sessions:
+        await asyncio.sleep(0.01)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    await asyncio.sleep(0.5)  # Let the hellos back and acknowledgements settle
+    start = time.process_time()
+    await asyncio.sleep(idle)
+    cpu = time.process_time() - start
+    for _, writer in players:
+        writer.close()
+    await server.close()
+    return {"bytes": used / num_sessions, "cpu_us_per_s": cpu / idle / num_sessions * 1e6}
+
+
+def __main__():
+    """
+    Benchmarks the memory and CPU of idle matches on the GameServer.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Footprint of idle matches on the GameServer.")
+    parser.add_argument("--sessions", type=int, default=10000, help="Number of idle sessions of state.")
+    parser.add_argument("--connected", type=int, default=2000,
+                        help="Number of idle sessions with connected players, limited by open files.")
+    parser.add_argument("--idle", type=float, default=5.0, help="Seconds idle while measuring CPU.")
+    args = parser.parse_args()
+
+    sessions = measure_sessions(args.sessions)
+    print("{} sessions:  {:>8.0f} bytes/session, sweep {:>6.0f} ns/session".format(
+        args.sessions, sessions["bytes"], sessions["sweep_ns"]))
+    connected = asyncio.run(measure_connections(args.connected, args.idle))
+    print("{} connected: {:>8.0f} bytes/session (both ends), {:>6.2f} us CPU/s/session idle".format(
+        args.connected, connected["bytes"], connected["cpu_us_per_s"]))
+    print("extrapolated to {} connected sessions: {:.1f} MB".format(
+        args.sessions, connected["bytes"] * args.sessions / 2 ** 20))
+
+
+if __name__ == '__main__':
+    __main__()
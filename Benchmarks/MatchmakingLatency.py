@@ -0,0 +1,107 @@
+import argparse
+import time
+from random import Random
+from Networking.AsyncBattleshipNetwork import percentile
+from Networking.Matchmaker import Matchmaker
+
+
+def fill_queue(matchmaker: Matchmaker, depth: int, rng: Random) -> list:
+    """
+    Utility function to queue players of which no two can be paired: in 20 latency buckets,
+    rated further apart than the maximum tolerance within each.
+    :param matchmaker: The Matchmaker.
+    :param depth: Number of players to queue.
+    :param rng: Random generator.
+    :return: List of the queued entries.
+    """
+    spacing = 2 * matchmaker.max_tolerance + 1
+    for player in range(depth):
+        bucket = player % 20
+        matchmaker.enqueue(str(player), (bucket + rng.random()) * matchmaker.bucket_ms, player // 20 * spacing)
+    return list(matchmaker.entries.values())
+
+
+def linear_match(entries: list, rating: float, bucket: int, tolerance: float):
+    """
+    Utility function to find an opponent the way a lobby without indices would: by looking at
+    every queued player. The baseline of the benchmark.
+    :param entries: List of the queued entries.
+    :param rating: Rating of the new player.
+    :param bucket: Latency bucket of the new player.
+    :param tolerance: Largest rating difference accepted.
+    :return: The closest rated acceptable entry, or None.
+    """
+    best = None
+    for entry in entries:
+        if entry.bucket == bucket and abs(entry.rating - rating) <= tolerance and \
+                (best is None or abs(entry.rating - rating) < abs(best.rating - rating)):
+            best = entry
+    return best
+
+
+def measure(depth: int, arrivals: int, seed: int=0) -> dict:
+    """
+    Utility function to measure the latency of pairing an arriving player with a queue of a
+    given depth, for the Matchmaker and the linear scan. Every arrival is rated close to one of
+    the queued players, which is put back after being paired, so the depth stays the same.
+    :param depth: Number of players queued.
+    :param arrivals: Number of arriving players timed.
+    :param seed: Seed of the random generator.
+    :return: Dictionary of the p50 and p99 latencies in microseconds of both, and of a tick
+             widening the tolerance of 1% of the queue.
+    """
+    rng = Random(seed)
+    now = [0.0]
+    matchmaker = Matchmaker(widen_interval=1.0, clock=lambda: now[0])
+    entries = fill_queue(matchmaker, depth, rng)
+    indexed = []
+    scanned = []
+    for _ in range(arrivals):
+        target = rng.choice(entries)
+        latency = (target.bucket + rng.random()) * matchmaker.bucket_ms
+        rating = target.rating + rng.uniform(-50, 50)
+        start = time.perf_counter()
+        linear_match(entries, rating, target.bucket, matchmaker.rating_tolerance)
+        scanned.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        _, pair = matchmaker.enqueue("arrival", latency, rating)
+        indexed.append(time.perf_counter() - start)
+        assert pair is not None and pair[0].name == target.name
+        matchmaker.enqueue(target.name, latency, target.rating)  # Put back, paired with nobody
+    entries = list(matchmaker.entries.values())
+    rng.shuffle(entries)
+    matchmaker.widen_heap = sorted((1.0 if index < depth // 100 else 2.0, entry.ticket)
+                                   for index, entry in enumerate(entries))
+    now[0] = 1.0
+    start = time.perf_counter()
+    matchmaker.tick()
+    tick = time.perf_counter() - start
+    indexed.sort()
+    scanned.sort()
+    return {"p50_us": percentile(indexed, 0.5) * 1e6, "p99_us": percentile(indexed, 0.99) * 1e6,
+            "linear_p50_us": percentile(scanned, 0.5) * 1e6, "linear_p99_us": percentile(scanned, 0.99) * 1e6,
+            "tick_us": tick * 1e6}
+
+
+def __main__():
+    """
+    Benchmarks the latency of pairing players with thousands of them queued.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Latency of the Matchmaker pairing players.")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Numbers of players queued.")
+    parser.add_argument("--arrivals", type=int, default=200, help="Arriving players timed per depth.")
+    args = parser.parse_args()
+
+    print("{:>8} {:>10} {:>10} {:>14} {:>14} {:>12}".format("queued", "p50 us", "p99 us", "linear p50 us",
+                                                          "linear p99 us", "tick 1% us"))
+    for depth in args.depths:
+        result = measure(depth, args.arrivals)
+        print("{:>8} {:>10.2f} {:>10.2f} {:>14.1f} {:>14.1f} {:>12.0f}".format(
+            depth, result["p50_us"], result["p99_us"], result["linear_p50_us"], result["linear_p99_us"],
+            result["tick_us"]))
+
+
+if __name__ == '__main__':
+    __main__()
@@ -0,0 +1,335 @@
+import argparse
+import gc
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from random import Random
+import numpy as np
+from Model.BattleshipBoard import BattleshipBoard
+from Model.RefereeBoard import RefereeBoard
+from Simulation.SelfPlay import play_game
+
+
+# Baselines checked into the repo, next to this file
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+# Board sizes and fleet densities every board operation is measured at
+BOARD_SIZES = [(10, 10), (20, 20), (40, 40)]
+FLEET_DENSITIES = {"low": 0.5, "high": 1.0}
+# Default slowdown (current / baseline) above which a benchmark counts as a regression
+DEFAULT_THRESHOLD = 1.5
+# Name of the fixed workload timed next to every benchmark. Times are compared relative to it, so
+# that a baseline recorded on one machine can be checked on a faster, slower or busier one.
+CALIBRATION = "_calibration"
+
+
+def scaled_fleet(board_dims: tuple, density: float) -> dict:
+    """
+    Utility function to scale the standard fleet to a board size. A density of 1 gives one
+    standard fleet per 10x10 blocks, the same crowding as the standard game. The number of ships
+    of each length is scaled and rounded half up on its own, so that densities differ even on
+    the standard board, and at least one ship of each length is kept.
+    :param board_dims: Dimensions of the board.
+    :param density: Number of standard fleets per 100 blocks.
+    :return: Dictionary of ship lengths to number of ships of that length.
+    """
+    scale = board_dims[0] * board_dims[1] / 100 * density
+    return {ship_len: max(1, math.floor(freq * scale + 0.5)) for ship_len, freq in {4: 1, 3: 2, 2: 3, 1: 4}.items()}
+
+
+class BoardBenchmark:
+    """
+    Class to describe one benchmark of a board operation: how to set up a fresh board (not
+    timed) and the operation to run on it (timed). Every run performs `ops` operations, and
+    the time reported is per operation.
+    @author sahil1105
+    """
+    def __init__(self, name: str, setup, run):
+        """
+        Constructor for BoardBenchmark.
+        :param name: Name of the benchmark, used as the key of its baseline.
+        :param setup: Function returning (state, number of operations run performs on it).
+        :param run: Function taking the state and performing the operations.
+        """
+        self.name = name
+        self.setup = setup
+        self.run = run
+
+    def time_once(self) -> float:
+        """
+        Function to time one run on a fresh state. Like timeit, the garbage collector is off
+        while timing, so that its pauses depend on nothing run before.
+        :return: Time per operation of the run, in seconds.
+        """
+        state, ops = self.setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            self.run(state)
+            return (time.perf_counter() - start) / max(ops, 1)
+        finally:
+            gc.enable()
+
+    def time_per_op(self, min_time: float=0.2, min_runs: int=5, max_runs: int=50, reference=None) -> tuple:
+        """
+        Function to measure the best time per operation over repeated runs. A reference benchmark
+        runs in turn with this one, so that the best times of both come from the same moments
+        of a machine whose speed changes.
+        :param min_time: Keep repeating until this many seconds were spent in the operation.
+        :param min_runs: Minimum number of runs.
+        :param max_runs: Maximum number of runs, unless min_runs is larger.
+        :param reference: BoardBenchmark to time in turn with this one, or None.
+        :return: (best time per operation, best time per operation of the reference or None), in nanoseconds.
+        """
+        best = float("inf")
+        reference_best = float("inf")
+        spent = 0.0
+        runs = 0
+        while runs < min_runs or (spent < min_time and runs < max_runs):
+            if reference is not None:
+                reference_best = min(reference_best, reference.time_once())
+            start = time.perf_counter()
+            best = min(best, self.time_once())
+            spent += time.perf_counter() - start
+            runs += 1
+        return best * 1e9, reference_best * 1e9 if reference is not None else None
+
+    def peak_memory(self) -> int:
+        """
+        Function to measure the peak memory allocated while running the operations once, after
+        an untraced run, so that caches filled on first use count whichever benchmarks ran before.
+        :return: Peak traced memory, in bytes.
+        """
+        self.run(self.setup()[0])
+        state, _ = self.setup()
+        tracemalloc.start()
+        try:
+            self.run(state)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def generated_board(board_dims: tuple, ship_types: dict, seed: int=0) -> BattleshipBoard:
+    """
+    Utility function to make a reproducible random board.
+    :param board_dims: Dimensions of the board.
+    :param ship_types: Fleet to place.
+    :param seed: Seed of the placement.
+    :return: The BattleshipBoard.
+    """
+    board = BattleshipBoard(board_dims)
+    board.generate_random_board(ship_types, Random(seed))
+    return board
+
+
+def board_benchmarks(board_dims: tuple, density_name: str) -> list:
+    """
+    Utility function to build the benchmarks of every public board operation for one board
+    size and fleet density.
+    :param board_dims: Dimensions of the board.
+    :param density_name: Key of FLEET_DENSITIES.
+    :return: List of BoardBenchmarks.
+    """
+    ship_types = scaled_fleet(board_dims, FLEET_DENSITIES[density_name])
+    template = generated_board(board_dims, ship_types)
+    ships = template.get_ships()
+    ship_cells = [tuple(int(v) for v in loc) for loc in zip(*(template.board == BattleshipBoard.SHIP).nonzero())]
+    all_cells = [(x, y) for x in range(board_dims[0]) for y in range(board_dims[1])]
+    suffix = "[{}x{},{}]".format(board_dims[0], board_dims[1], density_name)
+
+    def fresh_board():
+        board = BattleshipBoard(board_dims)
+        board.board = template.board.copy()
+        return board
+
+    def fresh_referee():
+        referee = RefereeBoard(board_dims)
+        referee.board = template.board.copy()
+        referee.index_fleet()
+        return referee
+
+    def all_hit_board():
+        board = fresh_board()
+        for loc in ship_cells:
+            board.hit(loc)
+        return board
+
+    return [
+        BoardBenchmark("add_ship" + suffix, lambda: (BattleshipBoard(board_dims), len(ships)),
+                       lambda board: [board.add_ship(ship) for ship in ships]),
+        BoardBenchmark("hit" + suffix, lambda: (fresh_board(), len(all_cells)),
+                       lambda board: [board.hit(loc) for loc in all_cells]),
+        BoardBenchmark("ship_destroyed" + suffix, lambda: (all_hit_board(), len(ship_cells)),
+                       lambda board: [board.ship_destroyed(loc) for loc in ship_cells]),
+        BoardBenchmark("update_redundant_squares" + suffix, lambda: (all_hit_board(), len(ship_cells)),
+                       lambda board: [board.update_redundant_squares(loc, True) for loc in ship_cells]),
+        BoardBenchmark("respond_to_move" + suffix, lambda: (fresh_board(), len(all_cells)),
+                       lambda board: [board.respond_to_move(loc) for loc in all_cells]),
+        BoardBenchmark("referee_resolve" + suffix, lambda: (fresh_referee(), len(all_cells)),
+                       lambda referee: [referee.resolve(loc) for loc in all_cells]),
+        BoardBenchmark("all_ships_destroyed" + suffix, lambda: (fresh_board(), 100),
+                       lambda board: [board.all_ships_destroyed() for _ in range(100)]),
+        BoardBenchmark("generate_random_board" + suffix, lambda: (BattleshipBoard(board_dims), 1),
+                       lambda board: board.generate_random_board(ship_types, Random(1))),
+    ]
+
+
+def game_benchmarks(num_games: int=5) -> list:
+    """
+    Utility function to build the end-to-end benchmarks: whole headless games on the standard board.
+    The time reported is per game, the inverse of the games per second.
+    :param num_games: Number of games per run.
+    :return: List of BoardBenchmarks.
+    """
+    benchmarks = []
+    for strategy in ["random", "density"]:
+        def run(seeds, strategy=strategy):
+            for seed in seeds:
+                play_game(strategy, strategy, seed)
+        benchmarks.append(BoardBenchmark("game[{}]".format(strategy), lambda: (range(num_games), num_games), run))
+    return benchmarks
+
+
+def calibration_benchmark() -> BoardBenchmark:
+    """
+    Utility function to build the calibration benchmark: a fixed mix of interpreted loops and
+    small numpy operations, like the board operations, but using none of the code measured.
+    :return: The BoardBenchmark, named CALIBRATION.
+    """
+    def run(grid):
+        total = 0
+        for x in range(grid.shape[0]):
+            for y in range(grid.shape[1]):
+                if grid[x, y] == 0:
+                    total += int(grid[max(x - 1, 0):x + 2, max(y - 1, 0):y + 2].sum())
+        return total
+    return BoardBenchmark(CALIBRATION, lambda: (np.zeros((20, 20), dtype=int), 400), run)
+
+
+def all_benchmarks(board_sizes: list=BOARD_SIZES) -> list:
+    """
+    Utility function to build the whole suite.
+    :param board_sizes: Board sizes to measure the board operations at.
+    :return: List of BoardBenchmarks.
+    """
+    benchmarks = []
+    for board_dims in board_sizes:
+        for density_name in FLEET_DENSITIES:
+            benchmarks += board_benchmarks(board_dims, density_name)
+    return benchmarks + game_benchmarks()
+
+
+def run_benchmarks(benchmarks: list, min_time: float=0.2, repeat: int=1) -> dict:
+    """
+    Function to run benchmarks, the whole list repeat times over. Each time a benchmark is timed,
+    the CALIBRATION workload is timed in turn with it, and the run with the median time relative
+    to it is kept, so that a burst of noise or a change of clock speed doesn't become a baseline.
+    :param benchmarks: List of BoardBenchmarks.
+    :param min_time: Minimum seconds spent timing each benchmark.
+    :param repeat: Number of times to run the list.
+    :return: Dictionary of benchmark name to {"ns_per_op": ..., "calibration_ns": ..., "peak_bytes": ...}.
+    """
+    calibration = calibration_benchmark()
+    times = {benchmark.name: [] for benchmark in benchmarks}
+    for _ in range(repeat):
+        for benchmark in benchmarks:
+            ns_per_op, calibration_ns = benchmark.time_per_op(min_time, reference=calibration)
+            times[benchmark.name].append((ns_per_op / calibration_ns, calibration_ns))
+    results = {}
+    for benchmark in benchmarks:
+        relative, calibration_ns = sorted(times[benchmark.name])[(repeat - 1) // 2]  # Median relative time
+        results[benchmark.name] = {"ns_per_op": round(relative * calibration_ns, 1),
+                                   "calibration_ns": round(calibration_ns, 1), "peak_bytes": benchmark.peak_memory()}
+    return results
+
+
+def time_ratio(result: dict, baseline: dict) -> float:
+    """
+    Utility function to compare the time of a benchmark to its baseline, in units of the
+    CALIBRATION workload timed in turn with each when both have it, in nanoseconds otherwise.
+    :param result: Result of the benchmark, from run_benchmarks.
+    :param baseline: Baseline of the benchmark.
+    :return: Ratio of the current time to the baseline's.
+    """
+    if result.get("calibration_ns", 0) > 0 and baseline.get("calibration_ns", 0) > 0:
+        return (result["ns_per_op"] / result["calibration_ns"]) / (baseline["ns_per_op"] / baseline["calibration_ns"])
+    return result["ns_per_op"] / baseline["ns_per_op"]
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float=DEFAULT_THRESHOLD) -> list:
+    """
+    Function to find the benchmarks which got slower or hungrier than the baseline allows.
+    Times are compared with time_ratio. Benchmarks missing from the baseline are not compared.
+    :param results: Output of run_benchmarks.
+    :param baseline: Baseline in the same format.
+    :param threshold: Largest allowed ratio of current to baseline, for time and peak memory.
+    :return: List of (name, metric, baseline value, current value) for each regression.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        if baseline[name]["ns_per_op"] > 0 and time_ratio(result, baseline[name]) > threshold:
+            regressions.append((name, "ns_per_op", baseline[name]["ns_per_op"], result["ns_per_op"]))
+        if baseline[name]["peak_bytes"] > 0 and result["peak_bytes"] / baseline[name]["peak_bytes"] > threshold:
+            regressions.append((name, "peak_bytes", baseline[name]["peak_bytes"], result["peak_bytes"]))
+    return regressions
+
+
+def load_baseline(path: str=BASELINE_PATH) -> dict:
+    """
+    Utility function to load a baseline file.
+    :param path: Path of the baseline JSON.
+    :return: The baseline, empty if the file doesn't exist.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def __main__():
+    """
+    Command line entry point. Runs the suite, prints the results and compares them to the
+    baseline, exiting with status 1 on a regression.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks of the Model layer.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown ratio before failing.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds spent timing each benchmark.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of the suite to take the median of.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    benchmarks = [benchmark for benchmark in all_benchmarks() if args.filter in benchmark.name]
+    results = run_benchmarks(benchmarks, args.min_time, args.repeat)
+    baseline = load_baseline(args.baseline)
+    for name, result in results.items():
+        ratio = time_ratio(result, baseline[name]) if name in baseline else float("nan")
+        print("{:<48} {:>14.0f} ns/op {:>12} B peak  x{:.2f}".format(name, result["ns_per_op"],
+                                                                     result["peak_bytes"], ratio))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        return
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    for name, metric, before, after in regressions:
+        print("REGRESSION {} {}: {} -> {}".format(name, metric, before, after))
+    if len(regressions) > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    __main__()
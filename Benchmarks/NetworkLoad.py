@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from random import Random
+from Model.BattleshipBoard import BattleshipBoard
+from Networking.AsyncBattleshipNetwork import AsyncBattleshipNetwork, percentile
+from Networking.GameServer import GameServer
+from Networking.LossyLoopback import LossyLoopback
+from Networking.Matchmaker import Matchmaker
+from Simulation.RatingEngine import RatingEngine
+
+TRANSPORTS = ["udp", "tcp", "server"]  # Peer to peer over UDP or TCP, or refereed by a GameServer
+
+
+def new_stats() -> dict:
+    """
+    Utility function to create the counters shared by the bots of a run.
+    :return: Dictionary of the counters.
+    """
+    return {"games": 0, "failed_games": 0, "moves": 0, "responses": 0, "lost": 0}
+
+
+async def connect_pair(transport: str, pair: int, server: GameServer=None, network=None) -> list:
+    """
+    Function to connect the two bots of a pair: one hosting and one joining, or both queueing
+    on the server's lobby with ratings only the two of them are close in.
+    :param transport: One of TRANSPORTS.
+    :param pair: Index of the pair.
+    :param server: The GameServer, for "server".
+    :param network: LossyLoopback standing in for the network, None for real sockets. UDP only.
+    :return: List of the two AsyncBattleshipNetworks, the one moving first first.
+    """
+    if transport == "server":
+        players = [AsyncBattleshipNetwork("127.0.0.1", transport="tcp") for _ in range(2)]
+        indices = await asyncio.gather(*[player.join_lobby(*server.addr, 2 * pair + index, 0)
+                                         for index, player in enumerate(players)])
+        return players if indices[0] == 0 else players[::-1]
+    players = [AsyncBattleshipNetwork("127.0.0.1", transport=transport, network=network) for _ in range(2)]
+    hosting = asyncio.ensure_future(players[0].start_game())
+    while players[0].my_addr is None:
+        await asyncio.sleep(0.001)
+    await players[1].join_game(*players[0].my_addr)
+    await hosting
+    return players
+
+
+async def play_peer_game(players: list, rng: Random, interval: float, timeout: float, stats: dict):
+    """
+    Function to play a game between two bots, each holding its fleet and answering the other's
+    moves like the controller does, shooting at random at the blocks it knows nothing about.
+    :param players: The two AsyncBattleshipNetworks, the one moving first first.
+    :param rng: Random generator placing the fleets and choosing the moves.
+    :param interval: Seconds a bot waits before each move.
+    :param timeout: Seconds after which a move or its response counts as lost.
+    :param stats: Counters to update.
+    :return: None
+    :raises asyncio.TimeoutError: If a move was lost.
+    """
+    boards = [BattleshipBoard(), BattleshipBoard()]
+    knowledge = [BattleshipBoard(), BattleshipBoard()]
+    cells = [[(x, y) for x in range(10) for y in range(10)] for _ in range(2)]
+    for index in range(2):
+        boards[index].generate_random_board(rng=rng)
+        rng.shuffle(cells[index])
+    shooter = 0
+    while True:
+        other = 1 - shooter
+        cell = cells[shooter].pop()
+        if knowledge[shooter].already_hit(cell):
+            continue
+        await asyncio.sleep(interval)
+        stats["moves"] += 1
+        responding = asyncio.ensure_future(players[shooter].transmit_move_and_get_response(cell))
+        try:
+            move = await asyncio.wait_for(players[other].get_move(), timeout)
+            await players[other].send_response(boards[other].respond_to_move(move))
+            response = await asyncio.wait_for(responding, timeout)
+        except asyncio.TimeoutError:
+            stats["lost"] += 1
+            raise
+        finally:
+            responding.cancel()
+        stats["responses"] += 1
+        if response in [1, 2, 3]:  # Like Battleship_Controller.perform_hit
+            knowledge[shooter].mark_ship_hit(cell)
+            knowledge[shooter].update_redundant_squares(cell, response != 1)
+        elif response == 0:
+            knowledge[shooter].mark_ship_miss(cell)
+            shooter = other
+        if response == 3:
+            return
+
+
+async def play_server_game(players: list, rng: Random, interval: float, timeout: float, stats: dict):
+    """
+    Function to play a game between two bots on a GameServer, which holds the fleets and tells
+    the shooter the blocks its move revealed.
+    :param players: The two AsyncBattleshipNetworks, the one moving first first.
+    :param rng: Random generator choosing the moves.
+    :param interval: Seconds a bot waits before each move.
+    :param timeout: Seconds after which a move or its response counts as lost.
+    :param stats: Counters to update.
+    :return: None
+    :raises asyncio.TimeoutError: If a move was lost.
+    """
+    known = [set(), set()]
+    cells = [[(x, y) for x in range(10) for y in range(10)] for _ in range(2)]
+    for index in range(2):
+        rng.shuffle(cells[index])
+    shooter = 0
+    while True:
+        cell = cells[shooter].pop()
+        if cell in known[shooter]:
+            continue
+        await asyncio.sleep(interval)
+        stats["moves"] += 1
+        try:
+            response = await asyncio.wait_for(players[shooter].transmit_move_and_get_response(cell), timeout)
+            await asyncio.wait_for(players[1 - shooter].get_move(), timeout)  # The forwarded move
+        except asyncio.TimeoutError:
+            stats["lost"] += 1
+            raise
+        stats["responses"] += 1
+        known[shooter].update(loc for loc, _ in players[shooter].take_marks())
+        if response == 0:
+            shooter = 1 - shooter
+        elif response == 3:
+            return
+
+
+async def run_pair(transport: str, pair: int, games: int, interval: float, timeout: float, stats: dict,
+                   server: GameServer=None, network=None) -> list:
+    """
+    Function to run one pair of bots: connect them and play a series of games over one session.
+    :param transport: One of TRANSPORTS.
+    :param pair: Index of the pair, also seeding its games.
+    :param games: Number of games to play.
+    :param interval: Seconds a bot waits before each move.
+    :param timeout: Seconds after which a move or its response counts as lost.
+    :param stats: Counters to update.
+    :param server: The GameServer, for "server".
+    :param network: LossyLoopback standing in for the network, None for real sockets. UDP only.
+    :return: The two AsyncBattleshipNetworks, ended.
+    """
+    players = await connect_pair(transport, pair, server, network)
+    rng = Random(pair)
+    play = play_server_game if transport == "server" else play_peer_game
+    try:
+        for game in range(games):
+            if game > 0:
+                await asyncio.wait_for(asyncio.gather(*[player.rematch() for player in players]), timeout)
+            await play(players, rng, interval, timeout, stats)
+            stats["games"] += 1
+    except (asyncio.TimeoutError, ConnectionError):
+        stats["failed_games"] += 1
+    for player in players:
+        await player.end_game(timeout)
+    return players
+
+
+async def run_load(transport: str, pairs: int=50, games: int=2, move_rate: float=0.0, timeout: float=5.0,
+                   drop_rate: float=0.0, seed: int=0) -> dict:
+    """
+    Function to put load on a transport: pairs of bots playing complete games at once, through
+    the networking backend over localhost.
+    :param transport: One of TRANSPORTS.
+    :param pairs: Number of pairs of bots playing at once.
+    :param games: Number of games each pair plays in a row, rematching on the same session.
+    :param move_rate: Moves per second of each game, 0 for as fast as possible.
+    :param timeout: Seconds after which a move or its response counts as lost.
+    :param drop_rate: Probability of dropping a datagram, over an in-process LossyLoopback instead
+                      of real sockets. UDP only.
+    :param seed: Seed of the LossyLoopback.
+    :return: Dictionary of the report.
+    """
+    stats = new_stats()
+    interval = 1.0 / move_rate if move_rate > 0 else 0.0
+    network = LossyLoopback(drop_rate=drop_rate, seed=seed) if transport == "udp" and drop_rate > 0 else None
+    server = None
+    if transport == "server":
+        ratings = RatingEngine()
+        for player_id in range(2 * pairs):
+            player = ratings.player_id(str(player_id))  # Before indexing, the arrays may grow
+            ratings.rating[player] = player_id // 2 * 10000.0  # Partners alone are close
+        server = GameServer("127.0.0.1", seed=seed, matchmaker=Matchmaker(ratings))
+        await server.start()
+    cpu = time.process_time()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # The backends print the addresses of every game
+        players = await asyncio.gather(*[run_pair(transport, pair, games, interval, timeout, stats, server, network)
+                                         for pair in range(pairs)])
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    if server is not None:
+        await server.close()
+    players = [player for pair in players for player in pair]
+    rtts = sorted(rtt for player in players for rtt in player.rtts)
+    channels = [player.channel for player in players if player.channel is not None]
+    return {"transport": transport, "pairs": pairs, "games_per_pair": games, "move_rate": move_rate,
+            "drop_rate": drop_rate if network is not None else 0.0, "seconds": elapsed, "cpu_seconds": cpu,
+            "games": stats["games"], "failed_games": stats["failed_games"], "moves": stats["moves"],
+            "responses": stats["responses"], "lost": stats["lost"],
+            "loss_rate": stats["lost"] / stats["moves"] if stats["moves"] > 0 else 0.0,
+            "moves_per_s": stats["responses"] / elapsed, "games_per_s": stats["games"] / elapsed,
+            "datagrams_sent": sum(channel.sent for channel in channels),
+            "retransmissions": sum(channel.retransmissions for channel in channels),
+            "datagrams_dropped": network.dropped if network is not None else 0,
+            "malformed": sum(player.malformed for player in players),
+            "rtt_ms": {"count": len(rtts), "p50": percentile(rtts, 0.5) * 1e3, "p90": percentile(rtts, 0.9) * 1e3,
+                       "p99": percentile(rtts, 0.99) * 1e3, "max": rtts[-1] * 1e3 if len(rtts) > 0 else None}}
+
+
+def __main__():
+    """
+    Generates load on the networking backends and reports throughput, loss and round trip
+    times, e.g. to size servers or compare transports.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Load generator for the Battleship networking backends.")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=TRANSPORTS, help="Transports to load.")
+    parser.add_argument("--pairs", type=int, default=50, help="Pairs of bots playing at once.")
+    parser.add_argument("--games", type=int, default=2, help="Games each pair plays in a row on one session.")
+    parser.add_argument("--move-rate", type=float, default=0.0, help="Moves per second per game, 0 for unlimited.")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Seconds after which a move counts as lost.")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="Datagrams dropped over UDP, simulated in process instead of real sockets.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the simulated drops.")
+    parser.add_argument("--output", help="Also write the report to this JSON file.")
+    args = parser.parse_args()
+
+    reports = []
+    for transport in args.transports:
+        report = asyncio.run(run_load(transport, args.pairs, args.games, args.move_rate, args.timeout,
+                                      args.drop_rate, args.seed))
+        reports.append(report)
+        print("{:<7} {:>5} games ({} failed) {:>9.0f} moves/s  loss {:.4f}  retransmissions {:>5}  "
+              "RTT ms p50 {:>7.2f} p90 {:>7.2f} p99 {:>7.2f}".format(
+                  transport, report["games"], report["failed_games"], report["moves_per_s"], report["loss_rate"],
+                  report["retransmissions"], report["rtt_ms"]["p50"], report["rtt_ms"]["p90"],
+                  report["rtt_ms"]["p99"]))
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump({"reports": reports}, output_file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    __main__()
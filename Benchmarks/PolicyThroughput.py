@@ -0,0 +1,88 @@
+import argparse
+import time
+import numpy as np
+from random import Random
+from Model.BattleshipBoard import BattleshipBoard
+from Model.PolicyEvaluator import PolicyModel, feature_count, load_policy
+from Model.Targeter import placement_density
+
+
+def make_knowledge_boards(num_boards: int, dims: tuple=(10, 10), shots: int=30, seed: int=0) -> np.ndarray:
+    """
+    Utility function to make a stack of realistic knowledge boards to benchmark with.
+    Every board is a random fleet which received a number of random strikes, with the
+    un-hit ship blocks hidden the way the opponent sees them.
+    :param num_boards: Number of boards to make.
+    :param dims: Dimensions of the boards.
+    :param shots: Number of random strikes made on each board.
+    :param seed: Seed for the random generator.
+    :return: int array of shape (num_boards, rows, cols).
+    """
+    rng = Random(seed)
+    boards = np.empty((num_boards,) + tuple(dims), dtype=int)
+    board = BattleshipBoard(dims)
+    for idx in range(num_boards):
+        board.generate_random_board()
+        for _ in range(shots):
+            loc = (rng.randrange(dims[0]), rng.randrange(dims[1]))
+            if board.hit(loc) == 1:
+                board.update_redundant_squares(loc, board.ship_destroyed(loc))
+        boards[idx] = np.where(board.board == BattleshipBoard.SHIP, BattleshipBoard.EMPTY, board.board)
+    return boards
+
+
+def random_policy(hidden: list, radius: int=1, seed: int=0) -> PolicyModel:
+    """
+    Utility function to make a policy with random weights, used when no trained weights are given.
+    :param hidden: Sizes of the hidden layers. An empty list gives a linear policy.
+    :param radius: Radius of the feature window.
+    :param seed: Seed for the weights.
+    :return: PolicyModel with random weights.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = [feature_count(radius)] + list(hidden) + [1]
+    return PolicyModel([(rng.normal(size=(n_in, n_out)), np.zeros(n_out)) for n_in, n_out in zip(sizes, sizes[1:])],
+                       radius)
+
+
+def time_boards_per_sec(func, boards: np.ndarray, repeat: int=3) -> float:
+    """
+    Utility function to time a batched scoring function.
+    :param func: Function taking the stack of boards.
+    :param boards: Stack of boards to score.
+    :param repeat: Number of runs, the best one is reported.
+    :return: Boards scored per second in the best run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(boards)
+        best = min(best, time.perf_counter() - start)
+    return boards.shape[0] / best
+
+
+def __main__():
+    """
+    Benchmarks the batched policy forward pass against the density targeter.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Batched policy evaluation throughput.")
+    parser.add_argument("--boards", type=int, default=4000, help="Number of boards in the batch.")
+    parser.add_argument("--dims", type=int, nargs=2, default=(10, 10), help="Board dimensions.")
+    parser.add_argument("--weights", help=".npz policy file. Random linear and MLP policies are used if omitted.")
+    args = parser.parse_args()
+
+    boards = make_knowledge_boards(args.boards, tuple(args.dims))
+    ship_types = {4: 1, 3: 2, 2: 3, 1: 4}
+    if args.weights:
+        policies = {"policy": load_policy(args.weights)}
+    else:
+        policies = {"linear": random_policy([]), "mlp-32": random_policy([32])}
+    results = {name: time_boards_per_sec(policy.score, boards) for name, policy in policies.items()}
+    results["density"] = time_boards_per_sec(lambda b: placement_density(b, ship_types), boards)
+    for name, rate in results.items():
+        print("{:>10}: {:>12.0f} boards/s".format(name, rate))
+
+
+if __name__ == '__main__':
+    __main__()
@@ -0,0 +1,65 @@
+import argparse
+import io
+import os
+import time
+from contextlib import redirect_stdout
+import battleship_simulator
+
+
+# Scripted game shipped with the repo
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "game_loop_test_input.txt")
+
+
+def time_batch(batch: str) -> float:
+    """
+    Utility function to time the batch mode on a stream of games.
+    :param batch: The batch, one game per line.
+    :return: Games per second.
+    """
+    start = time.perf_counter()
+    games, _, _ = battleship_simulator.run_batch(io.StringIO(batch), io.StringIO())
+    return games / (time.perf_counter() - start)
+
+
+def time_interactive(script: str, num_games: int) -> float:
+    """
+    Utility function to time the interactive game loop fed the same script answer by answer,
+    with its prompts and boards printed to a discarded buffer.
+    :param script: The answers of one game, one per line.
+    :param num_games: Number of games to play.
+    :return: Games per second.
+    """
+    answers = iter(script.split("\n") * num_games)
+
+    def scripted_input(prompt: str=""):
+        print(prompt, end="")  # input() writes its prompt too
+        return next(answers)
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for _ in range(num_games):
+            battleship_simulator.run_game(scripted_input)
+    return num_games / (time.perf_counter() - start)
+
+
+def __main__():
+    """
+    Benchmarks the batch mode against the interactive loop on game_loop_test_input.txt replicated many times.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Scripted game throughput of battleship_simulator.")
+    parser.add_argument("--games", type=int, default=5000, help="Number of copies of the scripted game.")
+    args = parser.parse_args()
+
+    with open(SCRIPT_PATH) as script_file:
+        script = script_file.read().strip()
+    batch = (battleship_simulator.to_batch_line(script) + "\n") * args.games
+    batch_rate = time_batch(batch)
+    interactive_rate = time_interactive(script, max(1, args.games // 10))
+    print("{:>12}: {:>10.0f} games/s".format("batch", batch_rate))
+    print("{:>12}: {:>10.0f} games/s".format("interactive", interactive_rate))
+    print("{:>12}: {:>10.1f}x".format("speedup", batch_rate / interactive_rate))
+
+
+if __name__ == '__main__':
+    __main__()
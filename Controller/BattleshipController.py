@@ -1,6 +1,7 @@
 import tkinter
 import Model.BattleshipBoard as battleship_board
 import Model.Ship as Ship
+from Model.FleetTracker import FleetTracker
 from View.PopupDialogBox import PopupDialogBox
 import View.BattleshipGUI as BattleshipGUI
 from Networking.BattleshipNetworkingBackend import BattleshipNetwork
@@ -17,17 +18,13 @@ class Battleship_Controller():
     @author sahil1105
     """
 
-    # Color constants
-    COLOR_SHIP = "blue"
-    COLOR_EMPTY = "white"
-    COLOR_SHIP_HIT = "red"
-    COLOR_EMPTY_HIT = "#e5cd77"
-    COLOR_REDUNDANT = "#eae0cc"
     # Game state constants
     GAME_STATE_NOT_STARTED = 0
     GAME_STATE_MY_TURN = 1
     GAME_STATE_OPP_TURN = -1
     GAME_STATE_OVER = 2
+    # Seconds to wait for the opponent to ask for a rematch too
+    REMATCH_TIMEOUT = 60.0
 
     def __init__(self, init_dims=(10, 10)):
         """
@@ -46,6 +43,7 @@ class Battleship_Controller():
         # Set up the model
         self.model = battleship_board.BattleshipBoard()
         self.model_opp = battleship_board.BattleshipBoard()
+        self.opp_fleet = FleetTracker(self.model_opp.board.shape, self.view.opp_piece_panel.ship_sizes)
         # Set the initial state
         self.curr_game_state = Battleship_Controller.GAME_STATE_NOT_STARTED
         self.ships = self.init_ships()
@@ -56,8 +54,9 @@ class Battleship_Controller():
         self._hit_click_data = {"x": -1, "y": -1, "block_tag": None}
         self.setup_callbacks()
         # Start the game
-        self.network = BattleshipNetwork(self)  # Initialize the networking backend
+        self.network = BattleshipNetwork(self)  # Initialize the networking backend, kept for rematches
         self.app.mainloop()
+        self.network.end_game()
 
     def init_ships(self) -> list:
         """
@@ -84,33 +83,26 @@ class Battleship_Controller():
         Updates the GUI blocks on the two grids with the states as in the model.
         :return: None
         """
-        # Color mapping for block state to color
-        color_map = {battleship_board.BattleshipBoard.SHIP: Battleship_Controller.COLOR_SHIP,
-                     battleship_board.BattleshipBoard.EMPTY: Battleship_Controller.COLOR_EMPTY,
-                     battleship_board.BattleshipBoard.SHIP_HIT: Battleship_Controller.COLOR_SHIP_HIT,
-                     battleship_board.BattleshipBoard.EMPTY_HIT: Battleship_Controller.COLOR_EMPTY_HIT,
-                     battleship_board.BattleshipBoard.REDUNDANT: Battleship_Controller.COLOR_REDUNDANT}
         # Set the tile colors according to the color map
-        for x in range(self.model.board.shape[0]):
-            for y in range(self.model.board.shape[1]):
-                self.view.my_grid.set_tile_color(x, y, color_map[self.model.board[x, y]])
-                self.view.opp_grid.set_tile_color(x, y, color_map[self.model_opp.board[x, y]])
+        self.view.my_grid.render_board(self.model.board)
+        self.view.opp_grid.render_board(self.model_opp.board)
 
     def reset(self):
         """
-        Reset functionality for the game. Resets the model and the view. The scoreboard is not changed.
+        Reset functionality for the game. Resets the model and the view. The scoreboard and the
+        network session, for a rematch, are not changed.
         :return: None
         """
         # Reset the model
         self.model = battleship_board.BattleshipBoard()
         self.model_opp = battleship_board.BattleshipBoard()
+        self.opp_fleet = FleetTracker(self.model_opp.board.shape, self.view.opp_piece_panel.ship_sizes)
         self.curr_game_state = Battleship_Controller.GAME_STATE_NOT_STARTED
         # Reset the view
         self.ships = self.init_ships()
         self.place_ships()
         self.setup_start_button_callback()
         self.view.opp_piece_panel.reset_panel()
-        self.network = BattleshipNetwork(self)
 
     def reset_score(self):
         """
@@ -155,6 +147,9 @@ class Battleship_Controller():
         :param event: The button click event details.
         :return: None
         """
+        if self.network.in_session:
+            self.start_rematch()
+            return
         # self.create_server_popup = PopupDialogBox(self.view.master, "Game created at:", "192.168.2.1", "54321")
         # self.view.master.wait_window(self.create_server_popup.top)
         self.network.start_game()
@@ -164,6 +159,32 @@ class Battleship_Controller():
         self.view.start_game_button["text"] = "Forfeit"
         self.view.start_game_button.bind("<Button-1>", self.forfeit)
 
+    def start_rematch(self):
+        """
+        Function to start the next game against the same opponent, on the same connection.
+        Waits for the opponent to ask for the rematch too, up to REMATCH_TIMEOUT seconds, else
+        ends the session so that the next game starts a new one. The host of the session moves first.
+        :return: None
+        """
+        self.view.set_status_panel_msg("Waiting for the opponent")
+        tkinter.Tk.update(self.app)
+        try:
+            self.network.rematch(Battleship_Controller.REMATCH_TIMEOUT)
+        except (ConnectionError, TimeoutError):
+            self.network.end_game()
+            self.view.set_status_panel_msg("No rematch, start or join a new game")
+            return
+        self.view.start_game_button["text"] = "Forfeit"
+        self.view.start_game_button.bind("<Button-1>", self.forfeit)
+        if self.network.is_host:
+            self.curr_game_state = Battleship_Controller.GAME_STATE_MY_TURN
+            self.view.set_status_panel_msg("Your turn")
+        else:
+            self.curr_game_state = Battleship_Controller.GAME_STATE_OPP_TURN
+            self.view.set_status_panel_msg("Opponent's turn")
+            tkinter.Tk.update(self.app)
+            self.respond_to_opp_move()
+
     def forfeit(self, event):
         """
         Callback function for the forfeit button.
@@ -188,7 +209,9 @@ class Battleship_Controller():
         :param event: The button click event details.
         :return: None
         """
-        if self.curr_game_state == Battleship_Controller.GAME_STATE_NOT_STARTED:
+        if self.curr_game_state == Battleship_Controller.GAME_STATE_NOT_STARTED and self.network.in_session:
+            self.start_rematch()
+        elif self.curr_game_state == Battleship_Controller.GAME_STATE_NOT_STARTED:
             self.network.join_game(input("IP?"), int(input("Port?")))
             # self.join_game_popup = PopupDialogBox(self.view.master, "Enter IP and Port to Join", "", "", "Join")
             # self.view.join_game_button["state"] = tkinter.DISABLED
@@ -263,17 +286,18 @@ class Battleship_Controller():
                 if response in [1, 2, 3]:  # If hit
                     self.model_opp.mark_ship_hit((x, y))
                     self.model_opp.update_redundant_squares((x, y), False if response == 1 else True)
+                elif response == 0:
+                    self.model_opp.mark_ship_miss((x, y))
+                self.opp_fleet.update(self.model_opp, (x, y), response)  # Track the opponent's fleet
                 if response in [2, 3]:  # If ship destroyed
-                    ship_len = self.model_opp.get_ship_len((x,y))
+                    ship_len = self.opp_fleet.sunk_ships[-1][0]  # Length of the run of hits just sunk
                     self.view.opp_piece_panel.destroy_ship(ship_len)
                 if response == 3:  # If game won
                     self.curr_game_state = Battleship_Controller.GAME_STATE_OVER
                     self.view.set_status_panel_msg("You win!")
                     self.view.scoreboard.increment_score_1()
-                    self.network.end_game()
                     self.reset()
                 elif response == 0:  # If miss
-                    self.model_opp.mark_ship_miss((x, y))
                     self.curr_game_state = Battleship_Controller.GAME_STATE_OPP_TURN
                     self.view.set_status_panel_msg("Opponent's Turn")
                 elif response not in [0, 1, 2, 3]:  # If invalid response
@@ -296,22 +320,14 @@ class Battleship_Controller():
                 self.curr_game_state = Battleship_Controller.GAME_STATE_OVER
                 self.view.set_status_panel_msg("You win!")
                 self.view.scoreboard.increment_score_1()
-                self.network.end_game()
                 self.reset()
                 break
-            hit_response = self.model.hit(loc)  # Get response of hit
-            if hit_response == 1:  # if hit on a ship
-                if self.model.ship_destroyed(loc):  # ship destroyed
-                    hit_response = 2
-                    self.model.update_redundant_squares(loc, True)
-                    if self.model.all_ships_destroyed():  # Lost game
-                        hit_response = 3
-                        self.curr_game_state = Battleship_Controller.GAME_STATE_OVER
-                        self.view.set_status_panel_msg("You lost!")
-                        self.view.scoreboard.increment_score_2()
-                else:
-                    self.model.update_redundant_squares(loc)
-            else:  # miss, so change of turn
+            hit_response = self.model.respond_to_move(loc)  # Get response of hit
+            if hit_response == 3:  # Lost game
+                self.curr_game_state = Battleship_Controller.GAME_STATE_OVER
+                self.view.set_status_panel_msg("You lost!")
+                self.view.scoreboard.increment_score_2()
+            elif hit_response not in [1, 2]:  # miss, so change of turn
                 self.curr_game_state = Battleship_Controller.GAME_STATE_MY_TURN
                 self.view.set_status_panel_msg("Your turn")
             self.update_grids()  # Update GUI based on updated model
@@ -1,7 +1,8 @@
 import numpy as np
 import pandas as pd
 from Model.Ship import Ship, compute_end_loc, get_ship_blocks
-from random import randint
+from Model.FleetFeasibility import is_feasible, find_arrangement
+from random import Random, randint, random
 
 
 class BattleshipBoard:
@@ -25,6 +26,11 @@ class BattleshipBoard:
     SHIP_HIT = -1
     EMPTY_HIT = -2
     REDUNDANT = -3
+    # Number of failed random positions for a ship after which generate_random_board starts over
+    MAX_PLACEMENT_ATTEMPTS = 500
+    # Number of times generate_random_board starts over before placing the arrangement the
+    # feasibility search found instead
+    MAX_BOARD_RESTARTS = 10
 
     def __init__(self, board_dims: tuple =(10, 10), ships: list = []):
         """
@@ -72,7 +78,7 @@ class BattleshipBoard:
         """
         self.board = np.zeros(self.board.shape, dtype=int)
 
-    def generate_random_board(self, ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}):
+    def generate_random_board(self, ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}, rng: Random=None):
         """
         Function to generate a random arrangement of the ships as indicated in
         ship_types on the current game board.
@@ -80,25 +86,64 @@ class BattleshipBoard:
         to the game board. The output arrangement is a valid gameboard arrangement,
         i.e. a piece is only added in a certain position if it satisfies the constraints
         of the Battleship game.
+        Fleets too tight to place at random within MAX_BOARD_RESTARTS tries get the arrangement
+        found by the feasibility search, flipped at random.
         :param ship_types: Dictionary of ship lenghts to number of ships of that length.
+        :param rng: Optional Random instance to draw the positions from, for reproducible boards.
         :return: None
+        :raises ValueError: If the ships can not be placed on a board of this size at all, or no
+                            arrangement could be found.
         """
-        rows, cols = self.board.shape  # Get shape of the board.
-        self.clear_board()  # Clear the board.
+        if is_feasible(self.board.shape, ship_types) is False:
+            raise ValueError("The ships {} can not be placed on a {} board.".format(ship_types, self.board.shape))
         ships = []
         for ship_len, freq in ship_types.items():  # Add the ship_lens, freq times to the list.
             for _ in range(freq):
                 ships.append(ship_len)
         ships = sorted(ships, reverse=True)  # Reverse sort to ensure that larger pieces are added first (heuristic)
 
-        while len(ships) > 0:  # Until ships to add
-            ship_length_to_add = ships.pop(0)
-            added = False
-            while not added:  # Keep trying to add to the board until successful
-                # Get a random board position and direction for the ship
-                x, y, dir_ = get_random_coord_and_dir(rows, cols)
-                if self.add_ship(Ship((x, y), ship_length_to_add, dir_)):  # Try adding to the board.
-                    added = True
+        for _ in range(BattleshipBoard.MAX_BOARD_RESTARTS):  # Start over if earlier ships leave no room for later ones
+            self.clear_board()  # Clear the board.
+            if all(self.add_ship_at_random(ship_len, rng) for ship_len in ships):
+                return
+        arrangement = find_arrangement(self.board.shape, ship_types)
+        if arrangement is None:
+            raise ValueError("No arrangement of the ships {} on a {} board was found.".format(ship_types,
+                                                                                          self.board.shape))
+        self.place_arrangement(arrangement, rng)
+
+    def place_arrangement(self, arrangement: list, rng: Random=None):
+        """
+        Utility function to clear the board and place a valid arrangement of ships on it, flipped
+        upside down and left to right at random, which keeps it valid.
+        :param arrangement: List of (start location, length, direction) tuples, as from find_arrangement.
+        :param rng: Optional Random instance to draw the flips from.
+        :return: None
+        """
+        rows, cols = self.board.shape
+        flip_x, flip_y = [(rng.random() if rng is not None else random()) < 0.5 for _ in range(2)]
+        self.clear_board()
+        for start_loc, length, direction in arrangement:
+            end_x, end_y = compute_end_loc(start_loc, length - 1, direction)
+            xs = [rows - 1 - start_loc[0], rows - 1 - end_x] if flip_x else [start_loc[0], end_x]
+            ys = [cols - 1 - start_loc[1], cols - 1 - end_y] if flip_y else [start_loc[1], end_y]
+            self.add_ship(Ship((min(xs), min(ys)), length, direction))
+
+    def add_ship_at_random(self, ship_length: int, rng: Random=None) -> bool:
+        """
+        Utility function to add a ship of the given length at a random position and direction.
+        Gives up after MAX_PLACEMENT_ATTEMPTS invalid positions.
+        :param ship_length: Length of the ship to add.
+        :param rng: Optional Random instance to draw the positions from.
+        :return: True if the ship was added, False otherwise.
+        """
+        rows, cols = self.board.shape  # Get shape of the board.
+        for _ in range(BattleshipBoard.MAX_PLACEMENT_ATTEMPTS):  # Keep trying to add to the board
+            # Get a random board position and direction for the ship
+            x, y, dir_ = get_random_coord_and_dir(rows, cols, rng=rng)
+            if self.add_ship(Ship((x, y), ship_length, dir_)):  # Try adding to the board.
+                return True
+        return False
 
     def remove_ship(self, ship: Ship) -> bool:
         """
@@ -170,6 +215,21 @@ class BattleshipBoard:
                     self.add_ship(orig_ship)  # Re-instate the original if rotation failed.
         return False
 
+    def get_ships(self) -> list:
+        """
+        Utility function to list the ships on the board (hit or not), e.g. to record a placement.
+        Every ship starts at its leftmost or uppermost block and extends rightwards or downwards.
+        :return: List of Ship objects in row-major order of their starting block.
+        """
+        ships = []
+        for x, y in zip(*np.nonzero((self.board == BattleshipBoard.SHIP) | (self.board == BattleshipBoard.SHIP_HIT))):
+            loc = (int(x), int(y))
+            ship_ends = self.find_ship_ends(loc)
+            if ship_ends[0] == loc:  # Only count each ship at its starting block
+                ship_dir = self.get_ship_dir(loc, ship_ends)
+                ships.append(Ship(loc, int(self.get_ship_len(loc, ship_ends)), (int(ship_dir[0]), int(ship_dir[1]))))
+        return ships
+
     def mark_as_ship(self, locs: list):
         """
         Utility function to mark the given locations as ships.
@@ -361,6 +421,26 @@ class BattleshipBoard:
                     self.mark_surroundings_redundant(end)  # Mark all 8 adjacent locations redundant
         return 1
 
+    def respond_to_move(self, loc: tuple) -> int:
+        """
+        Function to execute an opponent's move on this board and work out the response to send
+        back: the hit, the redundant location updates and the destroyed ship/fleet checks.
+        :param loc: 2D location tuple the opponent struck.
+        :return: 0 if missed, 1 if a ship was hit, 2 if the ship was destroyed, 3 if all the ships
+                 have been destroyed. -1 if invalid location or location has already been hit or
+                 marked as redundant.
+        """
+        hit_response = self.hit(loc)  # Get response of hit
+        if hit_response == 1:  # if hit on a ship
+            if self.ship_destroyed(loc):  # ship destroyed
+                hit_response = 2
+                self.update_redundant_squares(loc, True)
+                if self.all_ships_destroyed():  # Lost game
+                    hit_response = 3
+            else:
+                self.update_redundant_squares(loc)
+        return hit_response
+
     def find_ship_ends(self, loc: tuple) -> list:
         """
         Utility function to find the start and end block locations of the ship a part of which is at the given
@@ -443,7 +523,7 @@ class BattleshipBoard:
         return df.to_string()
 
 
-def get_random_coord_and_dir(x: int=10, y: int=10, dirs: list=[(0,1), (1,0), (0,-1), (-1,0)]):
+def get_random_coord_and_dir(x: int=10, y: int=10, dirs: list=[(0,1), (1,0), (0,-1), (-1,0)], rng: Random=None):
     """
     Utility function that basically generates three random numbers. One which is in the range
     0-(x-1), another in the range 0-(y-1) and another in the range 0-(len(dirs)-1).
@@ -452,8 +532,10 @@ def get_random_coord_and_dir(x: int=10, y: int=10, dirs: list=[(0,1), (1,0), (0,
     :param x: The width of the board.
     :param y: The length of the board.
     :param dirs: List of possible directions.
+    :param rng: Optional Random instance to draw from. Defaults to the module level generator.
     :return: A random position and direction.
     """
+    rand = rng.randint if rng is not None else randint
     dir_len = len(dirs)
-    return randint(0, x-1), randint(0, y-1), dirs[randint(0, dir_len-1)]
+    return rand(0, x-1), rand(0, y-1), dirs[rand(0, dir_len-1)]
 
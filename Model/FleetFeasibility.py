@@ -0,0 +1,296 @@
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from random import Random
+
+
+# Widest board (narrow side, in blocks) count_arrangements accepts by default. The number of
+# states of the row-by-row counter grows exponentially with this width.
+MAX_COUNT_WIDTH = 6
+# Search nodes each attempt of is_feasible may visit, and the number of attempts (the first in a
+# fixed order, the others in seeded random orders). Keeps is_feasible well under a second on
+# fleets packed too tightly to decide, for which it returns None.
+MAX_SEARCH_NODES = 5000
+SEARCH_ATTEMPTS = 10
+
+
+def fleet_key(ship_types: dict) -> tuple:
+    """
+    Utility function to turn a fleet description into a hashable, canonical cache key.
+    :param ship_types: Dictionary of ship lengths to number of ships of that length.
+    :return: Tuple of (length, count) pairs sorted by decreasing length, without empty entries.
+    """
+    return tuple(sorted(((int(ship_len), int(freq)) for ship_len, freq in ship_types.items() if freq > 0),
+                        reverse=True))
+
+
+def is_feasible(board_dims: tuple, ship_types: dict) -> bool:
+    """
+    Function to check whether a fleet can be placed on a board of the given dimensions under the
+    rules of the game, i.e. with no two ships within one block of each other.
+    The search is bounded (see MAX_SEARCH_NODES), so a fleet packed so tightly that neither an
+    arrangement nor a proof that there is none is found in time is left undecided.
+    Results are cached by (dims, fleet).
+    :param board_dims: Dimensions of the board.
+    :param ship_types: Dictionary of ship lengths to number of ships of that length.
+    :return: True if at least one valid arrangement exists, False if none does, None if undecided.
+    """
+    return _solve(tuple(board_dims), fleet_key(ship_types))[0]
+
+
+def find_arrangement(board_dims: tuple, ship_types: dict) -> list:
+    """
+    Function to get a valid arrangement of a fleet, the one is_feasible found.
+    :param board_dims: Dimensions of the board.
+    :param ship_types: Dictionary of ship lengths to number of ships of that length.
+    :return: List of (start location, length, direction) tuples of the ships, as taken by Ship,
+             or None if no arrangement was found.
+    """
+    arrangement = _solve(tuple(board_dims), fleet_key(ship_types))[1]
+    return list(arrangement) if arrangement is not None else None
+
+
+def count_arrangements(board_dims: tuple, ship_types: dict, max_width: int=MAX_COUNT_WIDTH) -> int:
+    """
+    Function to count the valid arrangements of a fleet on a board of the given dimensions.
+    Ships of the same length are interchangeable, so arrangements are counted as sets of
+    occupied positions. Results are cached by (dims, fleet).
+    :param board_dims: Dimensions of the board.
+    :param ship_types: Dictionary of ship lengths to number of ships of that length.
+    :param max_width: Largest narrow side accepted. Raises ValueError above it, since the
+                      counter is exponential in the narrow side of the board.
+    :return: Number of valid arrangements.
+    """
+    if min(board_dims) > max_width:
+        raise ValueError("Board too wide to count arrangements: {}".format(board_dims))
+    return _count_arrangements(tuple(board_dims), fleet_key(ship_types))
+
+
+@lru_cache(maxsize=None)
+def _solve(board_dims: tuple, fleet: tuple) -> tuple:
+    """
+    Cached implementation of is_feasible and find_arrangement, see there.
+    :return: (is_feasible result, tuple of the ships of the arrangement found or None) tuple.
+    """
+    rows, cols = max(board_dims), min(board_dims)
+    if len(fleet) == 0:
+        return True, ()
+    if fleet[0][0] > rows:  # Longest ship doesn't fit along the board
+        return False, None
+    # A ship of length L together with its surrounding no-touch margin (counted on one side only)
+    # covers (L + 1) * 2 blocks of a board grown by one row and one column.
+    if sum((ship_len + 1) * 2 * freq for ship_len, freq in fleet) > (rows + 1) * (cols + 1):
+        return False, None
+    search = _PlacementSearch(rows, cols, fleet)
+    feasible = search.exists(MAX_SEARCH_NODES, SEARCH_ATTEMPTS)
+    if not feasible:
+        return feasible, None
+    ships = search.arrangement()
+    if board_dims[0] < board_dims[1]:  # Searched transposed, with the narrow side as the row width
+        ships = [((y, x), length, (dy, dx)) for (x, y), length, (dx, dy) in ships]
+    return True, tuple(ships)
+
+
+@lru_cache(maxsize=None)
+def _count_arrangements(board_dims: tuple, fleet: tuple) -> int:
+    """
+    Cached implementation of count_arrangements, see there.
+    """
+    rows, cols = max(board_dims), min(board_dims)
+    if len(fleet) > 0 and fleet[0][0] > rows:
+        return 0
+    return _PlacementSearch(rows, cols, fleet).count()
+
+
+class _PlacementSearch:
+    """
+    Search over the placements of a fleet, going through the blocks of the board in row-major
+    order. At each block a ship may start there (extending right or down) or the block is left
+    empty. The state is the block index, a bit mask of the blocks from the current one onwards
+    which are occupied or within one block of a ship placed earlier, and the number of ships of
+    each length still to place. Since rows are processed in order the mask never reaches more
+    than a few rows ahead, which keeps the number of distinct states small on narrow boards.
+    The board is always processed with its narrow side as the row width.
+    @author sahil1105
+    """
+    class BudgetExceeded(Exception):
+        """
+        Raised when an attempt of exists visited more nodes than it may.
+        """
+
+    def __init__(self, rows: int, cols: int, fleet: tuple):
+        """
+        Constructor for the search.
+        :param rows: Number of rows (the long side).
+        :param cols: Number of columns (the narrow side).
+        :param fleet: Fleet key as produced by fleet_key.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.num_blocks = rows * cols
+        self.lengths = tuple(ship_len for ship_len, _ in fleet)
+        self.start_counts = tuple(freq for _, freq in fleet)
+        self.placements = [self.block_placements(p) for p in range(self.num_blocks)]
+        self.order = self.placements  # Placements in the order the current attempt of exists tries them
+        self.dead_states = set()  # Fully explored, so valid across attempts
+        self.path = []  # (block index, length index, ship bits) of the ships placed so far
+        self.nodes = 0
+        self.max_nodes = None
+
+    def block_placements(self, p: int) -> list:
+        """
+        Utility function to list the ways a ship can start at block p.
+        :param p: Block index in row-major order.
+        :return: List of (length index, ship bits, footprint bits), the bits relative to p. The
+                 footprint is the ship plus its no-touch margin, limited to blocks at or after p.
+        """
+        r, c = divmod(p, self.cols)
+        placements = []
+        for length_idx, ship_len in enumerate(self.lengths):
+            for dr, dc in ([(0, 1), (1, 0)] if ship_len > 1 else [(0, 1)]):
+                if r + dr * (ship_len - 1) >= self.rows or c + dc * (ship_len - 1) >= self.cols:
+                    continue
+                ship_bits = 0
+                footprint = 0
+                for i in range(ship_len):
+                    sr, sc = r + dr * i, c + dc * i
+                    ship_bits |= 1 << ((sr * self.cols + sc) - p)
+                    for nr in range(sr - 1, sr + 2):
+                        for nc in range(sc - 1, sc + 2):
+                            if 0 <= nr < self.rows and 0 <= nc < self.cols and nr * self.cols + nc >= p:
+                                footprint |= 1 << (nr * self.cols + nc - p)
+                placements.append((length_idx, ship_bits, footprint))
+        return placements
+
+    def blocks_needed(self, counts: tuple) -> int:
+        """
+        Utility function to get the number of blocks the ships still to place occupy.
+        :param counts: Number of ships of each length still to place.
+        :return: Number of blocks.
+        """
+        return sum(ship_len * freq for ship_len, freq in zip(self.lengths, counts))
+
+    def area_needed(self, counts: tuple) -> int:
+        """
+        Utility function to get the area the ships still to place cover with their margins, as in
+        the bound of _solve.
+        :param counts: Number of ships of each length still to place.
+        :return: Area in blocks.
+        """
+        return sum((ship_len + 1) * 2 * freq for ship_len, freq in zip(self.lengths, counts))
+
+    def area_left(self, p: int) -> int:
+        """
+        Utility function to get the area left for ships starting at block p or later: the rows
+        from p's onwards of the board grown by one row and one column, less the blocks of p's row
+        before it, which no such ship or margin reaches.
+        :param p: Current block index.
+        :return: Area in blocks.
+        """
+        r, c = divmod(p, self.cols)
+        return (self.rows - r + 1) * (self.cols + 1) - c
+
+    def free_blocks(self, p: int, mask: int) -> int:
+        """
+        Utility function to get the number of blocks from p onwards that a ship may still occupy.
+        :param p: Current block index.
+        :param mask: Blocked bits relative to p.
+        :return: Number of blocks.
+        """
+        return self.num_blocks - p - bin(mask).count("1")
+
+    def exists(self, max_nodes: int=None, attempts: int=1) -> bool:
+        """
+        Function to find out whether at least one arrangement exists, using depth-first
+        backtracking which tries placing ships before leaving blocks empty. States known to lead
+        nowhere are memoized so they are never explored twice. An attempt visiting more than
+        max_nodes nodes is abandoned for another one trying the placements in a random (seeded)
+        order, which on tightly packed fleets finds an arrangement far sooner than waiting out
+        one unlucky order. The arrangement found is kept, see arrangement.
+        :param max_nodes: Nodes each attempt may visit, None for no limit.
+        :param attempts: Number of attempts.
+        :return: True if an arrangement exists, False if none does, None if every attempt ran out of nodes.
+        """
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, self.num_blocks + 1000))
+        try:
+            for attempt in range(attempts):
+                if attempt > 0:
+                    rng = Random(attempt)
+                    self.order = [rng.sample(placements, len(placements)) for placements in self.placements]
+                self.path = []
+                self.nodes = 0
+                self.max_nodes = max_nodes
+                try:
+                    return self.search(0, 0, self.start_counts)
+                except _PlacementSearch.BudgetExceeded:
+                    continue
+            return None
+        finally:
+            sys.setrecursionlimit(limit)
+
+    def arrangement(self) -> list:
+        """
+        Function to get the arrangement exists found.
+        :return: List of (start location, length, direction) tuples, in (row, column) of the search.
+        """
+        ships = []
+        for p, length_idx, ship_bits in self.path:
+            ship_len = self.lengths[length_idx]
+            direction = (0, 1) if ship_len == 1 or ship_bits & 2 else (1, 0)
+            ships.append((divmod(p, self.cols), ship_len, direction))
+        return ships
+
+    def search(self, p: int, mask: int, counts: tuple) -> bool:
+        """
+        Recursive helper of exists.
+        :param p: Current block index.
+        :param mask: Blocked bits relative to p.
+        :param counts: Number of ships of each length still to place.
+        :return: True if the remaining ships can be placed.
+        """
+        if not any(counts):
+            return True
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _PlacementSearch.BudgetExceeded()
+        if p == self.num_blocks or self.blocks_needed(counts) > self.free_blocks(p, mask) or \
+                self.area_needed(counts) > self.area_left(p):
+            return False
+        state = (p, mask, counts)
+        if state in self.dead_states:
+            return False
+        if not mask & 1:
+            for length_idx, ship_bits, footprint in self.order[p]:
+                if counts[length_idx] > 0 and not mask & ship_bits:
+                    new_counts = counts[:length_idx] + (counts[length_idx] - 1,) + counts[length_idx + 1:]
+                    self.path.append((p, length_idx, ship_bits))
+                    if self.search(p + 1, (mask | footprint) >> 1, new_counts):
+                        return True
+                    self.path.pop()
+        if self.search(p + 1, mask >> 1, counts):  # Leave the block empty
+            return True
+        self.dead_states.add(state)
+        return False
+
+    def count(self) -> int:
+        """
+        Function to count the arrangements with a forward dynamic program over the blocks, in
+        effect a transfer matrix over row profiles applied one block at a time.
+        :return: Number of arrangements.
+        """
+        states = {(0, self.start_counts): 1}
+        for p in range(self.num_blocks):
+            next_states = defaultdict(int)
+            for (mask, counts), ways in states.items():
+                if self.blocks_needed(counts) > self.free_blocks(p, mask):
+                    continue  # Can't be completed
+                next_states[(mask >> 1, counts)] += ways  # Leave the block empty (or it's blocked)
+                if mask & 1:
+                    continue
+                for length_idx, ship_bits, footprint in self.placements[p]:
+                    if counts[length_idx] > 0 and not mask & ship_bits:
+                        new_counts = counts[:length_idx] + (counts[length_idx] - 1,) + counts[length_idx + 1:]
+                        next_states[((mask | footprint) >> 1, new_counts)] += ways
+            states = next_states
+        return sum(ways for (_, counts), ways in states.items() if not any(counts))
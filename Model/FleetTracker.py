@@ -0,0 +1,180 @@
+import numpy as np
+from Model.BattleshipBoard import BattleshipBoard
+
+
+class FleetTracker:
+    """
+    Class to keep track of what is known about the opponent's fleet while shooting at it:
+    the ship lengths still afloat, the runs of hits belonging to ships that are damaged but not
+    sunk, and the forced locations, i.e. locations every remaining way of completing a damaged
+    ship passes through (for example a run of hits that can only extend one way).
+    It is updated incrementally with each response received, after the response has been
+    applied to the knowledge board.
+    @author sahil1105
+    """
+    # Directions along the x and y axes
+    AXES = [(1, 0), (0, 1)]
+
+    def __init__(self, board_dims: tuple=(10, 10), ship_types: dict={}):
+        """
+        Constructor for the FleetTracker.
+        :param board_dims: Dimensions of the opponent's board.
+        :param ship_types: Dictionary of ship lengths to number of ships of that length in the
+                           opponent's fleet. Defaults to an empty fleet allowing later additions.
+        """
+        self.remaining = {}
+        for ship_len, freq in ship_types.items():
+            self.add_ship(ship_len, freq)
+        # Blocks of the ships sunk so far, no other ship can cover them
+        self.sunk_mask = np.zeros(board_dims, dtype=bool)
+        self.sunk_ships = []
+        # Runs of hits of damaged ships, by run id, and the run id each hit block belongs to
+        self.hit_runs = {}
+        self.cell_run = {}
+        self.forced = {}  # Forced locations of each run
+        self.next_run_id = 0
+
+    def add_ship(self, ship_length: int, freq: int=1):
+        """
+        Utility function to add ships to the fleet being tracked.
+        :param ship_length: Length of the ship
+        :param freq: Number of ships of that length to add.
+        :return: None
+        """
+        self.remaining[ship_length] = self.remaining.get(ship_length, 0) + freq
+
+    def remaining_lengths(self) -> dict:
+        """
+        Utility function to get the ships still afloat.
+        :return: Dictionary of ship lengths to number of ships of that length still afloat.
+        """
+        return {ship_len: freq for ship_len, freq in self.remaining.items() if freq > 0}
+
+    def forced_cells(self) -> set:
+        """
+        Utility function to get the locations that every completion of a damaged ship covers.
+        :return: Set of 2D location tuples.
+        """
+        cells = set()
+        for run_forced in self.forced.values():
+            cells |= run_forced
+        return cells
+
+    def update(self, board: BattleshipBoard, loc: tuple, response: int):
+        """
+        Function to update the fleet knowledge with the response to a strike.
+        Only the runs of hits the strike can affect are re-examined.
+        :param board: The knowledge board, with the response already applied to it.
+        :param loc: 2D location tuple that was struck.
+        :param response: 0: miss, 1: hit, 2: hit and ship destroyed, 3: hit and all ships destroyed.
+                         Any other response is ignored.
+        :return: None
+        """
+        loc = (int(loc[0]), int(loc[1]))
+        if response in [1, 2, 3]:
+            run_id = self.add_hit(loc)
+            if response in [2, 3]:
+                self.sink_run(run_id)
+                runs_to_check = list(self.hit_runs)  # Lengths afloat changed, so any run may be affected
+            else:
+                runs_to_check = self.runs_near(loc)
+        elif response == 0:
+            runs_to_check = self.runs_near(loc)
+        else:
+            return
+        for run_id in runs_to_check:
+            self.forced[run_id] = self.compute_forced(board, self.hit_runs[run_id])
+
+    def add_hit(self, loc: tuple) -> int:
+        """
+        Utility function to add a hit to the runs of hits, merging it with the runs it touches.
+        :param loc: 2D location tuple that was hit.
+        :return: The id of the run the hit now belongs to.
+        """
+        run_id = self.next_run_id
+        self.next_run_id += 1
+        cells = [loc]
+        for dir_ in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            neighbour_run = self.cell_run.get((loc[0] + dir_[0], loc[1] + dir_[1]))
+            if neighbour_run is not None and neighbour_run in self.hit_runs:
+                cells += self.hit_runs.pop(neighbour_run)
+                self.forced.pop(neighbour_run, None)
+        self.hit_runs[run_id] = sorted(cells)
+        for cell in cells:
+            self.cell_run[cell] = run_id
+        return run_id
+
+    def sink_run(self, run_id: int):
+        """
+        Utility function to mark a run of hits as a sunk ship and take it off the fleet afloat.
+        :param run_id: Id of the run that was sunk.
+        :return: None
+        """
+        cells = self.hit_runs.pop(run_id)
+        self.forced.pop(run_id, None)
+        for cell in cells:
+            del self.cell_run[cell]
+            self.sunk_mask[cell] = True
+        if self.remaining.get(len(cells), 0) > 0:
+            self.remaining[len(cells)] -= 1
+        self.sunk_ships.append((len(cells), cells))
+
+    def runs_near(self, loc: tuple) -> list:
+        """
+        Utility function to find the runs of hits whose completions could reach the given location.
+        :param loc: 2D location tuple.
+        :return: List of run ids.
+        """
+        reach = max(self.remaining_lengths(), default=0)
+        near = []
+        for run_id, cells in self.hit_runs.items():
+            if any(abs(x - loc[0]) <= reach and abs(y - loc[1]) <= reach for x, y in cells):
+                near.append(run_id)
+        return near
+
+    def compute_forced(self, board: BattleshipBoard, cells: list) -> set:
+        """
+        Utility function to compute the forced locations of a run of hits. The damaged ship is
+        longer than the run (otherwise it would have been sunk) and must extend over unknown
+        locations, so the forced locations are those covered by every such placement.
+        :param board: The knowledge board.
+        :param cells: Sorted list of the 2D locations of the run.
+        :return: Set of 2D location tuples. Empty if the placements have nothing in common.
+        """
+        lengths = [ship_len for ship_len in self.remaining_lengths() if ship_len > len(cells)]
+        if len(cells) > 1:
+            axes = [(1, 0)] if cells[0][1] == cells[-1][1] else [(0, 1)]
+        else:
+            axes = FleetTracker.AXES
+        common = None
+        for axis in axes:
+            reach = max(lengths, default=0) - len(cells)
+            before = self.open_extent(board, cells[0], (-axis[0], -axis[1]), reach)
+            after = self.open_extent(board, cells[-1], axis, reach)
+            for ship_len in lengths:
+                extra = ship_len - len(cells)
+                # Number of blocks placed before the run, the rest go after it
+                for n_before in range(max(0, extra - after), min(before, extra) + 1):
+                    start = (cells[0][0] - n_before * axis[0], cells[0][1] - n_before * axis[1])
+                    placement = {(start[0] + i * axis[0], start[1] + i * axis[1]) for i in range(ship_len)}
+                    common = placement if common is None else common & placement
+        if common is None:
+            return set()
+        return common - set(cells)
+
+    def open_extent(self, board: BattleshipBoard, loc: tuple, dir_: tuple, limit: int) -> int:
+        """
+        Utility function to count the unknown locations directly following loc in a direction.
+        :param board: The knowledge board.
+        :param loc: 2D location tuple to start from (not counted).
+        :param dir_: Direction to look in.
+        :param limit: Maximum count needed.
+        :return: Number of consecutive unknown locations, at most limit.
+        """
+        count = 0
+        while count < limit:
+            next_loc = (loc[0] + (count + 1) * dir_[0], loc[1] + (count + 1) * dir_[1])
+            if not board.within_bounds(next_loc) or board.board[next_loc] != BattleshipBoard.EMPTY:
+                break
+            count += 1
+        return count
@@ -1,5 +1,6 @@
 from Model.BattleshipBoard import BattleshipBoard
 from Model.Ship import Ship
+from Model.FleetTracker import FleetTracker
 
 
 class Player:
@@ -23,6 +24,8 @@ class Player:
         self.my_ships_counter = {}
         # Dictionary containing mapping from ship length to number of your opponent's ships of that length
         self.opp_ships_counter = {}
+        # Knowledge about which of the opponent's ships are still afloat, updated with every response
+        self.opp_fleet = FleetTracker(game_board_dims)
 
     def add_my_ship(self, ship: Ship) -> bool:
         """
@@ -46,3 +49,32 @@ class Player:
         if ship_length not in self.opp_ships_counter:  # Update known ship types and frequency of opponent's fleet
             self.opp_ships_counter[ship_length] = 0
         self.opp_ships_counter[ship_length] += 1
+        self.opp_fleet.add_ship(ship_length)
+
+    def respond_to_opp_move(self, move: tuple) -> int:
+        """
+        Utility function to execute an opponent's move on your board.
+        :param move: 2D location tuple the opponent struck.
+        :return: The response to send back, see BattleshipBoard.respond_to_move.
+        """
+        return self.my_board.respond_to_move(move)
+
+    def record_response(self, move: tuple, response: int) -> bool:
+        """
+        Utility function to apply the opponent's response to one of your moves to the opponent's
+        board and to the knowledge about the opponent's fleet.
+        :param move: 2D location tuple that was struck.
+        :param response: 0: miss, 1: hit, 2: hit and ship destroyed, 3: hit and all ships destroyed.
+        :return: True if the response was valid and applied, False otherwise.
+        """
+        if not self.opp_board.within_bounds(move):
+            return False
+        if response in [1, 2, 3]:  # Hit a ship
+            self.opp_board.mark_ship_hit(move)
+            self.opp_board.update_redundant_squares(move, response != 1)
+        elif response == 0:  # Missed
+            self.opp_board.mark_ship_miss(move)
+        else:
+            return False
+        self.opp_fleet.update(self.opp_board, move, response)
+        return True
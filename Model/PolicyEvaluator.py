@@ -0,0 +1,175 @@
+import numpy as np
+from random import Random
+from numpy.lib.stride_tricks import sliding_window_view
+from Model.BattleshipBoard import BattleshipBoard
+from Model.FleetTracker import FleetTracker
+from Model.Targeter import Targeter
+
+
+# Per-block channels of the local window features
+CHANNEL_UNKNOWN = 0
+CHANNEL_HIT = 1
+CHANNEL_BLOCKED = 2  # Missed, redundant or off the board
+NUM_CHANNELS = 3
+
+
+def feature_count(radius: int=1) -> int:
+    """
+    Utility function to get the number of features extract_features produces per location.
+    :param radius: Radius of the local window around each location.
+    :return: Number of features per location.
+    """
+    side = 2 * radius + 1
+    return NUM_CHANNELS * side * side + 3
+
+
+def extract_features(boards: np.ndarray, radius: int=1) -> np.ndarray:
+    """
+    Utility function to turn a stack of knowledge boards into per-location feature vectors.
+    The features of a location are the unknown/hit/blocked indicators of every block in the
+    (2*radius+1) x (2*radius+1) window centred on it (blocks off the board count as blocked),
+    followed by the normalized distances to the closest horizontal and vertical edges and a
+    constant bias of 1. No Python loop runs over the locations.
+    :param boards: Knowledge board array of shape (rows, cols) or a stack of shape (n, rows, cols).
+    :param radius: Radius of the local window around each location.
+    :return: float32 array of shape (n, rows, cols, feature_count(radius)).
+    """
+    boards = np.asarray(boards)
+    if boards.ndim == 2:
+        boards = boards[np.newaxis]
+    n, rows, cols = boards.shape
+    side = 2 * radius + 1
+    # Indicator planes with a border of blocked locations around the board
+    planes = np.zeros((n, rows + 2 * radius, cols + 2 * radius, NUM_CHANNELS), dtype=np.float32)
+    planes[..., CHANNEL_BLOCKED] = 1
+    inner = planes[:, radius:radius + rows, radius:radius + cols]
+    inner[..., CHANNEL_UNKNOWN] = boards == BattleshipBoard.EMPTY
+    inner[..., CHANNEL_HIT] = boards == BattleshipBoard.SHIP_HIT
+    inner[..., CHANNEL_BLOCKED] = (boards != BattleshipBoard.EMPTY) & (boards != BattleshipBoard.SHIP_HIT)
+
+    features = np.empty((n, rows, cols, feature_count(radius)), dtype=np.float32)
+    windows = sliding_window_view(planes, (side, side), axis=(1, 2))  # (n, rows, cols, channels, side, side)
+    features[..., :NUM_CHANNELS * side * side] = windows.reshape(n, rows, cols, -1)
+    edge_x = np.minimum(np.arange(rows), np.arange(rows)[::-1]) / max(rows - 1, 1)
+    edge_y = np.minimum(np.arange(cols), np.arange(cols)[::-1]) / max(cols - 1, 1)
+    features[..., -3] = edge_x[:, np.newaxis]
+    features[..., -2] = edge_y[np.newaxis, :]
+    features[..., -1] = 1
+    return features
+
+
+class PolicyModel:
+    """
+    Class to represent a learned targeting policy: a linear model or a small MLP (ReLU hidden
+    layers) scoring every location of a knowledge board from its extract_features vector.
+    Models are trained offline; this class only runs the batched forward pass on the CPU.
+    @author sahil1105
+    """
+    # Number of boards pushed through the network at once, bounds the memory used by score
+    CHUNK_SIZE = 2048
+
+    def __init__(self, layers: list, radius: int=1):
+        """
+        Constructor for the PolicyModel.
+        :param layers: List of (weights, bias) tuples, weights of shape (inputs, outputs). The
+                       first layer must take feature_count(radius) inputs and the last one must
+                       have a single output. A single layer gives a linear policy.
+        :param radius: Radius of the local window the features are extracted with.
+        """
+        if len(layers) == 0:
+            raise ValueError("A policy needs at least one layer.")
+        self.radius = radius
+        self.layers = [(np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32).reshape(-1))
+                       for w, b in layers]
+        expected_inputs = feature_count(radius)
+        for weights, bias in self.layers:
+            if weights.ndim != 2 or weights.shape[0] != expected_inputs or bias.shape[0] != weights.shape[1]:
+                raise ValueError("Layer shapes do not line up.")
+            expected_inputs = weights.shape[1]
+        if expected_inputs != 1:
+            raise ValueError("The last layer must have a single output.")
+
+    def score(self, boards: np.ndarray) -> np.ndarray:
+        """
+        Function to score every location of a stack of knowledge boards.
+        Locations which are not unknown get a score of -inf.
+        :param boards: Knowledge board array of shape (rows, cols) or a stack of shape (n, rows, cols).
+        :return: float32 array of shape (n, rows, cols).
+        """
+        boards = np.asarray(boards)
+        if boards.ndim == 2:
+            boards = boards[np.newaxis]
+        scores = np.empty(boards.shape, dtype=np.float32)
+        for start in range(0, boards.shape[0], self.CHUNK_SIZE):
+            chunk = boards[start:start + self.CHUNK_SIZE]
+            activations = extract_features(chunk, self.radius).reshape(-1, feature_count(self.radius))
+            for weights, bias in self.layers[:-1]:
+                activations = np.maximum(activations @ weights + bias, 0)
+            weights, bias = self.layers[-1]
+            scores[start:start + self.CHUNK_SIZE] = (activations @ weights + bias).reshape(chunk.shape)
+        scores[boards != BattleshipBoard.EMPTY] = -np.inf
+        return scores
+
+    def choose_moves(self, boards: np.ndarray) -> np.ndarray:
+        """
+        Function to choose the best location to strike on every board of a stack.
+        Ties are broken towards the first location in row-major order.
+        :param boards: Knowledge board array of shape (rows, cols) or a stack of shape (n, rows, cols).
+        :return: int array of shape (n, 2) containing the chosen location of each board.
+        """
+        scores = self.score(boards)
+        flat_idx = scores.reshape(scores.shape[0], -1).argmax(axis=1)
+        return np.stack(np.unravel_index(flat_idx, scores.shape[1:]), axis=1)
+
+    def save(self, path: str):
+        """
+        Utility function to save the policy as a compressed .npz file.
+        :param path: File to save to.
+        :return: None
+        """
+        arrays = {"radius": np.array(self.radius)}
+        for idx, (weights, bias) in enumerate(self.layers):
+            arrays["W{}".format(idx)] = weights
+            arrays["b{}".format(idx)] = bias
+        np.savez_compressed(path, **arrays)
+
+
+def load_policy(path: str) -> PolicyModel:
+    """
+    Utility function to load a policy saved with PolicyModel.save.
+    The file holds the window radius and the arrays W0, b0, W1, b1, ... in layer order.
+    :param path: .npz file to load.
+    :return: The loaded PolicyModel.
+    """
+    with np.load(path) as data:
+        layers = []
+        while "W{}".format(len(layers)) in data:
+            idx = len(layers)
+            layers.append((data["W{}".format(idx)], data["b{}".format(idx)]))
+        return PolicyModel(layers, int(data["radius"]))
+
+
+class PolicyTargeter(Targeter):
+    """
+    Targeter which strikes the location a learned PolicyModel scores highest.
+    @author sahil1105
+    """
+    def __init__(self, model: PolicyModel, ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}, rng: Random=None,
+                 fleet: FleetTracker=None):
+        """
+        Constructor for the PolicyTargeter.
+        :param model: The policy to evaluate.
+        :param ship_types: Dictionary of ship lengths to number of ships of that length in the opponent's fleet.
+        :param rng: Random instance used for tie-breaking.
+        :param fleet: Optional FleetTracker of the opponent's fleet. Not used by the policy features.
+        """
+        Targeter.__init__(self, ship_types, rng, fleet)
+        self.model = model
+
+    def score_cells(self, board: BattleshipBoard) -> np.ndarray:
+        """
+        Scores the locations with the policy.
+        :param board: Knowledge board of the opponent.
+        :return: Float array of the same shape as the board.
+        """
+        return self.model.score(board.board)[0]
@@ -0,0 +1,251 @@
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from Model.BattleshipBoard import BattleshipBoard
+from Model.Player import Player
+from Model.RefereeBoard import RefereeBoard
+
+
+# Environment variable turning profiling on for the command line tools:
+# unset, "" or "0" leaves it off, "alloc" also tracks allocations, anything else only times calls.
+ENV_VAR = "BATTLESHIP_PROFILE"
+# Classes whose methods are instrumented by default
+PROFILED_CLASSES = [BattleshipBoard, RefereeBoard, Player]
+
+
+class MethodStats:
+    """
+    Class to accumulate the measurements of one instrumented method.
+    Recursive calls (e.g. ship_destroyed) are counted, but only the outermost call adds to the
+    times and allocations, so nothing is counted twice.
+    @author sahil1105
+    """
+    def __init__(self):
+        """
+        Constructor for MethodStats.
+        """
+        self.clear()
+
+    def clear(self):
+        """
+        Utility function to forget all measurements.
+        :return: None
+        """
+        self.calls = 0
+        self.total_time = 0.0  # Seconds
+        self.max_time = 0.0  # Seconds
+        self.alloc_bytes = 0  # Net bytes still allocated when the calls returned, if tracked
+
+    def add_call(self, elapsed: float, alloc_bytes: int=0):
+        """
+        Utility function to add the measurements of an outermost call.
+        :param elapsed: Wall time of the call, in seconds.
+        :param alloc_bytes: Net bytes allocated by the call.
+        :return: None
+        """
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.alloc_bytes += alloc_bytes
+
+    def merge(self, data: dict):
+        """
+        Utility function to add the measurements of another process, as given by its to_dict.
+        :param data: Dictionary from MethodStats.to_dict.
+        :return: None
+        """
+        self.calls += data["calls"]
+        self.total_time += data["total_time"]
+        self.max_time = max(self.max_time, data["max_time"])
+        self.alloc_bytes += data["alloc_bytes"]
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable description of the stats.
+        :return: Dictionary describing the stats.
+        """
+        return {"calls": self.calls, "total_time": self.total_time, "max_time": self.max_time,
+                "alloc_bytes": self.alloc_bytes}
+
+
+class Profiler:
+    """
+    Class to instrument the methods of the Model classes. Nothing is patched until enable() is
+    called (or the profiler is entered as a context manager): the instrumented methods are then
+    swapped onto the classes, and disable() puts the original functions back, so a disabled
+    profiler costs nothing. Only one profiler can be enabled at a time.
+    @author sahil1105
+    """
+    def __init__(self, classes: list=None, track_allocations: bool=False):
+        """
+        Constructor for Profiler.
+        :param classes: Classes whose methods to instrument. Defaults to PROFILED_CLASSES.
+        :param track_allocations: Whether to also measure allocations with tracemalloc (much slower).
+        """
+        self.classes = list(classes) if classes is not None else list(PROFILED_CLASSES)
+        self.track_allocations = track_allocations
+        self.stats = {}  # Qualified method name -> MethodStats
+        self._originals = []  # (class, attribute name, original function) of the patched methods
+        self._local = threading.local()  # Per thread recursion depth of every method
+        self._started_tracemalloc = False
+
+    def enable(self):
+        """
+        Function to swap the instrumented methods onto the classes.
+        :return: None
+        :raises RuntimeError: If another profiler is already enabled.
+        """
+        global _active
+        if self.enabled():
+            return
+        if _active is not None:
+            raise RuntimeError("Another profiler is already enabled.")
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        for cls in self.classes:
+            for attr, value in list(vars(cls).items()):
+                if isinstance(value, types.FunctionType) and not attr.startswith("__"):
+                    name = "{}.{}".format(cls.__name__, attr)
+                    self.stats.setdefault(name, MethodStats())
+                    self._originals.append((cls, attr, value))
+                    setattr(cls, attr, self._instrument(name, value))
+        _active = self
+
+    def disable(self):
+        """
+        Function to restore the original methods. The collected stats are kept.
+        :return: None
+        """
+        global _active
+        for cls, attr, value in reversed(self._originals):
+            setattr(cls, attr, value)
+        self._originals = []
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if _active is self:
+            _active = None
+
+    def enabled(self) -> bool:
+        """
+        Utility function to check if the instrumented methods are in place.
+        :return: True if enabled, False otherwise.
+        """
+        return len(self._originals) > 0
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disable()
+
+    def reset(self):
+        """
+        Utility function to clear the collected stats.
+        :return: None
+        """
+        for stats in self.stats.values():  # Cleared in place, the instrumented methods hold on to them
+            stats.clear()
+
+    def _instrument(self, name: str, func):
+        """
+        Utility function to wrap a function so its calls are measured.
+        :param name: Qualified method name to record the calls under.
+        :param func: The original function.
+        :return: The instrumented function.
+        """
+        stats = self.stats[name]
+        local = self._local
+        track_allocations = self.track_allocations
+
+        @functools.wraps(func)
+        def instrumented(*args, **kwargs):
+            depths = local.__dict__.setdefault("depths", {})
+            depth = depths.get(name, 0)
+            stats.calls += 1
+            if depth > 0:  # Recursive call, measured as part of the outermost one
+                depths[name] = depth + 1
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    depths[name] = depth
+            depths[name] = 1
+            before = tracemalloc.get_traced_memory()[0] if track_allocations else 0
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                after = tracemalloc.get_traced_memory()[0] if track_allocations else 0
+                depths[name] = 0
+                stats.add_call(elapsed, after - before)
+        return instrumented
+
+    def snapshot(self) -> dict:
+        """
+        Function to get the stats of every method that was called, e.g. for a tournament or a
+        server to export.
+        :return: Dictionary of qualified method name to MethodStats.to_dict output.
+        """
+        return {name: stats.to_dict() for name, stats in self.stats.items() if stats.calls > 0}
+
+    def merge(self, snapshot: dict):
+        """
+        Function to add the snapshot of a profiler in another process, e.g. a tournament worker.
+        :param snapshot: Dictionary from snapshot.
+        :return: None
+        """
+        for name, data in snapshot.items():
+            self.stats.setdefault(name, MethodStats()).merge(data)
+
+    def report(self, sort_by: str="total_time", limit: int=None) -> str:
+        """
+        Function to format the stats as a table, the most expensive methods first.
+        :param sort_by: Key of MethodStats.to_dict to sort by.
+        :param limit: Maximum number of methods to list. None lists all of them.
+        :return: The report.
+        """
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1][sort_by], reverse=True)[:limit]
+        lines = ["{:<44} {:>10} {:>12} {:>12} {:>12} {:>12}".format("method", "calls", "total ms", "per call us",
+                                                                     "max us", "alloc B")]
+        for name, stats in rows:
+            lines.append("{:<44} {:>10} {:>12.2f} {:>12.2f} {:>12.2f} {:>12}".format(
+                name, stats["calls"], stats["total_time"] * 1e3, stats["total_time"] / stats["calls"] * 1e6,
+                stats["max_time"] * 1e6, stats["alloc_bytes"] if self.track_allocations else "-"))
+        return "\n".join(lines)
+
+
+# The enabled profiler, if any
+_active = None
+
+
+def active_profiler() -> Profiler:
+    """
+    Utility function to get the enabled profiler, so its snapshot can be exported.
+    :return: The enabled Profiler, or None if profiling is off.
+    """
+    return _active
+
+
+def enable_from_env(stream=None) -> Profiler:
+    """
+    Function for command line tools to turn profiling on if the BATTLESHIP_PROFILE environment
+    variable asks for it. The report is written out when the process exits.
+    Only the calling process is profiled, unless the profiler is handed to run_tournament or a
+    TournamentCoordinator, which merge the snapshots of their workers into it.
+    :param stream: Where to write the report. Defaults to stderr.
+    :return: The enabled Profiler, or None if profiling is off.
+    """
+    setting = os.environ.get(ENV_VAR, "")
+    if setting in ["", "0"]:
+        return None
+    profiler = Profiler(track_allocations=setting == "alloc")
+    profiler.enable()
+    atexit.register(lambda: print(profiler.report(), file=stream if stream is not None else sys.stderr))
+    return profiler
@@ -0,0 +1,93 @@
+import numpy as np
+from Model.BattleshipBoard import BattleshipBoard
+from Model.Ship import get_ship_blocks
+
+
+class RefereeBoard(BattleshipBoard):
+    """
+    Class to represent a fleet held by a referee rather than by its player, who resolves every
+    shot at it and tells the shooter only what changed on the shooter's knowledge board.
+    A shot is resolved with hit and update_redundant_squares like respond_to_move, but sinking
+    and losing are tracked incrementally instead of searched for: every ship block knows the
+    index of its ship, every ship the number of its blocks still afloat, and the board the
+    number of ships afloat. A shot therefore costs O(length of the ship hit), independent of
+    the size of the board, where all_ships_destroyed scans all of it.
+    The knowledge board deltas are the blocks the marking helpers change while resolving a
+    shot: the struck block and the blocks made redundant, the same blocks respond_to_move's
+    caller marks on its copy of the opponent's board.
+    @author sahil1105
+    """
+    def __init__(self, board_dims: tuple=(10, 10), ships: list=[]):
+        """
+        Constructor for RefereeBoard. index_fleet must be called once the fleet is placed.
+        :param board_dims: Dimensions of the board.
+        :param ships: List of Ship objects to add to the board.
+        """
+        super().__init__(board_dims, ships)
+        self.ship_index = None  # Index of the ship on each block, -1 for none
+        self.afloat_blocks = []  # Blocks not hit yet of each ship
+        self.ships_afloat = 0
+        self.deltas = None  # List of (location, state) changed by the shot being resolved
+
+    def index_fleet(self):
+        """
+        Function to index the ships on the board, once, before the first shot.
+        :return: None
+        """
+        self.ship_index = np.full(self.board.shape, -1, dtype=np.int16)  # Small, a server holds many boards
+        self.afloat_blocks = []
+        for ship in self.get_ships():
+            blocks = get_ship_blocks(ship.start_loc, ship.length, ship.direction)
+            for block in blocks:
+                self.ship_index[block] = len(self.afloat_blocks)
+            self.afloat_blocks.append(sum(1 for block in blocks if self.board[block] == BattleshipBoard.SHIP))
+        self.ships_afloat = sum(1 for blocks in self.afloat_blocks if blocks > 0)
+
+    def resolve(self, loc: tuple) -> tuple:
+        """
+        Function to resolve a shot at the fleet.
+        :param loc: 2D location tuple struck.
+        :return: (response, deltas) tuple. The response is as of respond_to_move, the deltas a
+                 list of (location, new state) of the shooter's knowledge board, empty for an
+                 invalid shot.
+        """
+        self.deltas = []
+        try:
+            response = self.hit(loc)
+            if response == 1:
+                ship = self.ship_index[loc]
+                self.afloat_blocks[ship] -= 1
+                sunk = self.afloat_blocks[ship] == 0
+                self.update_redundant_squares(loc, sunk)
+                if sunk:
+                    self.ships_afloat -= 1
+                    response = 3 if self.ships_afloat == 0 else 2
+            return response, self.deltas
+        finally:
+            self.deltas = None
+
+    def all_ships_destroyed(self) -> bool:
+        """
+        Utility function to check if all the ships on the board have been destroyed, in O(1) once indexed.
+        :return: True if all ships destroyed, False otherwise.
+        """
+        if self.ship_index is None:
+            return super().all_ships_destroyed()
+        return self.ships_afloat == 0
+
+    def mark_ship_hit(self, loc: tuple):
+        super().mark_ship_hit(loc)
+        if self.deltas is not None:
+            self.deltas.append((loc, BattleshipBoard.SHIP_HIT))
+
+    def mark_ship_miss(self, loc: tuple):
+        super().mark_ship_miss(loc)
+        if self.deltas is not None:
+            self.deltas.append((loc, BattleshipBoard.EMPTY_HIT))
+
+    def mark_redundant_helper(self, loc: tuple):
+        if self.deltas is None:
+            super().mark_redundant_helper(loc)
+        elif self.within_bounds(loc) and self.board[loc] == BattleshipBoard.EMPTY:
+            self.board[loc] = BattleshipBoard.REDUNDANT
+            self.deltas.append((loc, BattleshipBoard.REDUNDANT))
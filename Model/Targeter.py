@@ -0,0 +1,188 @@
+import numpy as np
+from random import Random
+from numpy.lib.stride_tricks import sliding_window_view
+from Model.BattleshipBoard import BattleshipBoard
+from Model.FleetTracker import FleetTracker
+
+
+class Targeter:
+    """
+    Base class for the automated targeting strategies (bots).
+    A targeter looks at a knowledge board, i.e. the board a player keeps about the opponent's
+    fleet (Player.opp_board), and chooses the next location to strike. Knowledge boards only ever
+    contain EMPTY (unknown), SHIP_HIT, EMPTY_HIT and REDUNDANT blocks.
+    @author sahil1105
+    """
+    def __init__(self, ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}, rng: Random=None, fleet: FleetTracker=None):
+        """
+        Constructor for the Targeter.
+        :param ship_types: Dictionary of ship lengths to number of ships of that length in the opponent's fleet.
+        :param rng: Random instance used for tie-breaking. Defaults to a fresh unseeded Random.
+        :param fleet: Optional FleetTracker of the opponent's fleet (e.g. Player.opp_fleet). When given,
+                      targeters which reason about placements use it instead of ship_types.
+        """
+        self.ship_types = ship_types.copy()
+        self.rng = rng if rng is not None else Random()
+        self.fleet = fleet
+
+    def score_cells(self, board: BattleshipBoard) -> np.ndarray:
+        """
+        Function to score every location of the knowledge board. Higher is better.
+        :param board: Knowledge board of the opponent.
+        :return: Float array of the same shape as the board.
+        """
+        raise NotImplementedError
+
+    def choose_move(self, board: BattleshipBoard) -> tuple:
+        """
+        Function to choose the next location to strike.
+        :param board: Knowledge board of the opponent.
+        :return: 2D location tuple, or None if there is no location left to strike.
+        """
+        return pick_best_cell(self.score_cells(board), board.board, self.rng)
+
+
+class RandomTargeter(Targeter):
+    """
+    Targeter which strikes a uniformly random location that has not been hit or marked redundant.
+    @author sahil1105
+    """
+    def score_cells(self, board: BattleshipBoard) -> np.ndarray:
+        """
+        All unknown locations score the same, so the tie-break picks one at random.
+        :param board: Knowledge board of the opponent.
+        :return: Float array of the same shape as the board.
+        """
+        return (board.board == BattleshipBoard.EMPTY).astype(float)
+
+
+class DensityTargeter(Targeter):
+    """
+    Targeter which counts, for every location, the number of ways the opponent's ships could be
+    placed over it given what is known so far, and strikes the location with the highest count.
+    Placements covering unresolved hits are weighted up so that a damaged ship gets finished off.
+    With a FleetTracker, only the ships still afloat are counted, sunk ships are excluded from
+    every placement and forced locations are struck first.
+    @author sahil1105
+    """
+    # Extra weight given to a placement for each known hit it covers
+    HIT_WEIGHT = 20
+
+    def score_cells(self, board: BattleshipBoard) -> np.ndarray:
+        """
+        Scores the locations by their placement density.
+        :param board: Knowledge board of the opponent.
+        :return: Float array of the same shape as the board.
+        """
+        if self.fleet is None:
+            return placement_density(board.board, self.ship_types, self.HIT_WEIGHT)[0]
+        scores = placement_density(board.board, self.fleet.remaining_lengths(), self.HIT_WEIGHT,
+                                   self.fleet.sunk_mask)[0]
+        for loc in self.fleet.forced_cells():
+            scores[loc] = np.inf
+        return scores
+
+
+def placement_density(boards: np.ndarray, ship_types: dict, hit_weight: float=DensityTargeter.HIT_WEIGHT,
+                      closed: np.ndarray=None) -> np.ndarray:
+    """
+    Utility function to compute the placement density of a stack of knowledge boards at once.
+    A placement of a ship of length L is a horizontal or vertical run of L locations which are
+    either unknown or hit, and which is not directly continued by another hit (the ship would
+    then be longer than L). Every placement adds (1 + hit_weight * hits covered) * frequency to
+    each location it covers. Locations which are not unknown always get a density of 0.
+    :param boards: Knowledge board array of shape (rows, cols) or a stack of shape (n, rows, cols).
+    :param ship_types: Dictionary of ship lengths to number of ships of that length still afloat.
+    :param hit_weight: Extra weight given to a placement for each hit it covers.
+    :param closed: Optional boolean array broadcastable to boards, marking additional locations
+                   no placement may cover (e.g. the blocks of ships already sunk).
+    :return: Float array of shape (n, rows, cols).
+    """
+    boards = np.asarray(boards)
+    if boards.ndim == 2:
+        boards = boards[np.newaxis]
+    hits = boards == BattleshipBoard.SHIP_HIT
+    open_ = (boards == BattleshipBoard.EMPTY) | hits
+    if closed is not None:
+        open_ &= ~closed
+        hits &= ~closed
+    density = np.zeros(boards.shape, dtype=float)
+    for ship_len, freq in ship_types.items():
+        if freq <= 0:
+            continue
+        placements = [run_placements(open_, hits, ship_len, axis) for axis in (1, 2)]
+        if ship_len == 1:  # A single block is the same placement both ways, so both checks must pass
+            placements = [(placements[0][0] & placements[1][0], placements[0][1], 1)]
+        for fits, covered_hits, axis in placements:
+            weight = fits * (1 + hit_weight * covered_hits) * freq
+            span = weight.shape[axis]
+            for offset in range(ship_len):  # Add the placement weight to each block it covers
+                target = [slice(None)] * 3
+                target[axis] = slice(offset, offset + span)
+                density[tuple(target)] += weight
+    density[boards != BattleshipBoard.EMPTY] = 0
+    return density
+
+
+def run_placements(open_: np.ndarray, hits: np.ndarray, ship_len: int, axis: int) -> tuple:
+    """
+    Utility function to find the valid placements of a ship along one axis of a stack of boards.
+    :param open_: Boolean array of shape (n, rows, cols) of the locations a ship may cover.
+    :param hits: Boolean array of shape (n, rows, cols) of the known hits.
+    :param ship_len: Length of the ship to place.
+    :param axis: 1 for placements along the rows, 2 for placements along the columns.
+    :return: (fits, covered_hits, axis) where fits[k, x, y] tells whether a placement starting at
+             (x, y) is valid and covered_hits[k, x, y] is the number of hits it covers.
+    """
+    span = open_.shape[axis] - ship_len + 1
+    if span <= 0:
+        shape = list(open_.shape)
+        shape[axis] = 0
+        return np.zeros(shape, dtype=bool), np.zeros(shape, dtype=int), axis
+    fits = sliding_window_view(open_, ship_len, axis=axis).all(axis=-1)
+    covered_hits = sliding_window_view(hits, ship_len, axis=axis).sum(axis=-1)
+    # A hit right before or right after the run means the run is not a whole ship
+    padded = np.pad(hits, [(1, 1) if ax == axis else (0, 0) for ax in range(3)])
+    fits &= ~np.take(padded, np.arange(span), axis=axis)
+    fits &= ~np.take(padded, np.arange(ship_len + 1, ship_len + 1 + span), axis=axis)
+    return fits, covered_hits, axis
+
+
+def pick_best_cell(scores: np.ndarray, board: np.ndarray, rng: Random) -> tuple:
+    """
+    Utility function to pick the unknown location with the highest score, breaking ties at random.
+    :param scores: Float array of location scores.
+    :param board: Knowledge board array the scores belong to.
+    :param rng: Random instance used for tie-breaking.
+    :return: 2D location tuple, or None if there are no unknown locations left.
+    """
+    scores = np.where(board == BattleshipBoard.EMPTY, scores, -np.inf)
+    best = scores.max()
+    if best == -np.inf:
+        return None
+    candidates = np.flatnonzero(scores == best)
+    idx = candidates[rng.randrange(len(candidates))]
+    return tuple(int(v) for v in np.unravel_index(idx, board.shape))
+
+
+# Targeters which can be built from their name alone
+TARGETERS = {'random': RandomTargeter, 'density': DensityTargeter}
+
+
+def make_targeter(spec: str, ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}, rng: Random=None,
+                  fleet: FleetTracker=None) -> Targeter:
+    """
+    Utility function to build a targeter from a strategy description, as used on the command line.
+    :param spec: A name from TARGETERS, or 'policy:<path>' for a PolicyTargeter with the weights at path.
+    :param ship_types: Dictionary of ship lengths to number of ships of that length in the opponent's fleet.
+    :param rng: Random instance used for tie-breaking.
+    :param fleet: Optional FleetTracker of the opponent's fleet.
+    :return: The targeter.
+    :raises ValueError: If the strategy is unknown.
+    """
+    if spec.startswith('policy:'):
+        from Model.PolicyEvaluator import PolicyTargeter, load_policy  # Imports this module
+        return PolicyTargeter(load_policy(spec[len('policy:'):]), ship_types, rng, fleet)
+    if spec not in TARGETERS:
+        raise ValueError("Unknown strategy: {}".format(spec))
+    return TARGETERS[spec](ship_types, rng, fleet)
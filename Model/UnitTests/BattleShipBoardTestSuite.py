@@ -172,10 +172,15 @@ class TestBattleshipBoard(unittest.TestCase):
         assert self.gameboard.board[0][3] == 0
 
     def test_get_random_board(self):
-
-        # self.gameboard.generate_random_board()
-        for _ in range(1):
-            temp = np.unique(self.gameboard.board, return_counts=True)
+        """
+        Check the functionality of the generate_random_board function, including fleets which don't fit.
+        :return: None
+        """
+        self.gameboard.generate_random_board({3: 1, 2: 1, 1: 2})
+        temp = np.unique(self.gameboard.board, return_counts=True)
+        assert dict(zip(temp[0].tolist(), temp[1].tolist()))[BattleshipBoard.SHIP] == 7  # All blocks placed
+        with self.assertRaises(ValueError):
+            self.gameboard.generate_random_board()  # Default fleet doesn't fit on a 5x5 board
 
     def test_str(self):
         """
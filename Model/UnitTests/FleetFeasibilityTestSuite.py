@@ -0,0 +1,90 @@
+import unittest
+import time
+from random import Random
+from Model.FleetFeasibility import *
+from Model.BattleshipBoard import BattleshipBoard
+from Model.Ship import Ship
+
+
+class TestFleetFeasibility(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the fleet feasibility checker and arrangement counter.
+    @author sahil1105
+    """
+    def brute_force_count(self, board_dims: tuple, ship_types: dict) -> int:
+        """
+        Helper to count arrangements by trying every placement with BattleshipBoard.add_ship.
+        :param board_dims: Dimensions of the board.
+        :param ship_types: Dictionary of ship lengths to number of ships of that length.
+        :return: Number of distinct arrangements.
+        """
+        lengths = sorted([ship_len for ship_len, freq in ship_types.items() for _ in range(freq)], reverse=True)
+        arrangements = set()
+
+        def place(board, idx):
+            if idx == len(lengths):
+                arrangements.add(board.board.tobytes())
+                return
+            for x in range(board_dims[0]):
+                for y in range(board_dims[1]):
+                    for dir_ in [(1, 0), (0, 1)]:
+                        ship = Ship((x, y), lengths[idx], dir_)
+                        if board.add_ship(ship):
+                            place(board, idx + 1)
+                            board.remove_ship(ship)
+
+        place(BattleshipBoard(board_dims), 0)
+        return len(arrangements)
+
+    def test_count_arrangements(self):
+        """
+        Test the arrangement counter against brute force on small boards.
+        :return: None
+        """
+        for board_dims, ship_types in [((3, 3), {1: 2}), ((3, 4), {2: 1, 1: 2}), ((4, 3), {2: 2, 1: 1}),
+                                       ((4, 4), {3: 1, 1: 2}), ((2, 2), {1: 2})]:
+            assert count_arrangements(board_dims, ship_types) == self.brute_force_count(board_dims, ship_types)
+        assert count_arrangements((5, 6), {4: 1, 3: 1}) == count_arrangements((6, 5), {3: 1, 4: 1})  # Symmetry
+        with self.assertRaises(ValueError):
+            count_arrangements((10, 10), {4: 1, 3: 2, 2: 3, 1: 4})  # Too wide by default
+
+    def test_is_feasible(self):
+        """
+        Test the feasibility checker on fitting and non fitting fleets.
+        :return: None
+        """
+        assert is_feasible((10, 10), {4: 1, 3: 2, 2: 3, 1: 4}) is True
+        assert is_feasible((7, 7), {4: 1, 3: 2, 2: 3, 1: 4}) is True
+        assert is_feasible((6, 6), {4: 1, 3: 2, 2: 3, 1: 4}) is False
+        assert is_feasible((2, 2), {1: 2}) is False  # Ships would touch diagonally
+        assert is_feasible((3, 10), {11: 1}) is False  # Too long
+        assert is_feasible((4, 4), {}) is True
+        assert is_feasible((30, 30), {5: 10, 4: 20, 3: 20}) is True
+
+    def test_tight_fleets(self):
+        """
+        Test that tightly packed fleets are answered quickly, with a valid arrangement when
+        feasible, and that generate_random_board places them.
+        :return: None
+        """
+        for board_dims, ship_types in [((10, 10), {4: 6, 3: 6}), ((10, 10), {4: 5, 3: 5, 2: 5}),
+                                       ((8, 11), {4: 6, 3: 4})]:
+            start = time.perf_counter()
+            assert is_feasible(board_dims, ship_types) is True
+            assert time.perf_counter() - start < 1.0
+            board = BattleshipBoard(board_dims)
+            for start_loc, length, direction in find_arrangement(board_dims, ship_types):
+                assert board.add_ship(Ship(start_loc, length, direction))
+            start = time.perf_counter()
+            board.generate_random_board(ship_types, Random(0))
+            assert time.perf_counter() - start < 2.0
+            assert sorted(ship.length for ship in board.get_ships()) == \
+                sorted(length for length, freq in ship_types.items() for _ in range(freq))
+        start = time.perf_counter()
+        assert is_feasible((10, 10), {4: 6, 3: 7}) in [True, False, None]  # Too tight to decide in time
+        assert time.perf_counter() - start < 1.0
+        assert find_arrangement((6, 6), {4: 1, 3: 2, 2: 3, 1: 4}) is None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from Model.FleetTracker import *
+
+
+class TestFleetTracker(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the FleetTracker class including the tracking of the
+    ships afloat, the runs of hits and the forced locations.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Initialize a 5x5 knowledge board and a tracker for a fleet of one
+        ship of length 3 and two ships of length 1.
+        :return: None
+        """
+        self.board = BattleshipBoard((5, 5))
+        self.tracker = FleetTracker((5, 5), {3: 1, 1: 2})
+
+    def strike(self, loc: tuple, response: int):
+        """
+        Helper to apply a response to the knowledge board and the tracker, like Player.record_response.
+        :param loc: 2D location tuple struck.
+        :param response: Response received.
+        :return: None
+        """
+        if response == 0:
+            self.board.mark_ship_miss(loc)
+        else:
+            self.board.mark_ship_hit(loc)
+            self.board.update_redundant_squares(loc, response != 1)
+        self.tracker.update(self.board, loc, response)
+
+    def test_sink_updates_remaining(self):
+        """
+        Test that sinking ships takes them off the fleet afloat.
+        :return: None
+        """
+        self.strike((4, 4), 2)
+        assert self.tracker.remaining_lengths() == {3: 1, 1: 1}
+        assert self.tracker.sunk_mask[4, 4]
+        self.strike((0, 0), 1)
+        self.strike((0, 1), 1)
+        assert len(self.tracker.hit_runs) == 1  # The two hits were merged into one run
+        self.strike((0, 2), 2)
+        assert self.tracker.remaining_lengths() == {1: 1}
+        assert self.tracker.hit_runs == {}
+
+    def test_forced_cells(self):
+        """
+        Test that a run of hits which can only extend one way forces that location.
+        :return: None
+        """
+        self.strike((0, 0), 1)
+        self.strike((0, 1), 1)
+        assert self.tracker.forced_cells() == {(0, 2)}  # Edge of the board on the other side
+        self.tracker = FleetTracker((5, 5), {3: 1, 1: 2})
+        self.board = BattleshipBoard((5, 5))
+        self.strike((2, 2), 1)
+        assert self.tracker.forced_cells() == set()  # Could still go any way
+        self.strike((1, 2), 0)
+        self.strike((3, 2), 0)
+        self.strike((2, 1), 0)
+        assert self.tracker.forced_cells() == {(2, 3), (2, 4)}  # Only one way left for the length 3 ship
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -36,6 +36,23 @@ class TestPlayer(unittest.TestCase):
         assert self.player.opp_ships_counter[3] == 1  # Check that the counter was incremented
         self.player.add_opp_ship(3)  # Valid add
         assert self.player.opp_ships_counter[3] == 2  # Check that the counter was incremented
+        assert self.player.opp_fleet.remaining_lengths() == {3: 2}  # Check that the fleet is tracked
+
+    def test_record_response(self):
+        """
+        Test the functionality of the record_response function.
+        :return: None.
+        """
+        self.player.add_opp_ship(2)
+        assert self.player.record_response((0, 0), 1) is True  # Hit
+        assert self.player.opp_board.board[0, 0] == BattleshipBoard.SHIP_HIT
+        assert self.player.opp_board.board[1, 1] == BattleshipBoard.REDUNDANT  # Diagonal marked redundant
+        assert self.player.record_response((0, 1), 2) is True  # Ship destroyed
+        assert self.player.opp_fleet.remaining_lengths() == {}  # No ships left afloat
+        assert self.player.record_response((4, 4), 0) is True  # Miss
+        assert self.player.opp_board.board[4, 4] == BattleshipBoard.EMPTY_HIT
+        assert self.player.record_response((4, 3), 5) is False  # Invalid response
+        assert self.player.record_response((5, 5), 0) is False  # Out of bounds
 
 
 if __name__ == '__main__':
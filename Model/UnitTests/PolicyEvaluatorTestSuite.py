@@ -0,0 +1,68 @@
+import unittest
+import os
+import tempfile
+from Model.PolicyEvaluator import *
+import numpy as np
+
+
+class TestPolicyEvaluator(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the feature extractor and the batched policy
+    forward pass, including saving and loading weights.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Initialize a stack of two 4x4 knowledge boards and a linear policy
+        which only looks at the number of hits around a location.
+        :return: None
+        """
+        self.boards = np.zeros((2, 4, 4), dtype=int)
+        self.boards[0, 1, 1] = BattleshipBoard.SHIP_HIT
+        self.boards[1, 3, 3] = BattleshipBoard.EMPTY_HIT
+        weights = np.zeros((feature_count(), 1))
+        weights[CHANNEL_HIT * 9:(CHANNEL_HIT + 1) * 9] = 1  # Hit indicators of the 3x3 window
+        self.policy = PolicyModel([(weights, np.zeros(1))])
+
+    def test_extract_features(self):
+        """
+        Test the shape and contents of the extracted features.
+        :return: None
+        """
+        features = extract_features(self.boards)
+        assert features.shape == (2, 4, 4, feature_count())
+        window = features[0, 0, 0, :NUM_CHANNELS * 9].reshape(NUM_CHANNELS, 3, 3)
+        assert window[CHANNEL_BLOCKED, 0].all()  # Off the board
+        assert window[CHANNEL_HIT, 2, 2] == 1  # The hit at (1, 1)
+        assert features[1, 2, 2, CHANNEL_BLOCKED * 9 + 8] == 1  # The miss at (3, 3)
+        assert (features[..., -1] == 1).all()  # Bias
+
+    def test_score_and_choose(self):
+        """
+        Test the batched forward pass and the move choice.
+        :return: None
+        """
+        scores = self.policy.score(self.boards)
+        assert scores.shape == (2, 4, 4)
+        assert scores[0, 1, 1] == -np.inf  # Already struck
+        assert scores[0, 0, 1] == 1  # Next to the hit
+        assert self.policy.choose_moves(self.boards)[0].tolist() == [0, 0]  # First of the tied neighbours
+
+    def test_mlp_save_and_load(self):
+        """
+        Test that a saved MLP loads back with identical scores, and that bad shapes are rejected.
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        mlp = PolicyModel([(rng.normal(size=(feature_count(), 8)), rng.normal(size=8)),
+                           (rng.normal(size=(8, 1)), rng.normal(size=1))])
+        path = os.path.join(tempfile.mkdtemp(), "policy.npz")
+        mlp.save(path)
+        loaded = load_policy(path)
+        assert np.array_equal(loaded.score(self.boards), mlp.score(self.boards))
+        with self.assertRaises(ValueError):
+            PolicyModel([(np.zeros((5, 1)), np.zeros(1))])
+
+
+if __name__ == '__main__':
+    unittest.main()
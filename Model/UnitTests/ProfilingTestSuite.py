@@ -0,0 +1,79 @@
+import unittest
+from Model.Profiling import *
+from Model.Ship import Ship
+
+
+class TestProfiling(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the Profiler including the patching and restoring
+    of the methods, the recursion handling and the report.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Initialize a 5x5 board with a horizontal ship of length 3.
+        :return: None
+        """
+        self.board = BattleshipBoard((5, 5))
+        self.board.add_ship(Ship((1, 1), 3, (0, 1)))
+
+    def test_enable_disable(self):
+        """
+        Test that the methods are only swapped while the profiler is enabled.
+        :return: None
+        """
+        original = BattleshipBoard.hit
+        profiler = Profiler()
+        assert BattleshipBoard.hit is original
+        with profiler:
+            assert BattleshipBoard.hit is not original
+            assert active_profiler() is profiler
+            self.assertRaises(RuntimeError, Profiler().enable)
+        assert BattleshipBoard.hit is original
+        assert active_profiler() is None
+        self.board.hit((0, 0))  # Not counted once disabled
+        assert "BattleshipBoard.hit" not in profiler.snapshot()
+
+    def test_counts(self):
+        """
+        Test the call counts, including the recursive calls of ship_destroyed.
+        :return: None
+        """
+        with Profiler(track_allocations=True) as profiler:
+            for loc in [(1, 1), (1, 2), (1, 3)]:
+                self.board.respond_to_move(loc)
+        snapshot = profiler.snapshot()
+        assert snapshot["BattleshipBoard.respond_to_move"]["calls"] == 3
+        assert snapshot["BattleshipBoard.hit"]["calls"] == 3
+        assert snapshot["BattleshipBoard.ship_destroyed"]["calls"] > 3  # Recursion counted
+        outer = snapshot["BattleshipBoard.respond_to_move"]
+        assert outer["max_time"] <= outer["total_time"]
+        assert snapshot["BattleshipBoard.ship_destroyed"]["total_time"] <= outer["total_time"]
+        report = profiler.report(limit=1).split("\n")
+        assert len(report) == 2 and report[1].startswith("BattleshipBoard.respond_to_move")
+        profiler.reset()
+        assert profiler.snapshot() == {}
+
+    def test_merge(self):
+        """
+        Test that the snapshots of other profilers, e.g. of worker processes, add up.
+        :return: None
+        """
+        with Profiler() as first:
+            self.board.respond_to_move((1, 1))
+        with Profiler() as second:
+            self.board.respond_to_move((0, 0))
+            self.board.respond_to_move((1, 2))
+        total = Profiler()
+        total.merge(first.snapshot())
+        total.merge(second.snapshot())
+        merged = total.snapshot()["BattleshipBoard.respond_to_move"]
+        assert merged["calls"] == 3
+        assert merged["total_time"] == first.snapshot()["BattleshipBoard.respond_to_move"]["total_time"] + \
+            second.snapshot()["BattleshipBoard.respond_to_move"]["total_time"]
+        assert merged["max_time"] == max(first.snapshot()["BattleshipBoard.respond_to_move"]["max_time"],
+                                         second.snapshot()["BattleshipBoard.respond_to_move"]["max_time"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from random import Random
+from Model.RefereeBoard import *
+import numpy as np
+
+
+class TestRefereeBoard(unittest.TestCase):
+    """
+    UnitTest class to check that the RefereeBoard resolves shots like respond_to_move and that
+    its deltas rebuild the shooter's knowledge board.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Initialize a 5x5 RefereeBoard with a certain formation of ships.
+        :return: None
+        """
+        self.referee = RefereeBoard((5, 5))
+        self.referee.board = np.array([[1, 1, 1, 0, 0],
+                                       [0, 0, 0, 0, 1],
+                                       [1, 0, 1, 0, 1],
+                                       [1, 0, 0, 0, 0],
+                                       [1, 0, 1, 0, 1]])
+        self.referee.index_fleet()
+
+    def test_resolve(self):
+        """
+        Test responses and deltas of misses, hits, sinks, invalid shots and the win.
+        :return: None
+        """
+        assert self.referee.ships_afloat == 6 and sorted(self.referee.afloat_blocks) == [1, 1, 1, 2, 3, 3]
+        assert self.referee.resolve((1, 0)) == (0, [((1, 0), BattleshipBoard.EMPTY_HIT)])
+        assert self.referee.resolve((0, 0)) == (1, [((0, 0), BattleshipBoard.SHIP_HIT),
+                                                    ((1, 1), BattleshipBoard.REDUNDANT)])
+        response, deltas = self.referee.resolve((0, 1))  # Diagonal (1, 0) already missed
+        assert response == 1 and deltas == [((0, 1), BattleshipBoard.SHIP_HIT), ((1, 2), BattleshipBoard.REDUNDANT)]
+        response, deltas = self.referee.resolve((2, 2))  # A ship of one block
+        assert response == 2 and ((2, 2), BattleshipBoard.SHIP_HIT) in deltas
+        redundant = sorted(loc for loc, state in deltas if state == BattleshipBoard.REDUNDANT)
+        assert redundant == [(1, 3), (2, 1), (2, 3), (3, 1), (3, 2), (3, 3)]  # (1, 1) and (1, 2) already were
+        assert self.referee.resolve((2, 2)) == (-1, []) and self.referee.resolve((9, 9)) == (-1, [])
+        for loc in [(0, 2), (2, 0), (3, 0), (4, 0), (1, 4), (2, 4), (4, 2)]:
+            assert self.referee.resolve(loc)[0] == 2 - (loc in [(2, 0), (3, 0), (1, 4)])
+            assert not self.referee.all_ships_destroyed()
+        assert self.referee.resolve((4, 4))[0] == 3 and self.referee.all_ships_destroyed()
+
+    def test_matches_respond_to_move(self):
+        """
+        Test random games against respond_to_move, and that applying the deltas gives the
+        knowledge board the controller builds from the responses.
+        :return: None
+        """
+        for seed in range(20):
+            board = BattleshipBoard()
+            board.generate_random_board(rng=Random(seed))
+            referee = RefereeBoard()
+            referee.board = board.board.copy()
+            referee.index_fleet()
+            knowledge = BattleshipBoard()
+            rebuilt = np.zeros(board.board.shape, dtype=int)
+            cells = [(x, y) for x in range(10) for y in range(10)]
+            Random(seed).shuffle(cells)
+            for loc in cells:
+                response = board.respond_to_move(loc)
+                referee_response, deltas = referee.resolve(loc)
+                assert referee_response == response
+                for delta_loc, state in deltas:
+                    rebuilt[delta_loc] = state
+                if response in [1, 2, 3]:  # Like Battleship_Controller.perform_hit
+                    knowledge.mark_ship_hit(loc)
+                    knowledge.update_redundant_squares(loc, response != 1)
+                elif response == 0:
+                    knowledge.mark_ship_miss(loc)
+                assert (rebuilt == knowledge.board).all()
+                if response == 3:
+                    break
+            assert (referee.board == board.board).all() and referee.all_ships_destroyed()
+
+
+if __name__ == '__main__':
+    unittest.main()
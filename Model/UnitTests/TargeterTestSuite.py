@@ -0,0 +1,82 @@
+import unittest
+from random import Random
+from Model.Targeter import *
+import numpy as np
+
+
+class TestTargeter(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the targeting strategies and the placement_density
+    function they are built on.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Initialize an empty 5x5 knowledge board.
+        :return: None
+        """
+        self.board = BattleshipBoard((5, 5))
+
+    def test_random_targeter(self):
+        """
+        Test that the random targeter only strikes unknown locations.
+        :return: None
+        """
+        targeter = RandomTargeter(rng=Random(0))
+        self.board.board[:, :] = BattleshipBoard.EMPTY_HIT
+        self.board.board[3, 1] = BattleshipBoard.EMPTY
+        assert targeter.choose_move(self.board) == (3, 1)  # Only location left
+        self.board.board[3, 1] = BattleshipBoard.REDUNDANT
+        assert targeter.choose_move(self.board) is None  # Nothing left to strike
+
+    def test_placement_density(self):
+        """
+        Test the placement counts on a tiny board.
+        :return: None
+        """
+        density = placement_density(np.zeros((1, 3)), {2: 1})[0]
+        assert density.tolist() == [[1, 2, 1]]  # Two placements, the middle is covered by both
+        density = placement_density(np.zeros((3, 3)), {1: 1})[0]
+        assert (density == 1).all()  # A single block ship is only counted once per location
+        # Batched evaluation gives the same result as one board at a time
+        boards = np.zeros((2, 5, 5), dtype=int)
+        boards[1, 2, 2] = BattleshipBoard.EMPTY_HIT
+        batched = placement_density(boards, {3: 1, 2: 2})
+        assert np.array_equal(batched[1], placement_density(boards[1], {3: 1, 2: 2})[0])
+        assert batched[1, 2, 2] == 0  # Already struck
+
+    def test_density_targeter_finishes_hit_ship(self):
+        """
+        Test that the density targeter strikes next to an unresolved hit and continues along it.
+        :return: None
+        """
+        targeter = DensityTargeter({3: 1}, Random(0))
+        self.board.board[2, 2] = BattleshipBoard.SHIP_HIT
+        self.board.update_redundant_squares((2, 2))
+        assert targeter.choose_move(self.board) in [(1, 2), (3, 2), (2, 1), (2, 3)]
+        self.board.board[2, 3] = BattleshipBoard.SHIP_HIT
+        assert targeter.choose_move(self.board) in [(2, 1), (2, 4)]
+
+    def test_density_targeter_with_fleet(self):
+        """
+        Test that the density targeter uses the fleet knowledge: forced locations first, and no
+        placements over sunk ships.
+        :return: None
+        """
+        fleet = FleetTracker((5, 5), {3: 1, 1: 1})
+        targeter = DensityTargeter({3: 1, 1: 1}, Random(0), fleet)
+        for loc in [(0, 0), (0, 1)]:
+            self.board.mark_ship_hit(loc)
+            self.board.update_redundant_squares(loc)
+            fleet.update(self.board, loc, 1)
+        assert targeter.choose_move(self.board) == (0, 2)  # Forced
+        self.board.mark_ship_hit((0, 2))
+        self.board.update_redundant_squares((0, 2), True)
+        fleet.update(self.board, (0, 2), 2)
+        scores = targeter.score_cells(self.board)
+        assert scores.max() == 1  # Only the single block ship is left to place
+        assert scores[0, 3] == 0  # Marked redundant around the sunk ship
+
+
+if __name__ == '__main__':
+    unittest.main()
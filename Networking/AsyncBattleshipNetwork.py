@@ -0,0 +1,598 @@
+import asyncio
+import concurrent.futures
+import itertools
+import math
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from socket import gethostbyname, gethostname
+from .ReliableChannel import ReliableChannel
+from . import WireProtocol
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Utility function to get a nearest-rank percentile.
+    :param values: Sorted list of values.
+    :param fraction: Percentile as a fraction, e.g. 0.99.
+    :return: The percentile, nan for no values.
+    """
+    if len(values) == 0:
+        return float("nan")
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+
+class BattleshipDatagramProtocol(asyncio.DatagramProtocol):
+    """
+    Class to queue up the datagrams received on an asyncio datagram endpoint, so that they
+    can be awaited one at a time, or to hand them to a ReliableChannel.
+    Reference:
+    https://docs.python.org/3/library/asyncio-protocol.html#datagram-protocols
+    @author sahil1105
+    """
+    def __init__(self):
+        """
+        Constructor for the protocol. Starts out with no datagrams.
+        """
+        self.transport = None
+        self.channel = None  # ReliableChannel to hand the datagrams to, if any
+        self.datagrams = asyncio.Queue()
+        self.error = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self.channel is not None:
+            self.channel.datagram_received(data, addr)
+        else:
+            self.datagrams.put_nowait((data, addr))
+
+    def error_received(self, exc):
+        self.error = exc  # E.g. ICMP port unreachable, retransmission takes care of it
+
+    def connection_lost(self, exc):
+        self.datagrams.put_nowait((None, None))  # Wake up anyone waiting
+        if self.channel is not None:
+            self.channel.fail(ConnectionError("Endpoint closed"))
+
+    async def receive(self) -> tuple:
+        """
+        Function to wait for the next datagram.
+        :return: (data, address) tuple.
+        :raises ConnectionError: If the endpoint was closed.
+        """
+        data, addr = await self.datagrams.get()
+        if data is None:
+            self.datagrams.put_nowait((None, None))  # Keep waking up later receivers
+            raise ConnectionError("Endpoint closed")
+        return data, addr
+
+
+class BattleshipStream:
+    """
+    Class to send and receive WireProtocol messages over a stream (TCP) connection, each
+    prefixed with its length, with the same receive as BattleshipDatagramProtocol.
+    @author sahil1105
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Constructor for the stream.
+        :param reader: StreamReader of the connection.
+        :param writer: StreamWriter of the connection.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.peer_addr = writer.get_extra_info("peername")[:2]
+
+    def send(self, data: bytes):
+        """
+        Function to send a message.
+        :param data: The encoded message.
+        :return: None
+        :raises ConnectionError: If the connection was closed.
+        """
+        if self.writer.is_closing():
+            raise ConnectionError("Connection closed")
+        self.writer.write(WireProtocol.frame(data))
+
+    async def receive(self) -> tuple:
+        """
+        Function to wait for the next message.
+        :return: (data, address) tuple.
+        :raises ConnectionError: If the connection was closed.
+        """
+        try:
+            length, = WireProtocol.FRAME.unpack(await self.reader.readexactly(WireProtocol.FRAME.size))
+            return await self.reader.readexactly(length), self.peer_addr
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Connection closed")
+
+    async def close(self, linger: float=2.0):
+        """
+        Utility function to close the connection once everything written was sent, or linger seconds passed.
+        :param linger: Maximum number of seconds to wait for the data to be sent.
+        :return: None
+        """
+        if self.writer.is_closing():
+            return
+        try:
+            await asyncio.wait_for(self.writer.drain(), linger)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        self.writer.close()
+
+
+class AsyncBattleshipNetwork:
+    """
+    Class to represent the networking backend of the Battleship game on asyncio. The game is
+    played over a single socket which sends to the opponent and receives from it, so many
+    games can be multiplexed on one event loop without a thread per socket: a UDP endpoint,
+    or a TCP connection carrying length prefixed messages. Messages are those of WireProtocol:
+    the joining side first sends a hello, which the host answers at the address it came from,
+    so no second channel back is needed and it works behind NAT. After that every move
+    carries a correlation id which its response echoes, so responses are matched to their
+    moves however they arrive, several moves can be in flight at once (pipelined, batched
+    into one datagram), and the round trip time of every move is measured. Over UDP messages
+    go over a ReliableChannel unless reliable is False, in which case lost responses can be
+    asked for again with request_resync.
+    A session, named by the session id of the hello, outlives its games: rematch starts the
+    next game on the same socket once both players asked for it, so a series of games between
+    the same peers binds and connects only once (see connection_setups). Moves and forfeits of
+    a game the opponent hasn't entered yet, i.e. stale ones of the game before, are dropped.
+    Reference:
+    https://docs.python.org/3/library/asyncio-protocol.html
+    @author sahil1105
+    """
+    TRANSPORTS = ["udp", "tcp"]
+
+    def __init__(self, host: str="", port: int=0, reliable: bool=True, network=None, channel_options: dict={},
+                 rtt_window: int=10000, transport: str="udp"):
+        """
+        Constructor for the asyncio networking backend. Nothing is bound until start_game or join_game.
+        :param host: Address to bind to. Defaults to all interfaces.
+        :param port: Port to bind to. Defaults to a random open port.
+        :param reliable: Whether to send over a ReliableChannel, over UDP. TCP is reliable anyway.
+        :param network: Object with create_datagram_endpoint to bind with, e.g. a LossyLoopback.
+                        Defaults to the running event loop. UDP only.
+        :param channel_options: Keyword arguments of the ReliableChannel, e.g. min_rto.
+        :param rtt_window: Number of most recent round trip times kept for the percentiles.
+        :param transport: "udp" or "tcp".
+        :raises ValueError: If the transport is unknown, or a network is given for TCP.
+        """
+        if transport not in AsyncBattleshipNetwork.TRANSPORTS:
+            raise ValueError("Unknown transport {}, expected one of {}".format(transport,
+                                                                             AsyncBattleshipNetwork.TRANSPORTS))
+        if transport == "tcp" and network is not None:
+            raise ValueError("A network can only stand in for UDP")
+        self.transport_kind = transport
+        self.host = host
+        self.port = port
+        self.reliable = reliable
+        self.network = network
+        self.channel_options = dict(channel_options)
+        self.transport = None
+        self.protocol = None
+        self.channel = None
+        self.listener = None  # TCP server accepting the opponent, while hosting
+        self.connections = None  # Queue of the BattleshipStreams accepted by the listener
+        self.stream = None  # BattleshipStream to the opponent, over TCP
+        self.my_addr = None
+        self.opp_addr = None
+        self.request_ids = itertools.count(1)
+        self.pending = {}  # Correlation id -> (future of the response, time sent)
+        self.moves = None  # Queue of (id, move) received, created on the loop
+        self.unanswered = deque()  # Ids of the moves received but not responded to yet, oldest first
+        self.rtts = deque(maxlen=rtt_window)  # Round trip times of moves, in seconds
+        self.malformed = 0  # Packets dropped because they couldn't be decoded
+        self.sent_responses = OrderedDict()  # Correlation id -> response, of the recent responses sent
+        self.marks = []  # (location, state) changes of the knowledge board sent by a referee, see take_marks
+        self.session_id = None
+        self.hosting = False  # Whether this side hosted the session, and so starts its games
+        self.game = 0  # Number of the current game of the session
+        self.peer_game = 0  # Number of the game the opponent is ready for
+        self.connection_setups = 0  # Endpoints bound and connections made, for verification
+        self.stale = 0  # Messages dropped because they belong to another game
+        self._peer_ready = None
+        self._paired = None  # Future of the index given by a lobby, see join_lobby
+        self._dispatcher = None
+
+    @property
+    def in_session(self) -> bool:
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    async def start_server(self) -> tuple:
+        """
+        Function to bind the endpoint, or over TCP to start listening.
+        :return: The IP and port details of the endpoint.
+        """
+        if self.transport_kind == "tcp":
+            self.connections = asyncio.Queue()
+            self.listener = await asyncio.start_server(
+                lambda reader, writer: self.connections.put_nowait(BattleshipStream(reader, writer)),
+                self.host if self.host != "" else None, self.port)
+            host, port = self.listener.sockets[0].getsockname()[:2]
+        else:
+            network = self.network if self.network is not None else asyncio.get_running_loop()
+            self.transport, self.protocol = await network.create_datagram_endpoint(
+                BattleshipDatagramProtocol, local_addr=(self.host, self.port))
+            if self.reliable:
+                self.channel = ReliableChannel(self.transport, **self.channel_options)
+                self.protocol.channel = self.channel
+            host, port = self.transport.get_extra_info("sockname")[:2]
+        self.connection_setups += 1
+        self.my_addr = (host if host not in ["", "0.0.0.0", "::"] else gethostbyname(gethostname()), port)
+        return self.my_addr
+
+    async def start_game(self) -> tuple:
+        """
+        Function to host a game: binds the endpoint and waits for the opponent's hello.
+        Over TCP only the first connection is accepted.
+        :return: The IP and port of the opponent.
+        """
+        await self.start_server()
+        self.hosting = True
+        print("My server details:", self.my_addr)
+        if self.listener is not None:
+            self.stream = await self.connections.get()
+            self.listener.close()
+        while True:
+            data, source = await self.receive_from()
+            messages = WireProtocol.decode(data)
+            if messages is not None and messages[0][0] == WireProtocol.HELLO:
+                break
+            self.malformed += 1
+        _, self.session_id, (ip, port) = messages[0]
+        self.opp_addr = source if port == 0 else (ip, port)  # Port 0: answer where the hello came from
+        print("My opponent's details:", self.opp_addr)
+        self.start_dispatcher()
+        return self.opp_addr
+
+    async def join_game(self, ip: str, port: int, session_id: int=None):
+        """
+        Function to join a hosted game: binds the endpoint, or connects over TCP, and says hello
+        to the host from it, so that the host answers there.
+        :param ip: IP address of the host.
+        :param port: Port of the host.
+        :param session_id: Id to say hello with. Defaults to a random one.
+        :return: None
+        """
+        self.opp_addr = (ip, port)
+        self.hosting = False  # Even if this backend hosted its session before
+        if self.transport_kind == "tcp":
+            self.stream = BattleshipStream(*await asyncio.open_connection(ip, port))
+            self.my_addr = self.stream.writer.get_extra_info("sockname")[:2]
+            self.connection_setups += 1
+        else:
+            await self.start_server()
+        self.session_id = session_id if session_id is not None else random.getrandbits(32)
+        self.send(WireProtocol.encode_hello(session_id=self.session_id))
+        self.start_dispatcher()
+
+    async def join_lobby(self, ip: str, port: int, player_id: int=None, latency_ms: float=None) -> int:
+        """
+        Function to join the lobby of a GameServer with a Matchmaker, over TCP, and wait to be
+        paired with an opponent of a similar rating and latency. The games are then played as
+        with a joined game, the server being the referee.
+        :param ip: IP address of the server.
+        :param port: Port of the server.
+        :param player_id: Id of the player, which the server rates it by. Defaults to a random one.
+        :param latency_ms: Round trip time to the server in milliseconds. Defaults to the time taken to connect.
+        :return: Index of this player in its session, 0 moves first.
+        :raises ValueError: If the transport isn't TCP.
+        :raises ConnectionError: If the server closed the connection before pairing.
+        """
+        if self.transport_kind != "tcp":
+            raise ValueError("A lobby is joined over TCP")
+        self._paired = asyncio.get_running_loop().create_future()
+        start = time.monotonic()
+        await self.join_game(ip, port, player_id)
+        if latency_ms is None:
+            latency_ms = (time.monotonic() - start) * 1000  # The handshake takes one round trip
+        self.send(WireProtocol.encode_queue(self.session_id, latency_ms))
+        index = await self._paired
+        self.hosting = index == 0
+        return index
+
+    def send(self, data: bytes):
+        """
+        Utility function to send a message to the opponent.
+        :param data: The encoded message.
+        :return: None
+        """
+        if self.stream is not None:
+            self.stream.send(data)
+        elif self.channel is not None:
+            self.channel.peer_addr = self.opp_addr
+            self.channel.send(data)
+        else:
+            self.transport.sendto(data, self.opp_addr)
+
+    async def receive_from(self) -> tuple:
+        """
+        Function to wait for the next packet.
+        :return: (packet, address it came from) tuple.
+        :raises ConnectionError: If the opponent is gone or the endpoint was closed.
+        """
+        if self.stream is not None:
+            return await self.stream.receive()
+        return await (self.channel if self.channel is not None else self.protocol).receive()
+
+    async def receive(self) -> bytes:
+        """
+        Function to wait for the next packet.
+        :return: The packet.
+        :raises ConnectionError: If the opponent is gone or the endpoint was closed.
+        """
+        return (await self.receive_from())[0]
+
+    def start_dispatcher(self):
+        """
+        Utility function to start routing the messages received: moves to the moves queue and
+        responses to the requests waiting for them.
+        :return: None
+        """
+        self.moves = asyncio.Queue()
+        self.game = self.peer_game = 1
+        self._peer_ready = asyncio.Event()
+        self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    async def _dispatch(self):
+        """
+        Body of the dispatcher task.
+        :return: None
+        """
+        try:
+            while True:
+                messages = WireProtocol.decode(await self.receive())
+                if messages is None:
+                    self.malformed += 1
+                    continue
+                for kind, request_id, payload in messages:
+                    if kind in [WireProtocol.MOVE, WireProtocol.FORFEIT] and self.peer_game != self.game:
+                        self.stale += 1
+                    elif kind == WireProtocol.MOVE:
+                        self.moves.put_nowait((request_id, payload))
+                    elif kind == WireProtocol.RESPONSE and request_id in self.pending:
+                        future, sent = self.pending.pop(request_id)
+                        self.rtts.append(time.monotonic() - sent)
+                        if not future.done():
+                            future.set_result(payload)
+                    elif kind == WireProtocol.FORFEIT:
+                        self.moves.put_nowait((0, (3,)))
+                    elif kind == WireProtocol.RESYNC and request_id in self.sent_responses:
+                        self.send(WireProtocol.encode_response(request_id, self.sent_responses[request_id]))
+                    elif kind == WireProtocol.MARK:
+                        self.marks.append(payload)
+                    elif kind == WireProtocol.REMATCH and request_id == self.session_id and payload > self.peer_game:
+                        self.peer_game = payload
+                        self._peer_ready.set()
+                    elif kind == WireProtocol.HELLO and self._paired is not None and not self._paired.done():
+                        self._paired.set_result(payload[1])  # The index of this player, in place of the port
+        except (ConnectionError, asyncio.CancelledError) as error:
+            failure = error if isinstance(error, ConnectionError) else ConnectionError("Game ended")
+            for future, _ in self.pending.values():
+                if not future.done():
+                    future.set_exception(failure)
+            self.pending.clear()
+            self.moves.put_nowait((None, failure))
+            self._peer_ready.set()
+            if self._paired is not None and not self._paired.done():
+                self._paired.set_exception(failure)
+
+    async def get_move(self) -> tuple:
+        """
+        Function to wait for the opponent's next move. Moves are answered by send_response in
+        the order they were received.
+        :return: The move as an (x, y) tuple, or (3,) if the opponent forfeited.
+        :raises ConnectionError: If the opponent is gone or the game ended.
+        """
+        request_id, move = await self.moves.get()
+        if request_id is None:
+            self.moves.put_nowait((None, move))  # Keep failing later calls
+            raise move
+        if request_id != 0:
+            self.unanswered.append(request_id)
+        return move
+
+    async def send_response(self, response: int):
+        """
+        Function to send the response to the oldest move not responded to yet. Response 3
+        without such a move is sent as a forfeit.
+        :param response: Response to send.
+        :return: None
+        """
+        if len(self.unanswered) == 0:
+            if response == 3:
+                self.send(WireProtocol.encode_forfeit())
+            return
+        request_id = self.unanswered.popleft()
+        self.sent_responses[request_id] = response
+        if len(self.sent_responses) > 64:
+            self.sent_responses.popitem(last=False)
+        self.send(WireProtocol.encode_response(request_id, response))
+
+    def request_move(self, move: tuple, send: bool=True) -> tuple:
+        """
+        Function to register a move waiting for its response, and send it.
+        :param move: The move to send.
+        :param send: Whether to send it, False leaves that to the caller (e.g. to batch moves).
+        :return: (future of the response, encoded move) tuple.
+        """
+        request_id = next(self.request_ids) & WireProtocol.MAX_ID
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = (future, time.monotonic())
+        message = WireProtocol.encode_move(request_id, move)
+        if send:
+            self.send(message)
+        return future, message
+
+    def take_marks(self) -> list:
+        """
+        Function to get the changes of the knowledge board a referee (GameServer) sent with the
+        responses so far, e.g. to apply to the controller's model_opp. The changes a move caused
+        are all in once its response is returned, unless there were more than MAX_BATCH - 1.
+        :return: List of (location, state) tuples, oldest first, each returned once.
+        """
+        marks, self.marks = self.marks, []
+        return marks
+
+    def request_resync(self):
+        """
+        Function to ask the opponent to send the responses to all the moves still waiting
+        again, e.g. after a timeout on a network that loses packets.
+        :return: None
+        """
+        for request_id in list(self.pending):
+            self.send(WireProtocol.encode_resync(request_id))
+
+    async def transmit_move_and_get_response(self, move: tuple) -> int:
+        """
+        Function to send a move to the opponent and wait for the response.
+        :param move: The move to send.
+        :return: The response.
+        :raises ConnectionError: If the opponent is gone or the game ended.
+        """
+        return await self.request_move(move)[0]
+
+    async def transmit_moves(self, moves: list) -> list:
+        """
+        Function to send several moves at once (pipelined, batched up to MAX_BATCH per datagram)
+        and wait for all of their responses.
+        :param moves: List of moves.
+        :return: List of the responses, in the order of the moves.
+        """
+        futures = []
+        for start in range(0, len(moves), WireProtocol.MAX_BATCH):
+            requests = [self.request_move(move, send=False) for move in moves[start:start + WireProtocol.MAX_BATCH]]
+            futures.extend(future for future, _ in requests)
+            messages = [message for _, message in requests]
+            self.send(messages[0] if len(messages) == 1 else WireProtocol.encode_batch(messages))
+        return list(await asyncio.gather(*futures))
+
+    async def rematch(self) -> int:
+        """
+        Function to start the next game of the session, on the same socket. Waits until the
+        opponent asked for it too; as in the first game the host moves first.
+        :return: Number of the new game.
+        :raises ConnectionError: If there is no session, or the opponent is gone.
+        """
+        if self._dispatcher is None or self._dispatcher.done():
+            raise ConnectionError("No session to play a rematch in")
+        for future, _ in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Game ended"))
+        self.pending.clear()
+        self.unanswered.clear()
+        self.sent_responses.clear()
+        self.marks = []
+        self.stale += self.moves.qsize()  # Moves of the game before never asked for
+        self.moves = asyncio.Queue()  # Before telling the opponent, whose next moves go here
+        self.game += 1
+        self.send(WireProtocol.encode_rematch(self.session_id, self.game))
+        while self.peer_game < self.game:
+            self._peer_ready.clear()
+            await self._peer_ready.wait()
+            if self._dispatcher.done():
+                raise ConnectionError("Opponent gone before the rematch")
+        return self.game
+
+    def rtt_percentiles(self) -> dict:
+        """
+        Utility function to summarize the round trip times of the recent moves.
+        :return: Dictionary of the count and the p50, p99 and max round trip time in seconds.
+        """
+        rtts = sorted(self.rtts)
+        return {"count": len(rtts), "p50": percentile(rtts, 0.5), "p99": percentile(rtts, 0.99),
+                "max": rtts[-1] if len(rtts) > 0 else float("nan")}
+
+    async def end_game(self, linger: float=2.0):
+        """
+        Utility function to close the endpoint, ending the session, once the opponent
+        acknowledged everything sent (e.g. the final response) or linger seconds passed.
+        :param linger: Maximum number of seconds to wait for acknowledgements.
+        :return: None
+        """
+        if self.stream is not None:
+            await self.stream.close(linger)
+            self.stream = None
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        if self.channel is not None:
+            await self.channel.drain(linger)
+            self.channel.close()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        self.hosting = False
+
+
+class EventLoopThread:
+    """
+    Class to run an asyncio event loop on a background thread, so that blocking code can
+    wait on coroutines. One loop can serve any number of games.
+    @author sahil1105
+    """
+    def __init__(self):
+        """
+        Constructor for EventLoopThread. Starts the loop.
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coroutine, timeout: float=None):
+        """
+        Function to run a coroutine on the loop and wait for its result.
+        :param coroutine: The coroutine.
+        :param timeout: Maximum number of seconds to wait, None waits forever.
+        :return: The result of the coroutine.
+        :raises TimeoutError: If the coroutine took longer than timeout. It is cancelled.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()  # Not left waiting on the loop
+            raise TimeoutError("No result after {} s".format(timeout)) from None
+
+    def call(self, function, *args):
+        """
+        Function to run a plain function on the loop's thread and wait for its result.
+        :param function: The function.
+        :param args: Its arguments.
+        :return: The result of the function.
+        """
+        async def call_on_loop():
+            return function(*args)
+        return self.run(call_on_loop())
+
+    def close(self):
+        """
+        Utility function to stop the loop and its thread.
+        :return: None
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+_shared_loop = None
+_shared_loop_lock = threading.Lock()
+
+
+def shared_loop() -> EventLoopThread:
+    """
+    Utility function to get the event loop thread shared by all blocking networking backends.
+    :return: The EventLoopThread, started on first use.
+    """
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            _shared_loop = EventLoopThread()
+        return _shared_loop
@@ -1,58 +1,77 @@
-from .client import BattleshipClient
-from .server import BattleshipServer
+from .AsyncBattleshipNetwork import AsyncBattleshipNetwork, shared_loop
 #from Controller.BattleshipController import Battleship_Controller
-import time
 
 
 class BattleshipNetwork:
     """
     Class to represent the networking backend of the Battleship game.
+    A thin blocking wrapper around AsyncBattleshipNetwork, whose coroutines run on an event
+    loop thread shared by all games in the process. The session outlives its games, so the
+    same backend plays rematches until end_game.
     Reference:
     https://github.com/OskarPersson/Battleship
     http://code.activestate.com/recipes/578802-send-messages-between-computers/
     @author sahil1105
     """
-    def __init__(self, controller_ref):
+    def __init__(self, controller_ref, loop_thread=None, host: str="", transport: str="udp"):
         """
-        Constructor for the networking backend. Sets up the server and other constants.
+        Constructor for the networking backend. Sets up the asyncio backend and other constants.
+        :param controller_ref: The controller using this backend.
+        :param loop_thread: EventLoopThread to run on. Defaults to the shared one.
+        :param host: Address to bind to. Defaults to all interfaces.
+        :param transport: "udp" or "tcp", the single socket the game is played over.
         """
-        self.client = None
-        self.server = BattleshipServer()
-        self.my_server_addr = None
-        self.opp_server_addr = None
+        self.backend = AsyncBattleshipNetwork(host, transport=transport)
+        self.loop_thread = loop_thread if loop_thread is not None else shared_loop()
         self.controller_ref = controller_ref
 
+    @property
+    def my_server_addr(self):
+        return self.backend.my_addr
+
+    @property
+    def opp_server_addr(self):
+        return self.backend.opp_addr
+
+    @property
+    def in_session(self) -> bool:
+        return self.backend.in_session
+
+    @property
+    def is_host(self) -> bool:
+        return self.backend.hosting
+
+    @property
+    def connection_setups(self) -> int:
+        return self.backend.connection_setups
+
     def start_game(self):
         """
-        Actions to take when a new game is to be started. Actions include starting the server,
-        waiting for a connection attempy by the opponent's client with details about
-        their server and using our client to connect to thier server.
+        Actions to take when a new game is to be started. Actions include closing what is left
+        of a previous session, starting the server and waiting for the opponent's hello, which
+        is answered on the same socket.
         :return: None
         """
-        self.my_server_addr = self.server.start_server()
-        self.opp_server_addr = self.server.find_opp()
-        self.client = BattleshipClient(self.server.opp_addr)
+        self.loop_thread.run(self.backend.end_game(0))  # Not leaking a dead session's endpoint
+        self.loop_thread.run(self.backend.start_game())
 
     def join_game(self, ip, port):
         """
-        Actions to take when the user wants to join a new game. Actions include starting the server,
-        sending a message from our client to their server.
+        Actions to take when the user wants to join a new game. Actions include closing what is
+        left of a previous session, opening our socket and saying hello to their server from it.
         :param ip: IP address of opponent's server
         :param port: Port of opponent's server.
         :return: None
         """
-        self.my_server_addr = self.server.start_server()
-        self.opp_server_addr = (ip, port)
-        self.client = BattleshipClient(self.opp_server_addr)
-        self.client.connect_to_server("{},{}".format(self.my_server_addr[0], str(self.my_server_addr[1])))
+        self.loop_thread.run(self.backend.end_game(0))
+        self.loop_thread.run(self.backend.join_game(ip, port))
 
     def get_move(self):
         """
         Function to be called from the controller to get the next move of the opponent
         :return: None
         """
-        opp_move = self.server.get_data()
-        return tuple(list(map(int, opp_move.split(","))))
+        return self.loop_thread.run(self.backend.get_move())
 
     def send_response(self, response):
         """
@@ -60,7 +79,7 @@ class BattleshipNetwork:
         :param response: Response to send
         :return: None
         """
-        self.client.send_data(str(response))
+        self.loop_thread.run(self.backend.send_response(response))
 
     def transmit_move_and_get_response(self, move: tuple):
         """
@@ -68,17 +87,36 @@ class BattleshipNetwork:
         :param move: The move to send (and ask for response for)
         :return: None
         """
-        time.sleep(0.5)
-        if self.client.send_data("{},{}".format(move[0], move[1])):
-            response = self.server.get_data()
-            return int(response)
-        return -1
+        return self.loop_thread.run(self.backend.transmit_move_and_get_response(move))
+
+    def transmit_moves(self, moves: list) -> list:
+        """
+        Function to send several moves at once and wait for all of their responses.
+        :param moves: List of moves.
+        :return: List of the responses, in the order of the moves.
+        """
+        return self.loop_thread.run(self.backend.transmit_moves(moves))
+
+    def rematch(self, timeout: float=None) -> int:
+        """
+        Function to start the next game of the session, waiting until the opponent asks for it too.
+        :param timeout: Maximum number of seconds to wait for the opponent, None waits forever.
+        :return: Number of the new game.
+        :raises ConnectionError: If there is no session, or the opponent is gone.
+        :raises TimeoutError: If the opponent didn't ask for the rematch in time.
+        """
+        return self.loop_thread.run(self.backend.rematch(), timeout)
+
+    def rtt_percentiles(self) -> dict:
+        """
+        Utility function to summarize the round trip times of the recent moves.
+        :return: Dictionary of the count and the p50, p99 and max round trip time in seconds.
+        """
+        return self.loop_thread.call(self.backend.rtt_percentiles)
 
     def end_game(self):
         """
-        Utility function for clean up purposes at the end of the game. Shuts down
-        the server and the client.
+        Utility function for clean up purposes at the end of the session. Closes the socket.
         :return: None
         """
-        self.client.shutdown()
-        self.server.close_server()
+        self.loop_thread.run(self.backend.end_game())
@@ -0,0 +1,461 @@
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from random import Random
+from Model.Profiling import Profiler, active_profiler, enable_from_env
+from Model.RefereeBoard import RefereeBoard
+from Simulation.RatingEngine import load_ratings
+from .AsyncBattleshipNetwork import BattleshipStream
+from .Matchmaker import Matchmaker
+from . import WireProtocol
+
+
+class GameSession:
+    """
+    Class to represent one match on the GameServer, as a state machine driven by the messages
+    of its two players. The server is the referee: it holds both fleets as RefereeBoards and
+    resolves every move itself with the same logic the controller's respond_to_opp_move uses,
+    so players can't lie about hits and never hold the opponent's board. The shooter gets the
+    response batched with the changes to its knowledge board (MARK messages), the other
+    player is sent the move, which needs no response. As in the peer to peer game, a hit or an invalid move
+    keeps the turn, a miss passes it, and the player who came first moves first.
+    handle doesn't do any I/O: it returns the messages to send, so a session costs nothing
+    while idle and can be tested without sockets.
+    @author sahil1105
+    """
+    # States
+    WAITING = 0  # For the second player
+    PLAYING = 1
+    OVER = 2
+    __slots__ = ["session_id", "player_ids", "boards", "board_dims", "ship_types", "rng", "state", "turn", "game",
+                 "winner", "rematch", "forwarded_ids", "moves", "last_active"]
+
+    def __init__(self, session_id: int, first_player_id: int, board_dims: tuple=(10, 10),
+                 ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}, rng: Random=None):
+        """
+        Constructor for GameSession. Waits for the second player.
+        :param session_id: Id of the session on the server.
+        :param first_player_id: Session id the first player said hello with.
+        :param board_dims: Dimensions of the boards.
+        :param ship_types: Dictionary of ship lengths to number of ships of that length in each fleet.
+        :param rng: Random generator placing the fleets.
+        """
+        self.session_id = session_id
+        self.player_ids = [first_player_id, None]
+        self.boards = [None, None]
+        self.board_dims = board_dims
+        self.ship_types = ship_types
+        self.rng = rng if rng is not None else Random()
+        self.state = GameSession.WAITING
+        self.turn = 0
+        self.game = 0
+        self.winner = None
+        self.rematch = [False, False]
+        self.forwarded_ids = [0, 0]  # Correlation ids of the moves forwarded to each player
+        self.moves = 0
+        self.last_active = time.monotonic()
+
+    def join(self, player_id: int):
+        """
+        Function to add the second player and start the first game.
+        :param player_id: Session id the second player said hello with.
+        :return: None
+        """
+        self.player_ids[1] = player_id
+        self.start_game()
+
+    def start_game(self):
+        """
+        Utility function to place both fleets at random and start a game.
+        :return: None
+        """
+        for index in range(2):
+            self.boards[index] = RefereeBoard(self.board_dims)
+            self.boards[index].generate_random_board(self.ship_types, self.rng)
+            self.boards[index].index_fleet()
+        self.state = GameSession.PLAYING
+        self.turn = 0
+        self.game += 1
+        self.winner = None
+        self.rematch = [False, False]
+
+    def handle(self, index: int, kind: int, request_id: int, payload) -> list:
+        """
+        Function to advance the state machine with a message of a player.
+        :param index: Index of the player, 0 or 1.
+        :param kind: WireProtocol type of the message.
+        :param request_id: Its correlation id.
+        :param payload: Its payload.
+        :return: List of (index of the player to send to, encoded message) tuples.
+        """
+        self.last_active = time.monotonic()
+        other = 1 - index
+        if kind == WireProtocol.MOVE:
+            if self.state != GameSession.PLAYING or index != self.turn:
+                return [(index, WireProtocol.encode_response(request_id, -1))]
+            response, deltas = self.boards[other].resolve(payload)
+            self.moves += 1
+            if response == 0:
+                self.turn = other
+            elif response == 3:
+                self.state = GameSession.OVER
+                self.winner = index
+            self.forwarded_ids[other] = (self.forwarded_ids[other] + 1) & WireProtocol.MAX_ID
+            replies = [WireProtocol.encode_response(request_id, response)] + \
+                      [WireProtocol.encode_mark(request_id, loc, state) for loc, state in deltas]
+            if len(replies) == 1:
+                messages = [(index, replies[0])]
+            else:
+                messages = [(index, WireProtocol.encode_batch(replies[start:start + WireProtocol.MAX_BATCH]))
+                            for start in range(0, len(replies), WireProtocol.MAX_BATCH)]
+            if response != -1:
+                messages.append((other, WireProtocol.encode_move(self.forwarded_ids[other], payload)))
+            return messages
+        if kind == WireProtocol.FORFEIT and self.state == GameSession.PLAYING:
+            self.state = GameSession.OVER
+            self.winner = other
+            return [(other, WireProtocol.encode_forfeit())]
+        if kind == WireProtocol.REMATCH and self.state == GameSession.OVER:
+            self.rematch[index] = True
+            if all(self.rematch):
+                self.start_game()
+                return [(player, WireProtocol.encode_rematch(self.player_ids[player], self.game))
+                        for player in range(2)]
+        return []  # Responses to forwarded moves aren't needed, the server answers moves itself
+
+    def abandon(self, index: int) -> list:
+        """
+        Function to end the session because a player left. The other player wins a game in progress.
+        :param index: Index of the player who left.
+        :return: List of (index of the player to send to, encoded message) tuples.
+        """
+        playing = self.state == GameSession.PLAYING
+        self.state = GameSession.OVER
+        self.rematch = [False, False]
+        if playing and self.player_ids[1] is not None:
+            self.winner = 1 - index
+            return [(1 - index, WireProtocol.encode_forfeit())]
+        return []
+
+
+class GameServer:
+    """
+    Class to host many games in one process. Players connect over TCP with length prefixed
+    WireProtocol messages (BattleshipStream), e.g. an AsyncBattleshipNetwork with transport
+    "tcp" joining the server, and say hello. Every two players are paired into a GameSession,
+    and the server says hello back to both, with the id of the session and the index of the
+    player (0 moves first) in place of the port. The sessions are multiplexed on one asyncio
+    event loop, a coroutine per connection reading messages and feeding them to its session's
+    state machine. Sessions idle for longer than idle_timeout are closed by one sweep over all
+    of them, so an idle session has no timer of its own.
+    With a Matchmaker the server is a lobby instead: after the hello a player asks to be queued
+    (QUEUE, see AsyncBattleshipNetwork.join_lobby), and the pairs the Matchmaker makes, at once
+    or as their rating tolerances widen, are handed to new sessions. A player who leaves, or
+    sends anything else, while queued is taken out of the queue and disconnected.
+    Reference:
+    https://docs.python.org/3/library/asyncio-stream.html
+    @author sahil1105
+    """
+    def __init__(self, host: str="", port: int=0, board_dims: tuple=(10, 10),
+                 ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}, idle_timeout: float=300.0, seed: int=None,
+                 matchmaker: Matchmaker=None):
+        """
+        Constructor for GameServer. Nothing is bound until start.
+        :param host: Address to bind to. Defaults to all interfaces.
+        :param port: Port to bind to. Defaults to a random open port.
+        :param board_dims: Dimensions of the boards.
+        :param ship_types: Dictionary of ship lengths to number of ships of that length in each fleet.
+        :param idle_timeout: Seconds without a message after which a session is closed, None never closes them.
+        :param seed: Seed of the random generator placing the fleets.
+        :param matchmaker: Matchmaker pairing the players, None pairs them in the order they said hello.
+        """
+        self.host = host
+        self.port = port
+        self.board_dims = board_dims
+        self.ship_types = ship_types
+        self.idle_timeout = idle_timeout
+        self.rng = Random(seed)
+        self.session_ids = itertools.count(1)
+        self.sessions = {}  # Session id -> GameSession
+        self.streams = {}  # Session id -> [BattleshipStream of player 0, of player 1]
+        self.waiting = None  # Session waiting for its second player
+        self.matchmaker = matchmaker
+        self.queued = {}  # Ticket -> (player id, BattleshipStream, future of (session, index)) of queued players
+        self.serving = {}  # Task serving a connection -> its BattleshipStream
+        self.server = None
+        self.addr = None
+        self._sweeper = None
+        self._ticker = None
+        # Counters, for monitoring
+        self.connections = 0
+        self.games = 0
+        self.moves = 0
+        self.malformed = 0
+
+    async def start(self) -> tuple:
+        """
+        Function to start accepting players.
+        :return: The IP and port the server listens on.
+        """
+        self.server = await asyncio.start_server(self._serve, self.host if self.host != "" else None, self.port,
+                                                 backlog=1024)
+        self.addr = self.server.sockets[0].getsockname()[:2]
+        if self.idle_timeout is not None:
+            self._sweeper = asyncio.ensure_future(self._sweep())
+        if self.matchmaker is not None:
+            self._ticker = asyncio.ensure_future(self._tick())
+        return self.addr
+
+    def report(self) -> dict:
+        """
+        Function to get the counters of the server, with the snapshot of the enabled profiler
+        if any, e.g. to export for monitoring.
+        :return: JSON serializable dictionary.
+        """
+        profiler = active_profiler()
+        return {"connections": self.connections, "games": self.games, "moves": self.moves,
+                "malformed": self.malformed, "sessions": len(self.sessions), "queued": len(self.queued),
+                "profile": profiler.snapshot() if profiler is not None else None}
+
+    def open_session(self, player_id: int) -> tuple:
+        """
+        Function to pair a player who said hello: into the waiting session, or a new one.
+        :param player_id: Session id the player said hello with.
+        :return: (GameSession, index of the player in it) tuple.
+        """
+        if self.waiting is not None and self.waiting.state == GameSession.WAITING:
+            session, self.waiting = self.waiting, None
+            session.join(player_id)
+            self.games += 1
+            return session, 1
+        session = GameSession(next(self.session_ids), player_id, self.board_dims, self.ship_types, self.rng)
+        self.sessions[session.session_id] = session
+        self.streams[session.session_id] = [None, None]
+        self.waiting = session
+        return session, 0
+
+    def enqueue(self, player_id: int, latency_ms: int, stream: BattleshipStream) -> tuple:
+        """
+        Function to queue a player in the Matchmaker, starting its session at once if it was paired.
+        :param player_id: Id the player said hello with, its name in the Matchmaker.
+        :param latency_ms: Round trip time the player measured, in milliseconds.
+        :param stream: BattleshipStream of the player.
+        :return: (ticket, future of the (GameSession, index of the player in it) tuple) tuple.
+        """
+        matched = asyncio.get_running_loop().create_future()
+        ticket, pair = self.matchmaker.enqueue(str(player_id), latency_ms)
+        self.queued[ticket] = (player_id, stream, matched)
+        if pair is not None:
+            self.start_match(pair)
+        return ticket, matched
+
+    def start_match(self, pair: tuple):
+        """
+        Function to start the session of a pair the Matchmaker made, the older entry moving first.
+        :param pair: (QueueEntry, QueueEntry) tuple.
+        :return: None
+        """
+        players = [self.queued.pop(entry.ticket) for entry in pair]
+        session = GameSession(next(self.session_ids), players[0][0], self.board_dims, self.ship_types, self.rng)
+        session.join(players[1][0])
+        self.sessions[session.session_id] = session
+        self.streams[session.session_id] = [stream for _, stream, _ in players]
+        self.games += 1
+        for index, (_, _, matched) in enumerate(players):
+            matched.set_result((session, index))
+        self.greet(session)
+
+    def greet(self, session: GameSession):
+        """
+        Utility function to tell both players of a session that it started, and their indices.
+        :param session: The session.
+        :return: None
+        """
+        self.dispatch(session, [(player, WireProtocol.encode_hello(port=player, session_id=session.session_id))
+                                for player in range(2)])
+
+    def dispatch(self, session: GameSession, messages: list):
+        """
+        Utility function to send the messages a session returned to its players.
+        :param session: The session.
+        :param messages: List of (index of the player, encoded message) tuples.
+        :return: None
+        """
+        streams = self.streams.get(session.session_id)
+        for index, message in messages:
+            if streams is not None and streams[index] is not None:
+                try:
+                    streams[index].send(message)
+                except ConnectionError:
+                    pass  # Its own coroutine notices and abandons the session
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Body of the coroutine serving one connected player.
+        :param reader: StreamReader of the connection.
+        :param writer: StreamWriter of the connection.
+        :return: None
+        """
+        stream = BattleshipStream(reader, writer)
+        self.serving[asyncio.current_task()] = stream
+        self.connections += 1
+        session = None
+        index = 0
+        player_id = None
+        ticket = None
+        receiving = None  # Receive started while queued
+        try:
+            while session is None:
+                messages = WireProtocol.decode((await stream.receive())[0])
+                kind = messages[0][0] if messages is not None else None
+                if kind == WireProtocol.HELLO and self.matchmaker is None:
+                    session, index = self.open_session(messages[0][1])
+                    self.streams[session.session_id][index] = stream
+                    if index == 1:
+                        self.greet(session)
+                elif kind == WireProtocol.HELLO and player_id is None:
+                    player_id = messages[0][1]
+                elif kind == WireProtocol.QUEUE and player_id is not None and self.matchmaker is not None:
+                    ticket, matched = self.enqueue(player_id, messages[0][2], stream)
+                    receiving = asyncio.ensure_future(stream.receive())
+                    await asyncio.wait([matched, receiving], return_when=asyncio.FIRST_COMPLETED)
+                    if not matched.done():
+                        break  # Gone, or not waiting any more
+                    session, index = matched.result()
+                else:
+                    self.malformed += 1
+            while session is not None:
+                received, receiving = receiving if receiving is not None else stream.receive(), None
+                messages = WireProtocol.decode((await received)[0])
+                if messages is None:
+                    self.malformed += 1
+                    continue
+                for kind, request_id, payload in messages:
+                    moves = session.moves
+                    games = session.game
+                    self.dispatch(session, session.handle(index, kind, request_id, payload))
+                    self.moves += session.moves - moves
+                    self.games += session.game - games
+        except ConnectionError:
+            pass
+        finally:
+            if ticket is not None and self.matchmaker.cancel(ticket):
+                del self.queued[ticket]
+            if receiving is not None:
+                receiving.cancel()
+                if receiving.done() and not receiving.cancelled():
+                    receiving.exception()  # Retrieved, not logged
+            if session is not None:
+                self.dispatch(session, session.abandon(index))
+                self.close_session(session)
+            self.serving.pop(asyncio.current_task(), None)
+            await stream.close(0)
+
+    def close_session(self, session: GameSession):
+        """
+        Utility function to forget a session and close the connections of its players.
+        :param session: The session.
+        :return: None
+        """
+        if self.waiting is session:
+            self.waiting = None
+        self.sessions.pop(session.session_id, None)
+        for stream in self.streams.pop(session.session_id, []):
+            if stream is not None:
+                asyncio.ensure_future(stream.close(1.0))
+
+    async def _sweep(self):
+        """
+        Body of the task closing the sessions idle for longer than idle_timeout.
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            self.sweep()
+
+    def sweep(self) -> int:
+        """
+        Function to close the sessions idle for longer than idle_timeout, at once.
+        :return: Number of sessions closed.
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [session for session in self.sessions.values() if session.last_active < deadline]
+        for session in idle:
+            self.close_session(session)
+        return len(idle)
+
+    async def _tick(self):
+        """
+        Body of the task widening the rating tolerances of the queued players and starting the
+        sessions of the pairs that makes.
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(min(self.matchmaker.widen_interval, 1.0))
+            for pair in self.matchmaker.tick():
+                self.start_match(pair)
+
+    async def close(self):
+        """
+        Utility function to stop accepting players and close every session and connection.
+        :return: None
+        """
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        for session in list(self.sessions.values()):
+            self.close_session(session)
+        for stream in self.serving.values():
+            stream.writer.close()
+        await asyncio.gather(*self.serving, return_exceptions=True)
+
+
+def __main__():
+    """
+    Runs a GameServer until interrupted.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Host many Battleship games in one process.")
+    parser.add_argument("--host", default="", help="Address to bind to.")
+    parser.add_argument("--port", type=int, default=5700, help="Port to listen on.")
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="Seconds before an idle session is closed.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the fleet placements.")
+    parser.add_argument("--lobby", action="store_true", help="Pair players by rating and latency.")
+    parser.add_argument("--ratings", default=None, help="Ratings file (see Simulation.RatingEngine) of the lobby.")
+    parser.add_argument("--profile-output", default=None,
+                        help="Profile the games and write the server's report to this JSON file when it stops.")
+    args = parser.parse_args()
+    if enable_from_env() is None and args.profile_output is not None:
+        Profiler().enable()
+
+    async def serve():
+        matchmaker = None
+        if args.lobby or args.ratings is not None:
+            matchmaker = Matchmaker(load_ratings(args.ratings) if args.ratings is not None else None)
+        server = GameServer(args.host, args.port, idle_timeout=args.idle_timeout, seed=args.seed,
+                            matchmaker=matchmaker)
+        print("Serving on", await server.start())
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+            if args.profile_output is not None:
+                with open(args.profile_output, "w") as output_file:
+                    json.dump(server.report(), output_file, indent=2, sort_keys=True)
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    __main__()
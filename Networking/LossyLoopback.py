@@ -0,0 +1,113 @@
+import asyncio
+import random
+
+
+class LossyTransport:
+    """
+    Class to stand in for an asyncio DatagramTransport on a LossyLoopback.
+    @author sahil1105
+    """
+    def __init__(self, loopback, addr: tuple, protocol):
+        """
+        Constructor for LossyTransport.
+        :param loopback: The LossyLoopback carrying the datagrams.
+        :param addr: Address of this endpoint.
+        :param protocol: asyncio DatagramProtocol receiving the datagrams sent to addr.
+        """
+        self.loopback = loopback
+        self.addr = addr
+        self.protocol = protocol
+        self.closed = False
+
+    def sendto(self, data: bytes, addr: tuple=None):
+        if not self.closed:
+            self.loopback.send(bytes(data), self.addr, addr)
+
+    def get_extra_info(self, name: str, default=None):
+        return self.addr if name == "sockname" else default
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.loopback.endpoints.pop(self.addr, None)
+            self.protocol.connection_lost(None)
+
+
+class LossyLoopback:
+    """
+    Class to stand in for the network between datagram endpoints of one event loop, injecting
+    drops, duplicates, delay and reordering (from jitter in the delay) with a seeded random
+    generator. The draws are the same on every run, but not which datagram each one falls on:
+    that depends on the order datagrams are sent in, which follows wall clock timers (e.g.
+    retransmissions), so a run isn't exactly reproducible. Tests must hold for any such order.
+    @author sahil1105
+    """
+    def __init__(self, drop_rate: float=0.0, duplicate_rate: float=0.0, delay: float=0.0, jitter: float=0.0,
+                 seed: int=0):
+        """
+        Constructor for LossyLoopback.
+        :param drop_rate: Probability of dropping a datagram.
+        :param duplicate_rate: Probability of delivering a datagram twice.
+        :param delay: Seconds every datagram takes.
+        :param jitter: Up to this many extra seconds, drawn per datagram, so later datagrams can overtake.
+        :param seed: Seed of the random generator.
+        """
+        self.drop_rate = drop_rate
+        self.duplicate_rate = duplicate_rate
+        self.delay = delay
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.endpoints = {}  # Address -> LossyTransport
+        self.next_port = 40000
+        self.delivered = 0
+        self.dropped = 0
+
+    async def create_datagram_endpoint(self, protocol_factory, local_addr: tuple=None) -> tuple:
+        """
+        Function to open an endpoint, like loop.create_datagram_endpoint.
+        :param protocol_factory: Callable returning the DatagramProtocol.
+        :param local_addr: Requested (host, port), port 0 picks a free one.
+        :return: (transport, protocol) tuple.
+        """
+        host, port = local_addr if local_addr is not None else ("127.0.0.1", 0)
+        if port == 0:
+            port = self.next_port
+            self.next_port += 1
+        addr = (host if host not in ["", "0.0.0.0"] else "127.0.0.1", port)
+        protocol = protocol_factory()
+        transport = LossyTransport(self, addr, protocol)
+        self.endpoints[addr] = transport
+        protocol.connection_made(transport)
+        return transport, protocol
+
+    def send(self, data: bytes, src: tuple, dst: tuple):
+        """
+        Function to carry a datagram, maybe dropping, duplicating or delaying it.
+        :param data: The datagram.
+        :param src: Address of the sender.
+        :param dst: Address of the receiver.
+        :return: None
+        """
+        copies = 2 if self.random.random() < self.duplicate_rate else 1
+        loop = asyncio.get_running_loop()
+        for _ in range(copies):
+            if self.random.random() < self.drop_rate:
+                self.dropped += 1
+                continue
+            loop.call_later(self.delay + self.random.uniform(0, self.jitter), self._deliver, data, src, dst)
+
+    def _deliver(self, data: bytes, src: tuple, dst: tuple):
+        """
+        Utility function to hand a datagram to its receiver, if it is still open.
+        :param data: The datagram.
+        :param src: Address of the sender.
+        :param dst: Address of the receiver.
+        :return: None
+        """
+        transport = self.endpoints.get(dst)
+        if transport is not None:
+            self.delivered += 1
+            transport.protocol.datagram_received(data, src)
@@ -0,0 +1,205 @@
+import bisect
+import heapq
+import itertools
+import math
+import time
+
+
+class QueueEntry:
+    """
+    Class to store a player (or bot) waiting in the Matchmaker's queue.
+    @author sahil1105
+    """
+    __slots__ = ["ticket", "name", "rating", "bucket", "enqueued", "widenings"]
+
+    def __init__(self, ticket: int, name: str, rating: float, bucket: int, enqueued: float):
+        """
+        Constructor for QueueEntry.
+        :param ticket: Ticket of the entry in the queue.
+        :param name: Name of the player.
+        :param rating: Rating of the player.
+        :param bucket: Latency bucket of the player.
+        :param enqueued: Time the player joined the queue.
+        """
+        self.ticket = ticket
+        self.name = name
+        self.rating = rating
+        self.bucket = bucket
+        self.enqueued = enqueued
+        self.widenings = 0  # Times the rating tolerance was widened while waiting
+
+
+class Matchmaker:
+    """
+    Class to pair waiting players by rating within their latency bucket. A player accepts
+    opponents rated within a tolerance, which widens by widen_step every widen_interval
+    seconds spent waiting, up to max_tolerance; a pair is made when either player accepts the
+    other. Past max_tolerance, each further widening reaches one more latency bucket on either
+    side instead, up to max_bucket_reach, so a player alone in its bucket is paired in time.
+    No queue is scanned: each latency bucket keeps its entries sorted by rating, so the closest
+    rated opponents are found by bisection, and a heap orders the entries by when they are
+    checked next, so tick only looks at the entries due. Inserting into and deleting from the
+    sorted lists moves the entries after the position, a memmove of pointers, which stays far
+    below the cost of the bisection's Python code up to about a million players per bucket.
+    A new player is paired at once if possible, within its own bucket. Each of the two nearest
+    rated entries on either side is tried, which can miss a farther entry with a wider
+    tolerance or reach until that entry is next checked.
+    Ratings come from a RatingEngine, when given one, so the lobby and the leaderboards agree.
+    @author sahil1105
+    """
+    def __init__(self, ratings=None, rating_tolerance: float=100.0, widen_step: float=50.0,
+                 widen_interval: float=5.0, max_tolerance: float=800.0, bucket_ms: float=50.0,
+                 max_bucket_reach: int=None, clock=time.monotonic):
+        """
+        Constructor for the Matchmaker. Starts out with an empty queue.
+        :param ratings: RatingEngine to look ratings up in, None to pass them to enqueue.
+        :param rating_tolerance: Largest rating difference a new player accepts.
+        :param widen_step: Increase of the tolerance per widen_interval waited.
+        :param widen_interval: Seconds between widenings.
+        :param max_tolerance: Largest tolerance.
+        :param bucket_ms: Width of the latency buckets, in milliseconds.
+        :param max_bucket_reach: Most latency buckets on either side searched past max_tolerance, None for no limit.
+        :param clock: Function giving the time in seconds.
+        """
+        self.ratings = ratings
+        self.rating_tolerance = rating_tolerance
+        self.widen_step = widen_step
+        self.widen_interval = widen_interval
+        self.max_tolerance = max_tolerance
+        self.bucket_ms = bucket_ms
+        self.max_bucket_reach = max_bucket_reach
+        self.clock = clock
+        self.tickets = itertools.count(1)
+        self.entries = {}  # Ticket -> QueueEntry
+        self.buckets = {}  # Latency bucket -> sorted list of (rating, ticket)
+        self.widen_heap = []  # (time of the next check, ticket), stale tickets skipped when popped
+        self.paired = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def tolerance(self, entry: QueueEntry) -> float:
+        """
+        Utility function to get the rating difference an entry currently accepts.
+        :param entry: The entry.
+        :return: Its tolerance.
+        """
+        return min(self.rating_tolerance + self.widen_step * entry.widenings, self.max_tolerance)
+
+    def bucket_reach(self, entry: QueueEntry) -> int:
+        """
+        Utility function to get how many latency buckets on either side of its own an entry
+        currently accepts opponents from: one more per widening past max_tolerance.
+        :param entry: The entry.
+        :return: Its reach, 0 for its own bucket only.
+        """
+        if self.widen_step <= 0:
+            return 0
+        widenings_to_max = max(0, math.ceil((self.max_tolerance - self.rating_tolerance) / self.widen_step))
+        reach = max(0, entry.widenings - widenings_to_max)
+        return reach if self.max_bucket_reach is None else min(reach, self.max_bucket_reach)
+
+    def enqueue(self, name: str, latency_ms: float, rating: float=None) -> tuple:
+        """
+        Function to add a player to the queue, pairing it at once if possible.
+        :param name: Name of the player.
+        :param latency_ms: Round trip time of the player to the server, in milliseconds.
+        :param rating: Rating of the player. Defaults to its rating in the RatingEngine, the initial one if unrated.
+        :return: (ticket, pair) tuple, the pair being (older entry, newer entry) or None if queued.
+        """
+        if rating is None and self.ratings is not None:
+            player = self.ratings.ids.get(name)  # Not player_id, which would add every passing player
+            rating = float(self.ratings.rating[player]) if player is not None else self.ratings.initial_rating
+        elif rating is None:
+            rating = 0.0
+        now = self.clock()
+        entry = QueueEntry(next(self.tickets), name, rating, int(latency_ms // self.bucket_ms), now)
+        pair = self._match(entry)
+        if pair is None:
+            self.entries[entry.ticket] = entry
+            bisect.insort(self.buckets.setdefault(entry.bucket, []), (entry.rating, entry.ticket))
+            heapq.heappush(self.widen_heap, (now + self.widen_interval, entry.ticket))
+        return entry.ticket, pair
+
+    def _match(self, entry: QueueEntry) -> tuple:
+        """
+        Utility function to find and remove the closest acceptable opponent of an entry: in the
+        nearest latency bucket, then the closest rated.
+        :param entry: The entry, not in the queue.
+        :return: (older entry, newer entry) tuple, or None if no opponent is acceptable.
+        """
+        reach = self.bucket_reach(entry)
+        if reach == 0:
+            keys = [entry.bucket] if entry.bucket in self.buckets else []
+        elif 2 * reach + 1 < len(self.buckets):
+            keys = [key for key in range(entry.bucket - reach, entry.bucket + reach + 1) if key in self.buckets]
+        else:
+            keys = [key for key in self.buckets if abs(key - entry.bucket) <= reach]
+        best = None
+        for key in keys:
+            bucket = self.buckets[key]
+            position = bisect.bisect_left(bucket, (entry.rating, entry.ticket))
+            for index in [position - 1, position]:
+                if 0 <= index < len(bucket):
+                    opponent = self.entries[bucket[index][1]]
+                    distance = (abs(key - entry.bucket), abs(opponent.rating - entry.rating))
+                    if distance[0] <= max(reach, self.bucket_reach(opponent)) and \
+                            distance[1] <= max(self.tolerance(entry), self.tolerance(opponent)) and \
+                            (best is None or distance < best[0]):
+                        best = (distance, opponent)
+        if best is None:
+            return None
+        opponent = best[1]
+        del self.entries[opponent.ticket]
+        self._remove(opponent)
+        self.paired += 2
+        return (opponent, entry) if opponent.enqueued <= entry.enqueued else (entry, opponent)
+
+    def cancel(self, ticket: int) -> bool:
+        """
+        Function to take a player out of the queue.
+        :param ticket: Ticket enqueue gave.
+        :return: True if it was still queued, False otherwise.
+        """
+        entry = self.entries.pop(ticket, None)
+        if entry is None:
+            return False
+        self._remove(entry)
+        return True
+
+    def _remove(self, entry: QueueEntry):
+        """
+        Utility function to take an entry, already out of entries, out of its bucket, dropping
+        the bucket once empty.
+        :param entry: The entry.
+        :return: None
+        """
+        bucket = self.buckets[entry.bucket]
+        del bucket[bisect.bisect_left(bucket, (entry.rating, entry.ticket))]
+        if len(bucket) == 0:
+            del self.buckets[entry.bucket]
+
+    def tick(self) -> list:
+        """
+        Function to widen the tolerances (or bucket reaches) that are due and make the pairs
+        that allows. Entries stay due every widen_interval until paired, so they are checked
+        against players who arrived since. Call it every so often, e.g. every second.
+        :return: List of (older entry, newer entry) pairs made.
+        """
+        now = self.clock()
+        pairs = []
+        while len(self.widen_heap) > 0 and self.widen_heap[0][0] <= now:
+            due, ticket = heapq.heappop(self.widen_heap)
+            entry = self.entries.pop(ticket, None)
+            if entry is None:
+                continue  # Paired or cancelled since
+            self._remove(entry)
+            entry.widenings += 1
+            pair = self._match(entry)
+            if pair is not None:
+                pairs.append(pair)
+                continue
+            self.entries[ticket] = entry
+            bisect.insort(self.buckets.setdefault(entry.bucket, []), (entry.rating, entry.ticket))
+            heapq.heappush(self.widen_heap, (due + self.widen_interval, ticket))
+        return pairs
@@ -0,0 +1,199 @@
+import asyncio
+import struct
+import time
+
+
+class ReliableChannel:
+    """
+    Class to deliver messages over UDP reliably and in order. Every message gets a sequence
+    number and is retransmitted until the peer acknowledges it; the receiver acknowledges
+    every copy it gets, drops duplicates and holds back messages that overtook earlier ones.
+    The retransmission timeout follows RFC 6298: smoothed RTT and RTT variance from the
+    acknowledgements of messages sent once (Karn's algorithm). Every message has a timer of
+    its own, backing off by doubling the timeout on each of its retransmissions, so that a
+    burst of losses among many messages in flight doesn't compound into one huge timeout.
+    Packets are a 5 byte header, kind and sequence number, followed by the message.
+    Reference:
+    https://www.rfc-editor.org/rfc/rfc6298
+    @author sahil1105
+    """
+    # Packet kinds
+    DATA = 0
+    ACK = 1
+    HEADER = struct.Struct("!BI")
+    # RFC 6298 gains
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+
+    def __init__(self, transport, peer_addr: tuple=None, initial_rto: float=1.0, min_rto: float=0.2,
+                 max_rto: float=60.0, max_retransmissions: int=10, clock=time.monotonic):
+        """
+        Constructor for the ReliableChannel.
+        :param transport: Anything with sendto(data, addr), e.g. an asyncio DatagramTransport.
+        :param peer_addr: Address to send to. May be set later, acknowledgements go to where data came from.
+        :param initial_rto: Retransmission timeout before the first RTT measurement, in seconds.
+        :param min_rto: Lower bound of the timeout. RFC 6298 asks for 1 s on the internet, LAN games can use less.
+        :param max_rto: Upper bound of the timeout.
+        :param max_retransmissions: Retransmissions of a message after which the peer is considered gone.
+        :param clock: Function giving the time in seconds.
+        """
+        self.transport = transport
+        self.peer_addr = peer_addr
+        self.rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.max_retransmissions = max_retransmissions
+        self.clock = clock
+        self.srtt = None
+        self.rttvar = None
+        self.next_seq = 0
+        self.unacked = {}  # Sequence number -> [packet, time first sent, retransmissions, timer]
+        self.next_expected = 0  # Sequence number of the next message to deliver
+        self.held_back = {}  # Sequence number -> message, received ahead of next_expected
+        self.messages = asyncio.Queue()
+        self.error = None
+        self._drained = None
+        # Counters, for monitoring
+        self.sent = 0
+        self.retransmissions = 0
+        self.duplicates = 0
+
+    def send(self, message: bytes) -> int:
+        """
+        Function to send a message, retransmitting it until acknowledged.
+        :param message: The message.
+        :return: Its sequence number.
+        :raises ConnectionError: If the peer is gone.
+        """
+        if self.error is not None:
+            raise self.error
+        seq = self.next_seq
+        self.next_seq = (self.next_seq + 1) & 0xFFFFFFFF
+        packet = ReliableChannel.HEADER.pack(ReliableChannel.DATA, seq) + message
+        self.unacked[seq] = [packet, self.clock(), 0, None]
+        self.sent += 1
+        self._transmit(seq)
+        return seq
+
+    def _transmit(self, seq: int):
+        """
+        Utility function to (re)send a message and arm its retransmission timer.
+        :param seq: Sequence number of the message.
+        :return: None
+        """
+        entry = self.unacked[seq]
+        self.transport.sendto(entry[0], self.peer_addr)
+        timeout = min(self.rto * 2 ** entry[2], self.max_rto)  # Backed off per retransmission
+        entry[3] = asyncio.get_running_loop().call_later(timeout, self._timeout, seq)
+
+    def _timeout(self, seq: int):
+        """
+        Utility function run when a message wasn't acknowledged in time.
+        :param seq: Sequence number of the message.
+        :return: None
+        """
+        entry = self.unacked.get(seq)
+        if entry is None:
+            return
+        if entry[2] >= self.max_retransmissions:
+            self.fail(ConnectionError("No acknowledgement from {} after {} retransmissions"
+                                      .format(self.peer_addr, entry[2])))
+            return
+        entry[2] += 1
+        self.retransmissions += 1
+        self._transmit(seq)
+
+    def _measure(self, rtt: float):
+        """
+        Utility function to update the RTT estimates and the timeout with a measurement, as in RFC 6298.
+        :param rtt: Measured round trip time in seconds.
+        :return: None
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - ReliableChannel.BETA) * self.rttvar + ReliableChannel.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - ReliableChannel.ALPHA) * self.srtt + ReliableChannel.ALPHA * rtt
+        self.rto = min(max(self.srtt + 4 * self.rttvar, self.min_rto), self.max_rto)
+
+    def datagram_received(self, data: bytes, addr: tuple):
+        """
+        Function to handle a packet from the peer.
+        :param data: The packet.
+        :param addr: Address it came from.
+        :return: None
+        """
+        if len(data) < ReliableChannel.HEADER.size:
+            return  # Not ours
+        kind, seq = ReliableChannel.HEADER.unpack_from(data)
+        if kind == ReliableChannel.ACK:
+            entry = self.unacked.pop(seq, None)
+            if entry is not None:
+                entry[3].cancel()
+                if entry[2] == 0:  # Karn: a retransmitted message's ack could be of any copy
+                    self._measure(self.clock() - entry[1])
+                if len(self.unacked) == 0 and self._drained is not None:
+                    self._drained.set()
+            return
+        if kind != ReliableChannel.DATA:
+            return
+        self.transport.sendto(ReliableChannel.HEADER.pack(ReliableChannel.ACK, seq), addr)  # Ack every copy
+        if (seq - self.next_expected) & 0xFFFFFFFF >= 0x80000000 or seq in self.held_back:
+            self.duplicates += 1  # Already delivered or held back
+            return
+        self.held_back[seq] = data[ReliableChannel.HEADER.size:]
+        while self.next_expected in self.held_back:
+            self.messages.put_nowait((self.held_back.pop(self.next_expected), addr))
+            self.next_expected = (self.next_expected + 1) & 0xFFFFFFFF
+
+    async def receive(self) -> tuple:
+        """
+        Function to wait for the next message, in the order they were sent.
+        :return: (message, address) tuple.
+        :raises ConnectionError: If the peer is gone or the channel was closed.
+        """
+        message, addr = await self.messages.get()
+        if message is None:
+            self.messages.put_nowait((None, None))  # Keep waking up later receivers
+            raise self.error
+        return message, addr
+
+    async def drain(self, timeout: float=None) -> bool:
+        """
+        Function to wait until every message sent was acknowledged.
+        :param timeout: Maximum number of seconds to wait, None waits until acknowledged or failed.
+        :return: True if everything was acknowledged, False otherwise.
+        """
+        if len(self.unacked) == 0:
+            return self.error is None
+        self._drained = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.error is None and len(self.unacked) == 0
+
+    def fail(self, error: Exception):
+        """
+        Utility function to stop retransmitting and wake up receivers with an error.
+        :param error: Exception receivers get.
+        :return: None
+        """
+        if self.error is not None:
+            return
+        self.error = error
+        for entry in self.unacked.values():
+            if entry[3] is not None:
+                entry[3].cancel()
+        self.unacked.clear()
+        self.messages.put_nowait((None, None))
+        if self._drained is not None:
+            self._drained.set()
+
+    def close(self):
+        """
+        Utility function to stop the channel.
+        :return: None
+        """
+        self.fail(ConnectionError("Channel closed"))
@@ -0,0 +1,330 @@
+import unittest
+import asyncio
+import threading
+import time
+from Networking.AsyncBattleshipNetwork import *
+from Networking.BattleshipNetworkingBackend import BattleshipNetwork
+from Networking.LossyLoopback import LossyLoopback
+from Networking import WireProtocol
+from Networking.client import BattleshipClient
+from Networking.server import BattleshipServer
+
+
+class TestAsyncBattleshipNetwork(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the asyncio networking backend, its blocking
+    wrapper and that it still talks to the socket based client and server, over localhost.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Use a loop thread of our own.
+        :return: None
+        """
+        self.loop_thread = EventLoopThread()
+
+    def tearDown(self):
+        """
+        Stop the loop thread.
+        :return: None
+        """
+        self.loop_thread.close()
+
+    async def play_exchange(self, host: AsyncBattleshipNetwork, guest: AsyncBattleshipNetwork) -> list:
+        """
+        Helper to play a few moves between two asyncio backends.
+        :param host: Backend hosting the game.
+        :param guest: Backend joining it.
+        :return: Responses the host received.
+        """
+        hosting = asyncio.ensure_future(host.start_game())
+        while host.my_addr is None:
+            await asyncio.sleep(0)
+        await guest.join_game(*host.my_addr)
+        await hosting
+        assert host.opp_addr == guest.my_addr  # Answered where the hello came from
+        responses = []
+        for move, response in [((1, 2), 0), ((3, 4), 1), ((5, 6), 3)]:
+            waiting = asyncio.ensure_future(host.transmit_move_and_get_response(move))
+            assert await guest.get_move() == move
+            await guest.send_response(response)
+            responses.append(await waiting)
+        await host.end_game()
+        await guest.end_game()
+        return responses
+
+    def test_async_games(self):
+        """
+        Test many games multiplexed on one event loop.
+        :return: None
+        """
+        async def play_all():
+            return await asyncio.gather(*[self.play_exchange(AsyncBattleshipNetwork("127.0.0.1"),
+                                                             AsyncBattleshipNetwork("127.0.0.1")) for _ in range(20)])
+        for responses in asyncio.run(play_all()):
+            assert responses == [0, 1, 3]
+
+    def test_host_then_join(self):
+        """
+        Test that a backend which hosted a session and then joined another one isn't the host
+        anymore, so only the new host moves first after a rematch.
+        :return: None
+        """
+        async def play():
+            player, first_guest, new_host = [AsyncBattleshipNetwork("127.0.0.1") for _ in range(3)]
+            assert await self.play_exchange(player, first_guest) == [0, 1, 3]
+            hosting = asyncio.ensure_future(new_host.start_game())
+            while new_host.my_addr is None:
+                await asyncio.sleep(0)
+            await player.join_game(*new_host.my_addr)
+            await hosting
+            roles = (player.hosting, new_host.hosting)
+            assert await asyncio.gather(player.rematch(), new_host.rematch()) == [2, 2]
+            waiting = asyncio.ensure_future(new_host.transmit_move_and_get_response((4, 4)))
+            move = await player.get_move()
+            await player.send_response(0)
+            response = await waiting
+            await player.end_game()
+            await new_host.end_game()
+            return roles, move, response
+
+        assert asyncio.run(play()) == ((False, True), (4, 4), 0)
+
+    def test_tcp_games(self):
+        """
+        Test games over TCP connections, including batches of moves split across reads.
+        :return: None
+        """
+        async def play_all():
+            games = [(AsyncBattleshipNetwork("127.0.0.1", transport="tcp"),
+                      AsyncBattleshipNetwork("127.0.0.1", transport="tcp")) for _ in range(10)]
+            results = await asyncio.gather(*[self.play_exchange(host, guest) for host, guest in games])
+            host = AsyncBattleshipNetwork("127.0.0.1", transport="tcp")
+            guest = AsyncBattleshipNetwork("127.0.0.1", transport="tcp")
+            hosting = asyncio.ensure_future(host.start_game())
+            while host.my_addr is None:
+                await asyncio.sleep(0)
+            await guest.join_game(*host.my_addr)
+            await hosting
+            moves = [(index % 10, index // 10) for index in range(250)]
+
+            async def answer():
+                for _ in moves:
+                    x, y = await guest.get_move()
+                    await guest.send_response((x * y) % 3)
+
+            responses, _ = await asyncio.gather(host.transmit_moves(moves), answer())
+            await guest.end_game()
+            try:
+                await asyncio.wait_for(host.get_move(), 5)
+                closed = False
+            except ConnectionError:
+                closed = True
+            await host.end_game()
+            return results, responses == [(x * y) % 3 for x, y in moves], closed
+
+        results, batched, closed = asyncio.run(play_all())
+        assert all(responses == [0, 1, 3] for responses in results)
+        assert batched and closed
+        self.assertRaises(ValueError, AsyncBattleshipNetwork, transport="sctp")
+        self.assertRaises(ValueError, AsyncBattleshipNetwork, transport="tcp", network=LossyLoopback())
+
+    def test_rematch(self):
+        """
+        Test a series of games in one session, over a lossy UDP network and over TCP: no new
+        sockets, and a move still in flight when the game ended doesn't leak into the next one.
+        :return: None
+        """
+        async def play_series(host: AsyncBattleshipNetwork, guest: AsyncBattleshipNetwork) -> list:
+            hosting = asyncio.ensure_future(host.start_game())
+            while host.my_addr is None:
+                await asyncio.sleep(0)
+            await guest.join_game(*host.my_addr)
+            await hosting
+            results = []
+            late = []
+            for game in range(1, 4):
+                if game > 1:
+                    assert await asyncio.gather(host.rematch(), guest.rematch()) == [game, game]
+                shooting = asyncio.ensure_future(host.transmit_move_and_get_response((game, game)))
+                assert await guest.get_move() == (game, game)
+                await guest.send_response(0)
+                assert await shooting == 0
+                late.append(asyncio.ensure_future(host.transmit_move_and_get_response((9, 9))))  # Crosses the forfeit
+                await guest.send_response(3)  # Forfeit
+                results.append(await host.get_move())
+                await asyncio.sleep(0.01)
+            await asyncio.gather(host.rematch(), guest.rematch())
+            for shot in late:
+                self.assertRaises(ConnectionError, shot.result)
+            shooting = asyncio.ensure_future(host.transmit_move_and_get_response((4, 4)))
+            assert await guest.get_move() == (4, 4)
+            await guest.send_response(1)
+            assert await shooting == 1
+            await host.end_game()
+            await guest.end_game()
+            return [results, host.session_id == guest.session_id, host.connection_setups, guest.connection_setups,
+                    guest.stale > 0]
+
+        async def play():
+            loopback = LossyLoopback(drop_rate=0.2, delay=0.001, jitter=0.003, seed=4)
+            options = {"initial_rto": 0.05, "min_rto": 0.01}
+            return await asyncio.gather(
+                play_series(AsyncBattleshipNetwork(network=loopback, channel_options=options),
+                            AsyncBattleshipNetwork(network=loopback, channel_options=options)),
+                play_series(AsyncBattleshipNetwork("127.0.0.1", transport="tcp"),
+                            AsyncBattleshipNetwork("127.0.0.1", transport="tcp")))
+
+        for series in asyncio.run(play()):
+            assert series == [[(3,), (3,), (3,)], True, 1, 1, True]
+
+    def test_blocking_wrapper(self):
+        """
+        Test the blocking API, with the host on a thread of its own like the controller would be.
+        :return: None
+        """
+        host = BattleshipNetwork(None, self.loop_thread, "127.0.0.1")
+        guest = BattleshipNetwork(None, self.loop_thread, "127.0.0.1")
+        hosting = threading.Thread(target=host.start_game)
+        hosting.start()
+        while host.my_server_addr is None:
+            time.sleep(0.01)
+        guest.join_game(*host.my_server_addr)
+        hosting.join(5)
+        responses = []
+
+        def shoot():
+            responses.append(host.transmit_move_and_get_response((2, 7)))
+
+        shooting = threading.Thread(target=shoot)
+        shooting.start()
+        assert guest.get_move() == (2, 7)
+        guest.send_response(2)
+        shooting.join(5)
+        guest.send_response(3)  # Forfeit
+        assert host.get_move() == (3,)
+        assert responses == [2]
+        host.end_game()
+        guest.end_game()
+
+    def test_wrapper_sessions(self):
+        """
+        Test that the blocking API gives up on a rematch after its timeout, and closes a dead
+        session's endpoint before hosting the next one.
+        :return: None
+        """
+        host = BattleshipNetwork(None, self.loop_thread, "127.0.0.1")
+        transports = []
+        for session in range(2):
+            guest = BattleshipNetwork(None, self.loop_thread, "127.0.0.1")
+            hosting = threading.Thread(target=host.start_game)
+            hosting.start()
+            while host.connection_setups == session:
+                time.sleep(0.01)
+            transports.append(host.backend.transport)
+            guest.join_game(*host.my_server_addr)
+            hosting.join(5)
+            assert host.in_session and guest.in_session
+            start = time.monotonic()
+            self.assertRaises(TimeoutError, guest.rematch, 0.2)  # The host never asks
+            assert time.monotonic() - start < 2 and guest.backend.game == 2
+            guest.end_game()
+            host.loop_thread.call(host.backend._dispatcher.cancel)  # The session dies
+            while host.in_session:
+                time.sleep(0.01)
+        assert transports[0].is_closing() and not transports[1].is_closing() and host.connection_setups == 2
+        host.end_game()
+        assert transports[1].is_closing()
+
+    def test_socket_peer(self):
+        """
+        Test that the asyncio backend hosts a game joined by the socket based client and server.
+        :return: None
+        """
+        host = AsyncBattleshipNetwork("127.0.0.1", reliable=False)
+        server = BattleshipServer()
+        server.addr = ("127.0.0.1", 0)
+        server.start_server()
+        hosting = threading.Thread(target=self.loop_thread.run, args=(host.start_game(), 5))
+        hosting.start()
+        while host.my_addr is None:
+            time.sleep(0.01)
+        client = BattleshipClient(host.my_addr)
+        client.send_data("4,5")  # Not a hello, ignored
+        client.connect_to_server("127.0.0.1,{}".format(server.port))
+        hosting.join(5)
+        assert host.opp_addr == ("127.0.0.1", server.port)
+        client.send_data(b"\x01\x02")  # Malformed, dropped
+        client.send_data(WireProtocol.encode_move(7, (4, 5)))
+        assert self.loop_thread.run(host.get_move(), 5) == (4, 5)
+        self.loop_thread.run(host.send_response(1))
+        assert server.get_messages() == [(WireProtocol.RESPONSE, 7, 1)]
+        assert host.malformed == 2
+        self.loop_thread.run(host.end_game())
+        client.shutdown()
+        server.close_server()
+
+    def test_pipelined_moves(self):
+        """
+        Test several moves in flight at once over a network which reorders them: every response
+        must reach the move it answers.
+        :return: None
+        """
+        async def play():
+            loopback = LossyLoopback(delay=0.001, jitter=0.01, seed=3)
+            host = AsyncBattleshipNetwork(reliable=False, network=loopback)
+            guest = AsyncBattleshipNetwork(reliable=False, network=loopback)
+            hosting = asyncio.ensure_future(host.start_game())
+            await asyncio.sleep(0)
+            await guest.join_game(*host.my_addr)
+            await hosting
+            moves = [(index % 10, index // 10) for index in range(40)]
+
+            async def answer():
+                for _ in moves:
+                    x, y = await guest.get_move()
+                    await guest.send_response((x + y) % 3)
+
+            responses, _ = await asyncio.gather(host.transmit_moves(moves), answer())
+            await guest.send_response(3)  # Forfeit, answers no move
+            forfeit = await host.get_move()
+            await host.end_game()
+            await guest.end_game()
+            return moves, responses, forfeit, host.rtt_percentiles()
+
+        moves, responses, forfeit, rtts = asyncio.run(play())
+        assert responses == [(x + y) % 3 for x, y in moves]
+        assert forfeit == (3,)
+        assert rtts["count"] == 40 and 0 < rtts["p50"] <= rtts["p99"] <= rtts["max"]
+
+    def test_resync(self):
+        """
+        Test that a response lost on an unreliable network is sent again when asked for.
+        :return: None
+        """
+        async def play():
+            loopback = LossyLoopback()
+            host = AsyncBattleshipNetwork(reliable=False, network=loopback)
+            guest = AsyncBattleshipNetwork(reliable=False, network=loopback)
+            hosting = asyncio.ensure_future(host.start_game())
+            await asyncio.sleep(0)
+            await guest.join_game(*host.my_addr)
+            await hosting
+            shooting = asyncio.ensure_future(host.transmit_move_and_get_response((1, 1)))
+            assert await guest.get_move() == (1, 1)
+            loopback.drop_rate = 1.0
+            await guest.send_response(2)  # Lost
+            await asyncio.sleep(0.01)
+            loopback.drop_rate = 0.0
+            assert not shooting.done()
+            host.request_resync()
+            response = await asyncio.wait_for(shooting, 5)
+            await host.end_game()
+            await guest.end_game()
+            return response
+
+        assert asyncio.run(play()) == 2
+        assert percentile([1, 2, 3, 4], 0.5) == 2 and percentile([1, 2, 3, 4], 0.99) == 4
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+import asyncio
+import numpy as np
+from random import Random
+from Networking.GameServer import *
+from Networking.Matchmaker import Matchmaker
+from Simulation.RatingEngine import RatingEngine
+from Networking.AsyncBattleshipNetwork import AsyncBattleshipNetwork
+from Networking import WireProtocol
+
+
+class TestGameServer(unittest.TestCase):
+    """
+    UnitTest class to check the state machine of a GameSession, and games played on a
+    GameServer by asyncio backends over localhost.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Every location of the standard board, in order.
+        :return: None
+        """
+        self.cells = [(x, y) for x in range(10) for y in range(10)]
+
+    def test_session(self):
+        """
+        Test turns, invalid moves, winning, forfeiting and rematches without any sockets.
+        :return: None
+        """
+        session = GameSession(1, 11, rng=Random(0))
+        assert session.state == GameSession.WAITING
+        assert session.handle(0, WireProtocol.MOVE, 1, (0, 0)) == [(0, WireProtocol.encode_response(1, -1))]
+        session.join(22)
+        assert session.state == GameSession.PLAYING and session.game == 1
+        assert session.handle(1, WireProtocol.MOVE, 2, (0, 0)) == [(1, WireProtocol.encode_response(2, -1))]
+        board = session.boards[1].board.copy()
+        ships = [cell for cell in self.cells if board[cell] == 1]
+        empty = [cell for cell in self.cells if board[cell] == 0]
+        messages = session.handle(0, WireProtocol.MOVE, 3, ships[0])
+        assert WireProtocol.decode(messages[0][1])[0][2] in [1, 2]
+        assert messages[1] == (1, WireProtocol.encode_move(1, ships[0]))  # The other player is told
+        assert session.turn == 0  # A hit keeps the turn
+        assert session.handle(0, WireProtocol.MOVE, 4, ships[0])[0] == (0, WireProtocol.encode_response(4, -1))
+        empty = [cell for cell in empty if session.boards[1].board[cell] == 0]  # Not marked redundant by the hit
+        session.handle(0, WireProtocol.MOVE, 5, empty[0])
+        assert session.turn == 1  # A miss passes it
+        session.turn = 0
+        responses = [WireProtocol.decode(session.handle(0, WireProtocol.MOVE, 6, cell)[0][1])[0][2]
+                     for cell in ships[1:]]
+        assert responses[-1] == 3 and set(responses) <= {1, 2, 3}
+        assert session.state == GameSession.OVER and session.winner == 0 and session.moves == len(ships) + 2
+        assert session.handle(1, WireProtocol.REMATCH, 22, 2) == []
+        assert session.handle(0, WireProtocol.REMATCH, 11, 2) == [(0, WireProtocol.encode_rematch(11, 2)),
+                                                                  (1, WireProtocol.encode_rematch(22, 2))]
+        assert session.state == GameSession.PLAYING and session.game == 2
+        assert session.handle(0, WireProtocol.FORFEIT, 0, None) == [(1, WireProtocol.encode_forfeit())]
+        assert session.winner == 1 and session.abandon(0) == []
+
+    def test_server(self):
+        """
+        Test several sessions on one server, each playing two games and a rematch on the same
+        connections, with asyncio backends as the players.
+        :return: None
+        """
+        async def play_game(players: list, server: GameServer, session_id: int) -> int:
+            shooter = 0
+            cells = [iter(self.cells), iter(self.cells)]
+            knowledge = [np.zeros((10, 10), dtype=int), np.zeros((10, 10), dtype=int)]
+            while True:
+                cell = next(cells[shooter])
+                if knowledge[shooter][cell] != 0:
+                    continue  # Known from the referee's marks
+                response = await players[shooter].transmit_move_and_get_response(cell)
+                for loc, state in players[shooter].take_marks():
+                    knowledge[shooter][loc] = state
+                assert knowledge[shooter][cell] == (-2 if response == 0 else -1)
+                assert await players[1 - shooter].get_move() == cell  # Told about it
+                await players[1 - shooter].send_response(0)  # Ignored by the server
+                if response == 3:
+                    session = server.sessions[session_id]
+                    revealed = session.boards[1 - shooter].board
+                    assert session.winner == shooter and (knowledge[shooter] == np.minimum(revealed, 0)).all()
+                    return shooter
+                if response == 0:
+                    shooter = 1 - shooter
+
+        async def play_session(players: list, server: GameServer, session_id: int) -> list:
+            winners = [await play_game(players, server, session_id)]
+            assert await asyncio.gather(*[player.rematch() for player in players]) == [2, 2]
+            winners.append(await play_game(players, server, session_id))
+            return winners
+
+        async def play():
+            server = GameServer("127.0.0.1", seed=5)
+            addr = await server.start()
+            sessions = []
+            for session_id in range(1, 6):
+                players = [AsyncBattleshipNetwork("127.0.0.1", transport="tcp") for _ in range(2)]
+                await players[0].join_game(*addr)
+                while server.waiting is None or server.waiting.session_id != session_id:
+                    await asyncio.sleep(0.001)
+                await players[1].join_game(*addr)
+                while server.games < session_id:
+                    await asyncio.sleep(0.001)
+                sessions.append(players)
+            results = await asyncio.gather(*[play_session(players, server, session_id + 1)
+                                             for session_id, players in enumerate(sessions)])
+            counts = (server.games, server.connections, len(server.sessions))
+            report = server.report()
+            assert report["games"] == 10 and report["profile"]["RefereeBoard.resolve"]["calls"] == server.moves
+            for players in sessions:
+                for player in players:
+                    await player.end_game()
+            while len(server.sessions) > 0:
+                await asyncio.sleep(0.001)
+            await server.close()
+            return results, counts, server.moves
+
+        with Profiler():
+            results, counts, moves = asyncio.run(play())
+        assert all(len(winners) == 2 and set(winners) <= {0, 1} for winners in results)
+        assert counts == (10, 10, 5) and moves > 0
+
+    def test_lobby(self):
+        """
+        Test players paired by rating through the lobby, a pair made by widening, and a player
+        leaving the queue.
+        :return: None
+        """
+        async def lobby():
+            ratings = RatingEngine()
+            for player_id, rating in [(1, 1000.0), (2, 2000.0), (3, 1010.0), (4, 1990.0), (5, 1500.0), (6, 1700.0)]:
+                ratings.rating[ratings.player_id(str(player_id))] = rating
+            server = GameServer("127.0.0.1", seed=1, matchmaker=Matchmaker(ratings, widen_interval=0.05))
+            addr = await server.start()
+            players = {player_id: AsyncBattleshipNetwork("127.0.0.1", transport="tcp") for player_id in range(1, 8)}
+            joins = {}
+            for player_id in range(1, 5):
+                joins[player_id] = asyncio.ensure_future(players[player_id].join_lobby(*addr, player_id, 10))
+                await asyncio.sleep(0.01)  # In order
+            indices = {player_id: await join for player_id, join in joins.items()}
+            pairs = sorted(session.player_ids for session in server.sessions.values())
+            response = await players[1].transmit_move_and_get_response((0, 0))
+            assert await players[3].get_move() == (0, 0) and response in [0, 1, 2]
+            leaving = asyncio.ensure_future(players[7].join_lobby(*addr, 7, 10))
+            while len(server.matchmaker) == 0:
+                await asyncio.sleep(0.001)
+            await players[7].end_game()
+            while len(server.queued) > 0:
+                await asyncio.sleep(0.001)
+            assert isinstance(leaving.exception(), ConnectionError)
+            widened = await asyncio.gather(players[5].join_lobby(*addr, 5, 10), players[6].join_lobby(*addr, 6, 10))
+            counts = (server.games, len(server.matchmaker), server.matchmaker.paired)
+            for player in players.values():
+                await player.end_game()
+            await server.close()
+            return indices, pairs, widened, counts
+
+        indices, pairs, widened, counts = asyncio.run(lobby())
+        assert indices == {1: 0, 2: 0, 3: 1, 4: 1} and pairs == [[1, 3], [2, 4]]
+        assert sorted(widened) == [0, 1] and counts == (3, 0, 6)
+
+    def test_idle_sweep(self):
+        """
+        Test that idle sessions are closed, and their players told.
+        :return: None
+        """
+        async def idle():
+            server = GameServer("127.0.0.1", idle_timeout=0.05)
+            addr = await server.start()
+            player = AsyncBattleshipNetwork("127.0.0.1", transport="tcp")
+            await player.join_game(*addr)
+            while len(server.sessions) == 0:
+                await asyncio.sleep(0.001)
+            try:
+                await asyncio.wait_for(player.get_move(), 5)
+                closed = False
+            except ConnectionError:
+                closed = True
+            await player.end_game()
+            await server.close()
+            return closed, len(server.sessions)
+
+        assert asyncio.run(idle()) == (True, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+from random import Random
+from Networking.Matchmaker import *
+from Simulation.RatingEngine import RatingEngine
+
+
+class TestMatchmaker(unittest.TestCase):
+    """
+    UnitTest class to check that the Matchmaker pairs by rating within latency buckets, widens
+    the tolerances of waiting players, and keeps its indices consistent.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. A Matchmaker on a clock the tests move by hand.
+        :return: None
+        """
+        self.now = 0.0
+        self.matchmaker = Matchmaker(rating_tolerance=100.0, widen_step=50.0, widen_interval=5.0,
+                                     max_tolerance=300.0, bucket_ms=50.0, clock=lambda: self.now)
+
+    def check_indices(self):
+        """
+        Utility function to check that the buckets hold exactly the queued entries, sorted by
+        rating, and that no bucket is left empty.
+        :return: None
+        """
+        indexed = sorted(ticket for bucket in self.matchmaker.buckets.values() for _, ticket in bucket)
+        assert indexed == sorted(self.matchmaker.entries)
+        for bucket in self.matchmaker.buckets.values():
+            assert len(bucket) > 0 and bucket == sorted(bucket)
+
+    def test_pairing(self):
+        """
+        Test pairing at once with the closest rated player of the same bucket only.
+        :return: None
+        """
+        first, pair = self.matchmaker.enqueue("a", 20, 1500)
+        assert pair is None
+        assert self.matchmaker.enqueue("b", 30, 1700)[1] is None  # Too far in rating
+        assert self.matchmaker.enqueue("c", 80, 1510)[1] is None  # Another latency bucket
+        assert self.matchmaker.enqueue("d", 10, 1640)[1][0].name == "b"  # Closer to b than to a
+        self.now = 1.0
+        _, pair = self.matchmaker.enqueue("e", 49, 1450)
+        assert [entry.name for entry in pair] == ["a", "e"] and pair[0].ticket == first
+        assert len(self.matchmaker) == 1 and self.matchmaker.paired == 4
+        self.check_indices()
+
+    def test_widening(self):
+        """
+        Test that tolerances widen while waiting, only for the entries due, up to the maximum,
+        and that entries stay due after.
+        :return: None
+        """
+        self.matchmaker.enqueue("a", 0, 1000)
+        self.now = 2.0
+        self.matchmaker.enqueue("b", 0, 1190)
+        self.matchmaker.enqueue("c", 0, 3000)
+        self.now = 5.0
+        assert self.matchmaker.tick() == []  # a accepts 150 now
+        assert [self.matchmaker.entries[ticket].widenings for ticket in [1, 2, 3]] == [1, 0, 0]
+        self.now = 10.0
+        pairs = self.matchmaker.tick()
+        assert len(pairs) == 1 and [entry.name for entry in pairs[0]] == ["a", "b"]
+        self.now = 1000.0
+        assert self.matchmaker.tick() == [] and self.matchmaker.tolerance(self.matchmaker.entries[3]) == 300.0
+        assert self.matchmaker.widen_heap == [(1002.0, 3)]  # Still checked against new arrivals
+        self.check_indices()
+
+    def test_bucket_reach(self):
+        """
+        Test that players alone in their latency bucket are paired with the nearest buckets
+        once their tolerance is at the maximum, and empty buckets dropped.
+        :return: None
+        """
+        self.matchmaker.enqueue("a", 0, 1000)
+        self.matchmaker.enqueue("far", 300, 1000)  # Six buckets away
+        self.matchmaker.enqueue("b", 120, 1000)  # Two buckets away
+        assert sorted(self.matchmaker.buckets) == [0, 2, 6]
+        for widenings in range(1, 5):  # Up to the maximum tolerance, own bucket only
+            self.now = 5.0 * widenings
+            assert self.matchmaker.tick() == [] and self.matchmaker.bucket_reach(self.matchmaker.entries[1]) == 0
+        self.now = 25.0
+        assert self.matchmaker.tick() == []  # One bucket on either side
+        self.now = 30.0
+        pairs = self.matchmaker.tick()
+        assert [sorted(entry.name for entry in pair) for pair in pairs] == [["a", "b"]]
+        assert sorted(self.matchmaker.buckets) == [6] and self.matchmaker.widen_heap == [(35.0, 2)]
+        self.matchmaker.max_bucket_reach = 3
+        self.now = 1000.0
+        assert self.matchmaker.tick() == [] and self.matchmaker.bucket_reach(self.matchmaker.entries[2]) == 3
+        assert self.matchmaker.enqueue("near", 160, 1200)[1] is None  # Arrivals search their own bucket only
+        self.now = 1005.0
+        assert [[entry.name for entry in pair] for pair in self.matchmaker.tick()] == [["far", "near"]]
+        assert len(self.matchmaker.buckets) == 0
+        self.check_indices()
+
+    def test_cancel_and_ratings(self):
+        """
+        Test cancelled players are never paired, and ratings looked up in a RatingEngine.
+        :return: None
+        """
+        ratings = RatingEngine()
+        ratings.rating[ratings.player_id("strong")] = 2000.0
+        self.matchmaker.ratings = ratings
+        ticket, _ = self.matchmaker.enqueue("strong", 0)
+        assert self.matchmaker.entries[ticket].rating == 2000.0
+        assert self.matchmaker.cancel(ticket) and not self.matchmaker.cancel(ticket)
+        self.now = 20.0
+        assert self.matchmaker.tick() == []
+        assert self.matchmaker.enqueue("newcomer", 0)[1] is None and ratings.num_players == 1
+        assert self.matchmaker.enqueue("newcomer too", 0)[1] is not None  # Both at the initial rating
+        self.check_indices()
+
+    def test_random(self):
+        """
+        Test random arrivals, cancels and ticks: every player is paired at most once, within the
+        tolerances, and the indices stay consistent.
+        :return: None
+        """
+        rng = Random(0)
+        tickets = []
+        seen = set()
+        for _ in range(2000):
+            self.now += rng.random()
+            operation = rng.random()
+            if operation < 0.6:
+                ticket, pair = self.matchmaker.enqueue("p", rng.uniform(0, 200), rng.gauss(1500, 300))
+                tickets.append(ticket)
+                pairs = [pair] if pair is not None else []
+            elif operation < 0.8 and len(tickets) > 0:
+                self.matchmaker.cancel(rng.choice(tickets))
+                pairs = []
+            else:
+                pairs = self.matchmaker.tick()
+            for older, newer in pairs:
+                assert older.ticket not in seen and newer.ticket not in seen
+                reach = max(self.matchmaker.bucket_reach(older), self.matchmaker.bucket_reach(newer))
+                assert abs(older.bucket - newer.bucket) <= reach
+                assert older.enqueued <= newer.enqueued
+                assert abs(older.rating - newer.rating) <= self.matchmaker.max_tolerance
+                seen.update([older.ticket, newer.ticket])
+            assert seen.isdisjoint(self.matchmaker.entries)
+        self.check_indices()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import asyncio
+from Networking.ReliableChannel import *
+from Networking.LossyLoopback import LossyLoopback
+from Networking.AsyncBattleshipNetwork import AsyncBattleshipNetwork, BattleshipDatagramProtocol
+
+
+class TestReliableChannel(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the ReliableChannel over a LossyLoopback that
+    drops, duplicates and reorders datagrams.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Use short timeouts, the loopback's delays are milliseconds.
+        :return: None
+        """
+        self.options = {"initial_rto": 0.05, "min_rto": 0.01}
+
+    async def open_pair(self, loopback: LossyLoopback, **options) -> tuple:
+        """
+        Helper to open two endpoints on the loopback with channels pointing at each other.
+        :param loopback: The LossyLoopback.
+        :param options: Keyword arguments of the channels.
+        :return: (channel a, channel b) tuple.
+        """
+        channels = []
+        for _ in range(2):
+            transport, protocol = await loopback.create_datagram_endpoint(BattleshipDatagramProtocol)
+            protocol.channel = ReliableChannel(transport, **options)
+            channels.append(protocol.channel)
+        channels[0].peer_addr = channels[1].transport.addr
+        channels[1].peer_addr = channels[0].transport.addr
+        return channels[0], channels[1]
+
+    def test_in_order_exactly_once(self):
+        """
+        Test that every message arrives once and in order despite drops, duplicates and reordering.
+        The timeouts are capped so that even the unluckiest message, a packet or its ack lost on
+        every one of its 60 retransmissions, gives up within 3 seconds, inside the drain's budget
+        whatever the loopback drops.
+        :return: None
+        """
+        async def exchange():
+            loopback = LossyLoopback(drop_rate=0.3, duplicate_rate=0.2, delay=0.001, jitter=0.01, seed=1)
+            sender, receiver = await self.open_pair(loopback, max_rto=0.05, max_retransmissions=60, **self.options)
+            for index in range(200):
+                sender.send(str(index).encode())
+            received = [int((await receiver.receive())[0]) for _ in range(200)]
+            assert await sender.drain(10)
+            assert receiver.messages.empty()
+            return sender, receiver, received
+
+        sender, receiver, received = asyncio.run(exchange())
+        assert received == list(range(200))
+        assert sender.retransmissions > 0 and receiver.duplicates > 0 and sender.srtt is not None
+
+    def test_rto(self):
+        """
+        Test the timeout against RFC 6298 with made up measurements.
+        :return: None
+        """
+        channel = ReliableChannel(None, min_rto=0.0)
+        channel._measure(0.1)
+        assert abs(channel.srtt - 0.1) < 1e-12 and abs(channel.rto - 0.3) < 1e-12
+        channel._measure(0.2)
+        assert abs(channel.rttvar - (0.75 * 0.05 + 0.25 * 0.1)) < 1e-12
+        assert abs(channel.srtt - (0.875 * 0.1 + 0.125 * 0.2)) < 1e-12
+        assert abs(channel.rto - (channel.srtt + 4 * channel.rttvar)) < 1e-12
+        channel._measure(0.0)
+        assert ReliableChannel(None, min_rto=0.5).rto == 1.0 and channel.rto >= channel.min_rto
+
+    def test_peer_gone(self):
+        """
+        Test that a peer which never acknowledges is given up on after the retransmissions.
+        :return: None
+        """
+        async def send_to_nobody():
+            loopback = LossyLoopback()
+            sender, receiver = await self.open_pair(loopback, initial_rto=0.01, max_retransmissions=3)
+            receiver.transport.close()
+            sender.send(b"hello")
+            assert not await sender.drain(5)
+            self.assertRaises(ConnectionError, sender.send, b"again")
+            try:
+                await sender.receive()
+                return False
+            except ConnectionError:
+                return sender.retransmissions
+
+        assert asyncio.run(send_to_nobody()) == 3
+
+    def test_lossy_game(self):
+        """
+        Test a whole exchange of moves and responses between two backends over a lossy network.
+        :return: None
+        """
+        async def play():
+            loopback = LossyLoopback(drop_rate=0.25, duplicate_rate=0.1, delay=0.001, jitter=0.005, seed=2)
+            host = AsyncBattleshipNetwork(network=loopback, channel_options=self.options)
+            guest = AsyncBattleshipNetwork(network=loopback, channel_options=self.options)
+            hosting = asyncio.ensure_future(host.start_game())
+            await asyncio.sleep(0)
+            await guest.join_game(*host.my_addr)
+            await hosting
+            for index in range(50):
+                move = (index % 10, index // 10)
+                shooting = asyncio.ensure_future(host.transmit_move_and_get_response(move))
+                assert await guest.get_move() == move
+                await guest.send_response(index % 3)
+                assert await shooting == index % 3
+            await guest.end_game()
+            await host.end_game()
+            return loopback.dropped
+
+        assert asyncio.run(play()) > 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import random
+from Networking.WireProtocol import *
+
+
+class TestWireProtocol(unittest.TestCase):
+    """
+    UnitTest class to check that every message type round trips and that malformed packets
+    decode to None instead of raising.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Encode one message of every type.
+        :return: None
+        """
+        self.messages = [(encode_hello("10.0.0.7", 5700), (HELLO, 0, ("10.0.0.7", 5700))),
+                         (encode_move(42, (3, 9)), (MOVE, 42, (3, 9))),
+                         (encode_response(MAX_ID, -1), (RESPONSE, MAX_ID, -1)),
+                         (encode_forfeit(), (FORFEIT, 0, None)),
+                         (encode_resync(5), (RESYNC, 5, None)),
+                         (encode_hello(session_id=77), (HELLO, 77, ("0.0.0.0", 0))),
+                         (encode_rematch(77, 3), (REMATCH, 77, 3)),
+                         (encode_mark(42, (3, 9), -3), (MARK, 42, ((3, 9), -3))),
+                         (encode_queue(77, 1e6), (QUEUE, 77, MAX_LATENCY))]
+
+    def test_round_trip(self):
+        """
+        Test every message type alone and in a batch, and the sizes.
+        :return: None
+        """
+        for data, message in self.messages:
+            assert decode(data) == [message]
+        batch = encode_batch([data for data, _ in self.messages])
+        assert decode(batch) == [message for _, message in self.messages]
+        assert len(encode_move(1, (2, 3))) == 12 and len(encode_response(1, 0)) == 9
+
+    def test_malformed(self):
+        """
+        Test truncated, extended, mistyped, other version, nested batch and random packets.
+        :return: None
+        """
+        move = encode_move(1, (2, 3))
+        bad = [b"", move[:-1], move + b"\x00", bytes([VERSION + 1]) + move[1:], bytes([VERSION, 99]) + move[2:],
+               encode_response(1, 0)[:-1] + b"\x07", move[:2] + b"\x00\x01" + move[4:],
+               encode_batch([encode_batch([move])]), encode_batch([]), encode_batch([move])[:-2],
+               encode_mark(1, (2, 3), 1)]
+        for data in bad:
+            assert decode(data) is None
+        rng = random.Random(0)
+        for _ in range(5000):
+            data = bytes(rng.getrandbits(8) for _ in range(rng.randrange(0, 40)))
+            result = decode(data)
+            assert result is None or isinstance(result, list)
+
+
+if __name__ == '__main__':
+    unittest.main()
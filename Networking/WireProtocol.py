@@ -0,0 +1,208 @@
+"""
+Binary messages of the Battleship networking backends. Every message starts with a fixed
+8 byte header, big endian:
+    version u8, type u8, count u16 (sub-messages of a batch, 0 otherwise), id u32 (correlation id)
+followed by a body of a fixed size per type:
+    HELLO     ip 4 bytes (IPv4), port u16: where the sender wants its messages, port 0 for
+              wherever the hello came from (one socket both ways, works behind NAT)
+    MOVE      x u16, y u16
+    RESPONSE  response i8, one of the response codes -1..3
+    FORFEIT   nothing
+    RESYNC    nothing: asks the peer to send the response to move id again
+    REMATCH   game u32: the sender is ready for this game of the session, id is the session id
+    MARK      x u16, y u16, state i8: a referee's change to the knowledge board of the shooter of move id
+    QUEUE     latency u16: asks a lobby to pair the sender, id is its player id, latency its round trip in ms
+    BATCH     count complete messages of the other types
+Over a stream (TCP) every message is preceded by its length, a u16 (see frame).
+decode checks everything before unpacking and returns None for anything malformed, so a bad
+packet never raises.
+"""
+import socket
+import struct
+
+VERSION = 1
+# Message types
+HELLO = 1
+MOVE = 2
+RESPONSE = 3
+FORFEIT = 4
+RESYNC = 5
+BATCH = 6
+REMATCH = 7
+MARK = 8
+QUEUE = 9
+
+HEADER = struct.Struct("!BBHI")
+BODIES = {HELLO: struct.Struct("!4sH"), MOVE: struct.Struct("!HH"), RESPONSE: struct.Struct("!b"),
+          FORFEIT: struct.Struct(""), RESYNC: struct.Struct(""), REMATCH: struct.Struct("!I"),
+          MARK: struct.Struct("!HHb"), QUEUE: struct.Struct("!H")}
+# Header and body of each type in one struct, so a message is unpacked in a single call
+MESSAGES = {kind: struct.Struct(HEADER.format + body.format[1:]) for kind, body in BODIES.items()}
+RESPONSES = frozenset([-1, 0, 1, 2, 3])
+MARKS = frozenset([-1, -2, -3])  # Hit ship, hit empty and redundant blocks of BattleshipBoard
+MAX_ID = 0xFFFFFFFF
+MAX_LATENCY = 0xFFFF
+MAX_BATCH = 100  # Messages per batch, keeps a batch of moves well under 1500 bytes
+FRAME = struct.Struct("!H")  # Length prefix of a message on a stream
+
+
+def encode_hello(ip: str="0.0.0.0", port: int=0, session_id: int=0) -> bytes:
+    """
+    Utility function to encode a hello.
+    :param ip: IPv4 address of the sender.
+    :param port: Port of the sender, 0 to be answered at the address the hello came from.
+    :param session_id: Id of the session the hello opens.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, HELLO, 0, session_id) + BODIES[HELLO].pack(socket.inet_aton(ip), port)
+
+
+def frame(message: bytes) -> bytes:
+    """
+    Utility function to prefix a message with its length, to send it over a stream.
+    :param message: The encoded message.
+    :return: The framed message.
+    """
+    return FRAME.pack(len(message)) + message
+
+
+def encode_move(request_id: int, move: tuple) -> bytes:
+    """
+    Utility function to encode a move.
+    :param request_id: Correlation id the response will carry.
+    :param move: 2D location tuple.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, MOVE, 0, request_id) + BODIES[MOVE].pack(move[0], move[1])
+
+
+def encode_response(request_id: int, response: int) -> bytes:
+    """
+    Utility function to encode a response.
+    :param request_id: Correlation id of the move answered.
+    :param response: The response code.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, RESPONSE, 0, request_id) + BODIES[RESPONSE].pack(response)
+
+
+def encode_forfeit() -> bytes:
+    """
+    Utility function to encode a forfeit.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, FORFEIT, 0, 0)
+
+
+def encode_resync(request_id: int) -> bytes:
+    """
+    Utility function to encode a request to send the response to a move again.
+    :param request_id: Correlation id of the move.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, RESYNC, 0, request_id)
+
+
+def encode_rematch(session_id: int, game: int) -> bytes:
+    """
+    Utility function to encode a rematch.
+    :param session_id: Id of the session.
+    :param game: Number of the game the sender is ready for, counting from 1.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, REMATCH, 0, session_id) + BODIES[REMATCH].pack(game)
+
+
+def encode_mark(request_id: int, loc: tuple, state: int) -> bytes:
+    """
+    Utility function to encode a change of a knowledge board.
+    :param request_id: Correlation id of the move which caused it.
+    :param loc: 2D location tuple changed.
+    :param state: Its new state, a BattleshipBoard block describer.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, MARK, 0, request_id) + BODIES[MARK].pack(loc[0], loc[1], state)
+
+
+def encode_queue(player_id: int, latency_ms: float) -> bytes:
+    """
+    Utility function to encode a request to be paired by a lobby.
+    :param player_id: Id of the player, e.g. to look its rating up.
+    :param latency_ms: Round trip time of the player to the lobby, in milliseconds, capped at MAX_LATENCY.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, QUEUE, 0, player_id) + BODIES[QUEUE].pack(min(int(latency_ms), MAX_LATENCY))
+
+
+def encode_batch(messages: list) -> bytes:
+    """
+    Utility function to pack several encoded messages into one.
+    :param messages: List of at most MAX_BATCH encoded messages, none of them batches.
+    :return: The message.
+    """
+    return HEADER.pack(VERSION, BATCH, len(messages), 0) + b"".join(messages)
+
+
+def _decode_one(data: bytes, offset: int, allow_batch: bool) -> tuple:
+    """
+    Utility function to decode the message at an offset.
+    :param data: The packet.
+    :param offset: Where the message starts.
+    :param allow_batch: Whether the message may be a batch.
+    :return: (list of (type, id, payload) tuples, offset after the message), or None if malformed.
+    """
+    if len(data) - offset < HEADER.size or data[offset] != VERSION:
+        return None
+    kind = data[offset + 1]
+    if kind == BATCH:
+        count = HEADER.unpack_from(data, offset)[2]
+        if not allow_batch or count == 0 or count > MAX_BATCH:
+            return None
+        offset += HEADER.size
+        messages = []
+        for _ in range(count):
+            decoded = _decode_one(data, offset, False)
+            if decoded is None:
+                return None
+            messages.extend(decoded[0])
+            offset = decoded[1]
+        return messages, offset
+    layout = MESSAGES.get(kind)
+    if layout is None or len(data) - offset < layout.size:
+        return None
+    values = layout.unpack_from(data, offset)
+    if values[2] != 0:  # Only batches have a count
+        return None
+    offset += layout.size
+    if kind == MOVE:
+        payload = values[4:6]
+    elif kind == RESPONSE:
+        if values[4] not in RESPONSES:
+            return None
+        payload = values[4]
+    elif kind == HELLO:
+        payload = (socket.inet_ntoa(values[4]), values[5])
+    elif kind in [REMATCH, QUEUE]:
+        payload = values[4]
+    elif kind == MARK:
+        if values[6] not in MARKS:
+            return None
+        payload = (values[4:6], values[6])
+    else:
+        payload = None
+    return [(kind, values[3], payload)], offset
+
+
+def decode(data: bytes) -> list:
+    """
+    Function to decode a packet.
+    :param data: The packet.
+    :return: List of (type, id, payload) tuples, a batch giving one per message in it, or
+             None if the packet is malformed, of another version or has trailing bytes.
+             Payloads are (ip, port) for HELLO, (x, y) for MOVE, the code for RESPONSE, the game for
+             REMATCH, ((x, y), state) for MARK, the latency for QUEUE and None otherwise.
+    """
+    decoded = _decode_one(data, 0, True)
+    if decoded is None or decoded[1] != len(data):
+        return None
+    return decoded[0]
@@ -1,5 +1,6 @@
 import os
 from socket import *
+from . import WireProtocol
 
 
 class BattleshipClient:
@@ -22,24 +23,27 @@ class BattleshipClient:
     def connect_to_server(self, my_server_addr):
         """
         Function to establish the initial connection between the client
-        and the opponent's server. Sends a short-burst containing information
+        and the opponent's server. Sends a hello containing information
         about the player's server's IP and Port information, to the opponent's
         server.
-        :param my_server_addr: IP and Port number of the player's own server.
+        :param my_server_addr: IP and Port tuple of the player's own server, or "ip,port".
         :return: None
         """
-        self.udp_socket.sendto(my_server_addr.encode(), self.opp_addr)
+        if isinstance(my_server_addr, str):
+            ip, port = my_server_addr.split(",")
+            my_server_addr = (ip, int(port))
+        self.udp_socket.sendto(WireProtocol.encode_hello(my_server_addr[0], my_server_addr[1]), self.opp_addr)
 
     def send_data(self, data):
         """
         Utility function to send data from this client to the opponent's
         server. Encodes the data and sends it to the opponent's
         server.
-        :param data: Data to encode and send to the opponent's server.
+        :param data: Message encoded with WireProtocol, or a string to encode and send.
         :return: True if the transmission was successful, False otherwise.
         """
         print("Sending:", data)
-        bytes_sent = self.udp_socket.sendto(data.encode(), self.opp_addr)
+        bytes_sent = self.udp_socket.sendto(data if isinstance(data, bytes) else data.encode(), self.opp_addr)
         if bytes_sent > 0:
             return True
         return False
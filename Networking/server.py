@@ -1,5 +1,6 @@
 import os
 from socket import *
+from . import WireProtocol
 
 
 class BattleshipServer:
@@ -45,17 +46,17 @@ class BattleshipServer:
     def find_opp(self):
         """
         Function to find the opponent by waiting for its client to connect
-        to this server. The one-time message contains the IP and Port of the
+        to this server. The hello contains the IP and Port of the
         opponent's server. This information is used by our client
-        to send data to the opponent.
+        to send data to the opponent. Anything else received first is ignored.
         :return: The IP and Port address of the opponent's server.
         """
-        opp_addr, _ = self.udp_socket.recvfrom(self.buffer)  # Get a message from opponent
-        opp_addr = opp_addr.decode()
-        opp_addr = opp_addr.split(',')
-        opp_ip = opp_addr[0]  # IP
-        opp_port = int(opp_addr[1])  # Port
-        self.opp_addr = (opp_ip, opp_port)
+        while True:
+            data, _ = self.udp_socket.recvfrom(self.buffer)  # Get a message from opponent
+            messages = WireProtocol.decode(data)
+            if messages is not None and messages[0][0] == WireProtocol.HELLO:
+                break
+        self.opp_addr = messages[0][2]  # IP and Port
         print("My opponent's details:", self.opp_addr)
         return self.opp_addr
 
@@ -69,6 +70,18 @@ class BattleshipServer:
         print("received:", self.data.decode())
         return self.data.decode()
 
+    def get_messages(self):
+        """
+        Utility function which starts listening on the UDP socket until a well formed
+        message is received, and decodes it with WireProtocol.
+        :return: List of (type, id, payload) tuples, more than one for a batch.
+        """
+        while True:
+            self.data, _ = self.udp_socket.recvfrom(self.buffer)
+            messages = WireProtocol.decode(self.data)
+            if messages is not None:
+                return messages
+
     def close_server(self):
         """
         Utility function to close the server. Essentially closes the socket
@@ -0,0 +1,112 @@
+import json
+import os
+import time
+
+
+def atomic_write_json(path: str, data: dict):
+    """
+    Function to replace a JSON file atomically: the data is written and synced to a temporary
+    file next to it, which is then renamed over the old file. A crash at any point leaves
+    either the old or the new file, never a partial one.
+    :param path: Path of the file.
+    :param data: JSON serializable dictionary.
+    :return: None
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as tmp_file:
+        json.dump(data, tmp_file, separators=(",", ":"))
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+    os.replace(tmp_path, path)
+    if hasattr(os, "O_DIRECTORY"):  # Make the rename itself durable where directories can be synced
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class TournamentCheckpoint:
+    """
+    Class to checkpoint a tournament so that it can resume after being killed. The tournament
+    runner collects seed ranges in seed order, so its progress is the number of ranges done
+    plus the merged counters (and sequential test decisions) of those ranges. Both are saved
+    together, at most every interval seconds, so resuming replays the ranges after the last
+    checkpoint and nothing is counted twice. The checkpoint remembers which tournament it is
+    of (its key) and refuses to resume a different one.
+    @author sahil1105
+    """
+    VERSION = 1
+
+    def __init__(self, path: str, interval: float=60.0):
+        """
+        Constructor for TournamentCheckpoint. Nothing is read until load().
+        :param path: Path of the checkpoint file.
+        :param interval: Minimum number of seconds between saves. 0 saves after every range.
+        """
+        self.path = path
+        self.interval = interval
+        self.key = None
+        self.ranges_done = 0
+        self.stats = None  # TournamentStats.to_dict() of the ranges done
+        self.decisions = None  # Decision.to_dict() (or None) per test of the sequential test
+        self.finished = False
+        self.resumed_games = 0  # Games already played when loaded
+        self.saves = 0
+        self._last_save = time.monotonic()
+
+    def load(self, key: dict) -> bool:
+        """
+        Function to read the checkpoint of a tournament, if there is one.
+        :param key: JSON serializable description of the tournament, e.g. its config and seeds.
+        :return: True if there was a checkpoint to resume from, False if the tournament starts from scratch.
+        :raises ValueError: If the checkpoint is of a different tournament or an unknown version.
+        """
+        self.key = key
+        self._last_save = time.monotonic()
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as checkpoint_file:
+            data = json.load(checkpoint_file)
+        if data.get("version") != TournamentCheckpoint.VERSION:
+            raise ValueError("Unknown checkpoint version: {}".format(data.get("version")))
+        if data["key"] != json.loads(json.dumps(key)):  # Compare as they would be stored
+            raise ValueError("Checkpoint {} is of a different tournament".format(self.path))
+        self.ranges_done = data["ranges_done"]
+        self.stats = data["stats"]
+        self.decisions = data["decisions"]
+        self.finished = data["finished"]
+        self.resumed_games = self.stats["games"]
+        return True
+
+    def update(self, ranges_done: int, stats: dict, decisions: list=None, finished: bool=False):
+        """
+        Function to record progress, saving it if the last save is more than interval seconds ago
+        or the tournament is finished.
+        :param ranges_done: Number of seed ranges collected.
+        :param stats: TournamentStats.to_dict() of those ranges.
+        :param decisions: Decision.to_dict() (or None) per test of the sequential test, if any.
+        :param finished: Whether the tournament is done, played to the end or stopped early.
+        :return: True if saved, False otherwise.
+        """
+        self.ranges_done = ranges_done
+        self.stats = stats
+        self.decisions = decisions
+        self.finished = finished
+        if finished or time.monotonic() - self._last_save >= self.interval:
+            self.save()
+            return True
+        return False
+
+    def save(self):
+        """
+        Function to write the current progress to disk atomically.
+        :return: None
+        """
+        atomic_write_json(self.path, {"version": TournamentCheckpoint.VERSION, "key": self.key,
+                                      "ranges_done": self.ranges_done, "stats": self.stats,
+                                      "decisions": self.decisions, "finished": self.finished})
+        self.saves += 1
+        self._last_save = time.monotonic()
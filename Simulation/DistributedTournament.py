@@ -0,0 +1,351 @@
+"""
+Tournament played by worker nodes over TCP, handed ranges of seeds by a coordinator.
+Protocol: every message is one JSON object per line.
+    worker -> coordinator: {"type": "hello", "worker": name}
+    coordinator -> worker: {"type": "task", "task": index, "config": TournamentConfig.to_dict(),
+                            "start": first seed, "count": number of games, "profile": whether to profile}
+                        or {"type": "done"}
+    worker -> coordinator: {"type": "result", "task": index, "stats": TournamentStats.to_dict(),
+                            "profile": Profiler.snapshot() of the task or null}
+A worker gets its next task once it returned the result of the previous one.
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+from collections import deque
+from Model.Profiling import Profiler, enable_from_env
+from Simulation.Checkpoint import TournamentCheckpoint
+from Simulation.SequentialTest import SequentialTest
+from Simulation.TournamentRunner import TournamentConfig, TournamentStats, build_sequential_test, \
+    checkpoint_progress, parse_fleet, play_seed_range, resume_tournament, run_tournament, seed_ranges, tournament_key
+
+
+def send_message(sock: socket.socket, message: dict):
+    """
+    Utility function to send a message.
+    :param sock: Connected socket.
+    :param message: JSON serializable dictionary.
+    :return: None
+    """
+    sock.sendall((json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8"))
+
+
+def read_message(reader) -> dict:
+    """
+    Utility function to read the next message.
+    :param reader: Binary file object of the socket (socket.makefile("rb")).
+    :return: The message, or None if the connection was closed.
+    :raises ValueError: If the line isn't a JSON object.
+    """
+    line = reader.readline()
+    if len(line) == 0:
+        return None
+    message = json.loads(line.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Malformed message: {!r}".format(line))
+    return message
+
+
+class TournamentCoordinator:
+    """
+    Class to hand the seed ranges of a tournament out to workers connecting over TCP and merge
+    the partial TournamentStats they stream back. Results are merged in seed order whatever
+    order they arrive in, and only integer counters are merged, so the result is identical to
+    run_tournament with the same seeds. A range whose worker disconnects, fails or goes quiet
+    for longer than task_timeout is handed to the next worker instead. With a checkpoint, a
+    killed coordinator resumes after the last range saved.
+    @author sahil1105
+    """
+    def __init__(self, config: TournamentConfig, num_games: int, start_seed: int=0, chunk_size: int=50,
+                 host: str="127.0.0.1", port: int=0, task_timeout: float=600.0,
+                 sequential_test: SequentialTest=None, checkpoint: TournamentCheckpoint=None,
+                 profiler: Profiler=None):
+        """
+        Constructor for TournamentCoordinator. Nothing is opened until start() or run().
+        :param config: The tournament to play.
+        :param num_games: Number of games to play.
+        :param start_seed: First seed.
+        :param chunk_size: Number of games per task.
+        :param host: Address to listen on.
+        :param port: Port to listen on, 0 picks a free one (see address).
+        :param task_timeout: Seconds a worker may take for a task before it is considered lost.
+        :param sequential_test: Optional SequentialTest to stop early with, checked in seed order.
+        :param checkpoint: Optional TournamentCheckpoint to resume from and save progress to.
+        :param profiler: Optional Profiler the workers' snapshots of their tasks are merged into.
+        :raises ValueError: If the checkpoint is of another tournament.
+        """
+        self.config = config
+        self.num_games = num_games
+        self.ranges = seed_ranges(start_seed, num_games, chunk_size)
+        self.host = host
+        self.port = port
+        self.task_timeout = task_timeout
+        self.sequential_test = sequential_test
+        self.checkpoint = checkpoint
+        self.profiler = profiler
+        # Merged stats of the ranges before merged_upto
+        self.stats, self.merged_upto, self.finished = resume_tournament(
+            checkpoint, tournament_key(config, num_games, start_seed, chunk_size, sequential_test), sequential_test)
+        self.reassigned = 0  # Number of tasks handed out again after their worker was lost
+        self.workers_seen = 0
+        self._pending = deque(range(self.merged_upto, len(self.ranges)))  # Tasks not handed out (again) yet
+        self._results = {}  # Task index -> TournamentStats, of tasks finished out of order
+        self._done = set()
+        self._condition = threading.Condition()
+        self._server = None
+        self._accept_thread = None
+        if len(self.ranges) == 0:
+            self.finished = True
+
+    @property
+    def address(self) -> tuple:
+        """
+        Address the coordinator listens on, once started.
+        :return: (host, port) tuple.
+        """
+        return self._server.getsockname()[:2]
+
+    def start(self):
+        """
+        Function to start listening for workers in the background.
+        :return: None
+        """
+        self._server = socket.create_server((self.host, self.port))
+        self._accept_thread = threading.Thread(target=self._accept, daemon=True)
+        self._accept_thread.start()
+
+    def wait(self, timeout: float=None) -> bool:
+        """
+        Function to wait for the tournament to finish.
+        :param timeout: Maximum number of seconds to wait, None waits forever.
+        :return: True if finished, False on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self.finished, timeout)
+
+    def close(self):
+        """
+        Function to stop accepting workers. Workers still connected are told they are done
+        when they ask for their next task.
+        :return: None
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def run(self) -> TournamentStats:
+        """
+        Function to play the whole tournament: start, wait and close.
+        :return: Merged TournamentStats of all games played.
+        """
+        self.start()
+        try:
+            self.wait()
+        finally:
+            self.close()
+        return self.stats
+
+    def _accept(self):
+        """
+        Body of the accept thread. Serves every worker on its own thread.
+        :return: None
+        """
+        server = self._server
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:  # Closed
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _next_task(self) -> int:
+        """
+        Utility function to wait for a task to hand out. Waits while every remaining task is
+        in flight, since one of them may come back if its worker is lost.
+        :return: Index of the task, or None once the tournament is finished.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.finished or len(self._pending) > 0)
+            return None if self.finished else self._pending.popleft()
+
+    def _complete(self, task: int, stats: TournamentStats, profile: dict=None):
+        """
+        Utility function to take in the result of a task and merge every result that is next in seed order.
+        :param task: Index of the task.
+        :param stats: TournamentStats of its range.
+        :param profile: Profiler snapshot of its range, if profiled.
+        :return: None
+        """
+        with self._condition:
+            if task in self._done or self.finished:  # Already finished by another worker, or not needed
+                return
+            self._done.add(task)
+            if self.profiler is not None and profile is not None:
+                self.profiler.merge(profile)
+            self._results[task] = stats
+            while self.merged_upto in self._results and not self.finished:
+                self.stats.merge(self._results.pop(self.merged_upto))
+                self.merged_upto += 1
+                if self.merged_upto == len(self.ranges):
+                    self.finished = True
+                elif self.sequential_test is not None and self.sequential_test.update(self.stats):
+                    self.finished = True
+                checkpoint_progress(self.checkpoint, self.merged_upto, self.stats, self.sequential_test,
+                                    self.finished)
+            self._condition.notify_all()
+
+    def _requeue(self, task: int):
+        """
+        Utility function to hand a task out again after its worker was lost.
+        :param task: Index of the task.
+        :return: None
+        """
+        with self._condition:
+            if task not in self._done and not self.finished:
+                self._pending.appendleft(task)
+                self.reassigned += 1
+                self._condition.notify_all()
+
+    def _serve(self, conn: socket.socket):
+        """
+        Body of a worker's thread: hands it tasks one at a time until the tournament is finished.
+        :param conn: Connection to the worker.
+        :return: None
+        """
+        task = None
+        conn.settimeout(self.task_timeout)
+        try:
+            with conn, conn.makefile("rb") as reader:
+                hello = read_message(reader)
+                if hello is None or hello.get("type") != "hello":
+                    return
+                with self._condition:
+                    self.workers_seen += 1
+                while True:
+                    task = self._next_task()
+                    if task is None:
+                        send_message(conn, {"type": "done"})
+                        return
+                    start, count = self.ranges[task]
+                    send_message(conn, {"type": "task", "task": task, "config": self.config.to_dict(),
+                                        "start": start, "count": count, "profile": self.profiler is not None})
+                    reply = read_message(reader)
+                    if reply is None or reply.get("type") != "result" or reply.get("task") != task:
+                        return  # Lost the worker, the finally hands the task out again
+                    self._complete(task, TournamentStats.from_dict(reply["stats"]), reply.get("profile"))
+                    task = None
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # Lost the worker
+        finally:
+            if task is not None:
+                self._requeue(task)
+
+
+def run_worker(host: str, port: int, processes: int=1, name: str=None, connect_timeout: float=30.0) -> int:
+    """
+    Function to play tasks for a coordinator until it says the tournament is done.
+    :param host: Address of the coordinator.
+    :param port: Port of the coordinator.
+    :param processes: Number of local worker processes to play each task with.
+    :param name: Name to introduce the worker with. Defaults to the host name.
+    :param connect_timeout: Seconds to keep retrying while the coordinator isn't up yet.
+    :return: Number of tasks played.
+    """
+    deadline = time.monotonic() + connect_timeout
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+    tasks = 0
+    with sock, sock.makefile("rb") as reader:
+        send_message(sock, {"type": "hello", "worker": name if name is not None else socket.gethostname()})
+        while True:
+            message = read_message(reader)
+            if message is None or message.get("type") != "task":
+                return tasks
+            config = TournamentConfig.from_dict(message["config"])
+            profile = message.get("profile", False)
+            if processes > 1:
+                profiler = Profiler() if profile else None  # Only merges the snapshots of the processes
+                stats = run_tournament(config, message["count"], processes, message["start"],
+                                       max(1, message["count"] // (2 * processes)), profiler=profiler)
+                snapshot = profiler.snapshot() if profile else None
+            else:
+                stats, _, snapshot = play_seed_range(config, message["start"], message["count"], profile=profile)
+            send_message(sock, {"type": "result", "task": message["task"], "stats": stats.to_dict(),
+                                "profile": snapshot})
+            tasks += 1
+
+
+def __main__():
+    """
+    Command line entry point, as a coordinator or a worker.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Self-play tournament distributed over TCP.")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+    coordinator = subparsers.add_parser("coordinator", help="Hand out seed ranges and merge the results.")
+    coordinator.add_argument("strategy_a", help="Strategy A: random, density or policy:<weights.npz>.")
+    coordinator.add_argument("strategy_b", help="Strategy B.")
+    coordinator.add_argument("--games", type=int, default=1000, help="Number of games to play.")
+    coordinator.add_argument("--seed", type=int, default=0, help="First seed.")
+    coordinator.add_argument("--chunk-size", type=int, default=50, help="Games per task.")
+    coordinator.add_argument("--dims", type=int, nargs=2, default=(10, 10), help="Board dimensions.")
+    coordinator.add_argument("--fleet", type=parse_fleet, default={4: 1, 3: 2, 2: 3, 1: 4},
+                             help="Fleet as length:count pairs, e.g. 4:1,3:2,2:3,1:4.")
+    coordinator.add_argument("--host", default="0.0.0.0", help="Address to listen on.")
+    coordinator.add_argument("--port", type=int, default=5700, help="Port to listen on.")
+    coordinator.add_argument("--task-timeout", type=float, default=600.0,
+                             help="Seconds before a silent worker's task is handed out again.")
+    coordinator.add_argument("--sequential", choices=["win_rate", "shots", "both"],
+                             help="Stop as soon as a sequential test of this metric is settled.")
+    coordinator.add_argument("--delta", type=float, default=0.05, help="Win rate difference worth detecting.")
+    coordinator.add_argument("--shots-margin", type=float, default=1.0, help="Equivalence margin in shots.")
+    coordinator.add_argument("--alpha", type=float, default=0.05, help="False positive rate.")
+    coordinator.add_argument("--beta", type=float, default=0.05, help="False negative rate.")
+    coordinator.add_argument("--checkpoint", help="File to save progress to, and to resume from if it exists.")
+    coordinator.add_argument("--checkpoint-interval", type=float, default=60.0, help="Seconds between checkpoints.")
+    coordinator.add_argument("--profile-output",
+                             help="Have the workers profile their games and write the calls of every Model method "
+                                  "to this JSON file.")
+    worker = subparsers.add_parser("worker", help="Play the tasks of a coordinator.")
+    worker.add_argument("--host", default="127.0.0.1", help="Address of the coordinator.")
+    worker.add_argument("--port", type=int, default=5700, help="Port of the coordinator.")
+    worker.add_argument("--processes", type=int, default=1, help="Local processes per task.")
+    args = parser.parse_args()
+    profiler = enable_from_env()
+
+    if args.role == "worker":
+        print("{} tasks played".format(run_worker(args.host, args.port, args.processes)))
+        return
+    config = TournamentConfig(args.strategy_a, args.strategy_b, tuple(args.dims), args.fleet)
+    checkpoint = TournamentCheckpoint(args.checkpoint, args.checkpoint_interval) if args.checkpoint else None
+    if args.profile_output and profiler is None:
+        profiler = Profiler()  # Never enabled, the coordinator plays no games
+    node = TournamentCoordinator(config, args.games, args.seed, args.chunk_size, args.host, args.port,
+                                 args.task_timeout, build_sequential_test(args), checkpoint, profiler)
+    start = time.perf_counter()
+    stats = node.run()
+    elapsed = time.perf_counter() - start
+    print(stats.summary((args.strategy_a, args.strategy_b)))
+    played = stats.games - (checkpoint.resumed_games if checkpoint is not None else 0)
+    print("{:.1f} games/s ({} games in {:.2f}s, {} workers, {} tasks reassigned)".format(
+        played / elapsed, played, elapsed, node.workers_seen, node.reassigned))
+    if node.sequential_test is not None:
+        for decision in node.sequential_test.decisions:
+            print(decision if decision is not None else "not settled")
+        print("{} games saved".format(args.games - stats.games))
+    if args.profile_output:
+        with open(args.profile_output, "w") as output_file:
+            json.dump({"games": played, "seconds": elapsed, "workers": node.workers_seen,
+                       "profile": profiler.snapshot()}, output_file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    __main__()
@@ -0,0 +1,105 @@
+from Model.Ship import Ship
+
+
+class GameRecord:
+    """
+    Class to store everything needed to analyze or replay a headless game: the seed, the
+    board and fleet, where each player's ships were placed, and every move in order with the
+    response it got (the same response codes perform_hit/respond_to_opp_move use:
+    0 miss, 1 hit, 2 ship destroyed, 3 all ships destroyed).
+    Who fired a move is not stored, it follows from who moved first and the responses.
+    @author sahil1105
+    """
+    def __init__(self, seed: int, game_dims: tuple, ship_types: dict, strategies: list, first: int,
+                 placements: list, moves: list=None):
+        """
+        Constructor for GameRecord.
+        :param seed: Seed the game was played with.
+        :param game_dims: Dimensions of the boards.
+        :param ship_types: Dictionary of ship lengths to number of ships of that length in each fleet.
+        :param strategies: Names of the strategies of player 0 and player 1.
+        :param first: Index of the player who moved first.
+        :param placements: Per player, list of (x, y, length, dir_x, dir_y) tuples of its ships.
+        :param moves: List of (x, y, response) tuples in the order they were played.
+        """
+        self.seed = seed
+        self.game_dims = tuple(game_dims)
+        self.ship_types = dict(ship_types)
+        self.strategies = list(strategies)
+        self.first = first
+        self.placements = placements
+        self.moves = moves if moves is not None else []
+
+    def add_move(self, move: tuple, response: int):
+        """
+        Utility function to append a move and its response.
+        :param move: 2D location tuple struck.
+        :param response: Response received.
+        :return: None
+        """
+        self.moves.append((int(move[0]), int(move[1]), int(response)))
+
+    def shooters(self) -> list:
+        """
+        Utility function to work out which player fired each move.
+        :return: List of player indices, one per move.
+        """
+        shooter = self.first
+        shooters = []
+        for _, _, response in self.moves:
+            shooters.append(shooter)
+            if response not in [1, 2, 3]:  # Missed, change of turn
+                shooter = 1 - shooter
+        return shooters
+
+    def winner(self) -> int:
+        """
+        Utility function to get the winner of the game.
+        :return: Index of the winning player, or -1 if the record doesn't end in a win.
+        """
+        if len(self.moves) == 0 or self.moves[-1][2] != 3:
+            return -1
+        return self.shooters()[-1]
+
+    def ships(self, player: int) -> list:
+        """
+        Utility function to get a player's placement as Ship objects.
+        :param player: Index of the player.
+        :return: List of Ship objects.
+        """
+        return [Ship((x, y), length, (dir_x, dir_y)) for x, y, length, dir_x, dir_y in self.placements[player]]
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a compact JSON serializable description of the record.
+        Moves are flattened to [x0, y0, r0, x1, y1, r1, ...].
+        :return: Dictionary describing the record.
+        """
+        return {"seed": self.seed, "dims": list(self.game_dims),
+                "fleet": [[ship_len, freq] for ship_len, freq in sorted(self.ship_types.items())],
+                "strategies": self.strategies, "first": self.first,
+                "placements": [[list(ship) for ship in ships] for ships in self.placements],
+                "moves": [value for move in self.moves for value in move]}
+
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        Utility function to rebuild a record from to_dict output.
+        :param data: Dictionary describing the record.
+        :return: The GameRecord.
+        """
+        flat = data["moves"]
+        return GameRecord(data["seed"], tuple(data["dims"]), {ship_len: freq for ship_len, freq in data["fleet"]},
+                          data["strategies"], data["first"],
+                          [[tuple(ship) for ship in ships] for ships in data["placements"]],
+                          [tuple(flat[i:i + 3]) for i in range(0, len(flat), 3)])
+
+
+def placement_of(ships: list) -> list:
+    """
+    Utility function to turn a list of Ship objects into the compact placement tuples of a record.
+    :param ships: List of Ship objects, e.g. from BattleshipBoard.get_ships.
+    :return: List of (x, y, length, dir_x, dir_y) tuples.
+    """
+    return [(int(ship.start_loc[0]), int(ship.start_loc[1]), int(ship.length),
+             int(ship.direction[0]), int(ship.direction[1])) for ship in ships]
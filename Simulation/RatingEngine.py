@@ -0,0 +1,295 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import numpy as np
+from Simulation.Checkpoint import atomic_write_json
+from Simulation.RecordStream import read_records
+
+
+# Glicko scale factor, ln(10) / 400
+Q = math.log(10) / 400
+
+
+def glicko_g(deviation: np.ndarray) -> np.ndarray:
+    """
+    Utility function to get Glicko's g, which discounts a result by the opponent's rating deviation.
+    :param deviation: Rating deviations of the opponents.
+    :return: g of each deviation.
+    """
+    return 1 / np.sqrt(1 + 3 * Q * Q * deviation * deviation / (math.pi * math.pi))
+
+
+class RatingEngine:
+    """
+    Class to keep Glicko ratings of any number of players (bots or humans), updated
+    incrementally as match results stream in. Ratings, deviations and counters live in NumPy
+    arrays indexed by player id, which grow by doubling, so an update costs O(1) per game
+    whatever the history, and a leaderboard is a partial sort of the current arrays.
+    Every call to update_batch is one Glicko rating period: the games in it are all rated
+    against the ratings from before the period, which lets whole tournament chunks be applied
+    at once. Deviations grow again by deviation_growth per period a player sits out.
+    @author sahil1105
+    """
+    def __init__(self, initial_rating: float=1500.0, initial_deviation: float=350.0, min_deviation: float=30.0,
+                 deviation_growth: float=1.0, capacity: int=64):
+        """
+        Constructor for RatingEngine. Starts out with no players.
+        :param initial_rating: Rating of a new player.
+        :param initial_deviation: Rating deviation of a new player, also the largest a deviation grows back to.
+        :param min_deviation: Smallest deviation, so that ratings keep following changes in strength.
+        :param deviation_growth: Glicko's c, the deviation gained per rating period without games is sqrt(t) * c.
+        :param capacity: Number of players to allocate room for.
+        """
+        self.initial_rating = initial_rating
+        self.initial_deviation = initial_deviation
+        self.min_deviation = min_deviation
+        self.deviation_growth = deviation_growth
+        self.periods = 0  # Number of rating periods so far
+        self.names = []  # Name of each player id
+        self.ids = {}  # Player id of each name
+        self.rating = np.zeros(capacity, dtype=np.float64)
+        self.deviation = np.zeros(capacity, dtype=np.float64)
+        self.games = np.zeros(capacity, dtype=np.int64)
+        self.score = np.zeros(capacity, dtype=np.float64)  # Wins, plus half the draws
+        self.last_period = np.zeros(capacity, dtype=np.int64)  # Period each player last played in
+
+    @property
+    def num_players(self) -> int:
+        """
+        Number of players known.
+        :return: Number of players.
+        """
+        return len(self.names)
+
+    def player_id(self, name: str) -> int:
+        """
+        Function to get the id of a player, adding the player if it is new.
+        :param name: Name of the player, e.g. a strategy or a user name.
+        :return: Index of the player in the arrays.
+        """
+        player = self.ids.get(name)
+        if player is not None:
+            return player
+        player = len(self.names)
+        if player == len(self.rating):
+            self._grow(2 * len(self.rating))
+        self.names.append(name)
+        self.ids[name] = player
+        self.rating[player] = self.initial_rating
+        self.deviation[player] = self.initial_deviation
+        self.last_period[player] = self.periods
+        return player
+
+    def _grow(self, capacity: int):
+        """
+        Utility function to make room for more players.
+        :param capacity: New number of players with room.
+        :return: None
+        """
+        for name in ["rating", "deviation", "games", "score", "last_period"]:
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def expected_score(self, player_a: int, player_b: int) -> float:
+        """
+        Utility function to get the expected score of a player against another.
+        :param player_a: Id of the player.
+        :param player_b: Id of the opponent.
+        :return: Probability of player_a winning, with draws counting half.
+        """
+        combined = math.sqrt(self.deviation[player_a] ** 2 + self.deviation[player_b] ** 2)
+        return 1 / (1 + 10 ** (-glicko_g(combined) * (self.rating[player_a] - self.rating[player_b]) / 400))
+
+    def update(self, player_a: int, player_b: int, score_a: float):
+        """
+        Function to rate a single game, as a rating period of its own.
+        :param player_a: Id of one player.
+        :param player_b: Id of the other player.
+        :param score_a: 1 if player_a won, 0 if it lost, 0.5 for a draw.
+        :return: None
+        """
+        self.update_batch([player_a], [player_b], [score_a])
+
+    def update_batch(self, players_a, players_b, scores_a, games=None):
+        """
+        Function to rate a batch of games as one rating period, vectorized over the games.
+        :param players_a: Ids of one player of each game (or series of games).
+        :param players_b: Ids of the other player.
+        :param scores_a: Total score of players_a in each game or series.
+        :param games: Number of games in each series, 1 each by default.
+        :return: None
+        :raises ValueError: If a player plays itself or a score is out of range.
+        """
+        players_a = np.asarray(players_a, dtype=np.int64)
+        players_b = np.asarray(players_b, dtype=np.int64)
+        scores_a = np.asarray(scores_a, dtype=np.float64)
+        games = np.ones(len(players_a), dtype=np.int64) if games is None else np.asarray(games, dtype=np.int64)
+        if len(players_a) == 0:
+            return
+        if (players_a == players_b).any():
+            raise ValueError("A player can't be rated against itself")
+        if (scores_a < 0).any() or (scores_a > games).any():
+            raise ValueError("Scores must be between 0 and the number of games")
+        self.periods += 1
+        # Both sides of every game, as (player, opponent, score, games)
+        players = np.concatenate((players_a, players_b))
+        opponents = np.concatenate((players_b, players_a))
+        scores = np.concatenate((scores_a, games - scores_a))
+        counts = np.concatenate((games, games))
+        touched, slots = np.unique(players, return_inverse=True)  # Only the players in the batch are touched
+        # Deviations grow back while players sit out, up to the deviation of a new player
+        idle = self.periods - 1 - self.last_period[touched]
+        self.deviation[touched] = np.minimum(
+            np.sqrt(self.deviation[touched] ** 2 + self.deviation_growth ** 2 * idle), self.initial_deviation)
+        g = glicko_g(self.deviation[opponents])
+        expected = 1 / (1 + 10 ** (-g * (self.rating[players] - self.rating[opponents]) / 400))
+        information = np.bincount(slots, Q * Q * g * g * expected * (1 - expected) * counts, len(touched))
+        surprise = np.bincount(slots, g * (scores - counts * expected), len(touched))
+        precision = 1 / self.deviation[touched] ** 2 + information
+        self.rating[touched] += Q / precision * surprise
+        self.deviation[touched] = np.maximum(np.sqrt(1 / precision), self.min_deviation)
+        self.games[touched] += np.bincount(slots, counts, len(touched)).astype(np.int64)
+        self.score[touched] += np.bincount(slots, scores, len(touched))
+        self.last_period[touched] = self.periods
+
+    def add_stats(self, name_a: str, name_b: str, stats):
+        """
+        Function to rate the games of a tournament chunk as one rating period, in O(1).
+        :param name_a: Name of strategy A (side 0).
+        :param name_b: Name of strategy B (side 1).
+        :param stats: TournamentStats of the chunk.
+        :return: None
+        """
+        if stats.games > 0:
+            self.update_batch([self.player_id(name_a)], [self.player_id(name_b)], [stats.wins[0]], [stats.games])
+
+    def add_records(self, records, chunk_size: int=1000):
+        """
+        Function to rate a stream of GameRecords, chunk_size games per rating period.
+        Records which don't end in a win aren't rated.
+        :param records: Iterable of GameRecords, e.g. from Simulation.RecordStream.read_records.
+        :param chunk_size: Number of games per rating period.
+        :return: self, for chaining.
+        """
+        records = iter(records)
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if len(chunk) == 0:
+                return self
+            players_a, players_b, scores_a = [], [], []
+            for record in chunk:
+                winner = record.winner()
+                if winner < 0 or record.strategies[0] == record.strategies[1]:
+                    continue
+                players_a.append(self.player_id(record.strategies[0]))
+                players_b.append(self.player_id(record.strategies[1]))
+                scores_a.append(1 - winner)
+            self.update_batch(players_a, players_b, scores_a)
+
+    def leaderboard(self, top: int=10, conservative: bool=False) -> list:
+        """
+        Function to get the best players, partially sorting the ratings instead of sorting everyone.
+        :param top: Number of players to list.
+        :param conservative: Whether to rank by rating minus twice the deviation, so that players
+                             with few games don't top the board by luck.
+        :return: List of (name, rating, deviation, games) tuples, best first.
+        """
+        count = self.num_players
+        top = min(top, count)
+        if top <= 0:
+            return []
+        keys = self.rating[:count] - (2 * self.deviation[:count] if conservative else 0)
+        best = np.argpartition(-keys, top - 1)[:top] if top < count else np.arange(count)
+        best = best[np.argsort(-keys[best], kind="stable")]
+        return [(self.names[player], float(self.rating[player]), float(self.deviation[player]),
+                 int(self.games[player])) for player in best]
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable description of the ratings.
+        :return: Dictionary describing the ratings.
+        """
+        count = self.num_players
+        return {"initial_rating": self.initial_rating, "initial_deviation": self.initial_deviation,
+                "min_deviation": self.min_deviation, "deviation_growth": self.deviation_growth,
+                "periods": self.periods, "names": list(self.names), "rating": self.rating[:count].tolist(),
+                "deviation": self.deviation[:count].tolist(), "games": self.games[:count].tolist(),
+                "score": self.score[:count].tolist(), "last_period": self.last_period[:count].tolist()}
+
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        Utility function to rebuild the ratings from to_dict output.
+        :param data: Dictionary describing the ratings.
+        :return: The RatingEngine.
+        """
+        engine = RatingEngine(data["initial_rating"], data["initial_deviation"], data["min_deviation"],
+                              data["deviation_growth"], max(len(data["names"]), 1))
+        for name in data["names"]:
+            engine.player_id(name)
+        count = engine.num_players
+        for name, dtype in [("rating", np.float64), ("deviation", np.float64), ("games", np.int64),
+                            ("score", np.float64), ("last_period", np.int64)]:
+            getattr(engine, name)[:count] = np.array(data[name], dtype=dtype)
+        engine.periods = data["periods"]
+        return engine
+
+
+def load_ratings(path: str) -> RatingEngine:
+    """
+    Utility function to load ratings saved by save_ratings.
+    :param path: Path of the ratings file.
+    :return: The RatingEngine, a new one if the file doesn't exist.
+    """
+    if not os.path.exists(path):
+        return RatingEngine()
+    with open(path) as ratings_file:
+        return RatingEngine.from_dict(json.load(ratings_file))
+
+
+def save_ratings(engine: RatingEngine, path: str):
+    """
+    Utility function to save ratings atomically.
+    :param engine: The RatingEngine.
+    :param path: Path of the ratings file.
+    :return: None
+    """
+    atomic_write_json(path, engine.to_dict())
+
+
+def format_leaderboard(board: list) -> str:
+    """
+    Utility function to print a leaderboard.
+    :param board: Output of RatingEngine.leaderboard.
+    :return: One line per player.
+    """
+    return "\n".join("{:3d}. {:30s} {:7.1f} +- {:5.1f} ({} games)".format(rank + 1, name, rating, 2 * deviation, games)
+                     for rank, (name, rating, deviation, games) in enumerate(board))
+
+
+def __main__():
+    """
+    Command line entry point. Rates recorded games into a ratings file and prints the leaderboard.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Glicko ratings from recorded games.")
+    parser.add_argument("ratings", help="Ratings file, created if it doesn't exist.")
+    parser.add_argument("records", nargs="*", help="Record files or directories written by the tournament runner.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Games per rating period.")
+    parser.add_argument("--top", type=int, default=10, help="Number of players to list.")
+    parser.add_argument("--conservative", action="store_true", help="Rank by rating minus twice the deviation.")
+    args = parser.parse_args()
+    engine = load_ratings(args.ratings)
+    for path in args.records:
+        engine.add_records(read_records(path), args.chunk_size)
+    if len(args.records) > 0:
+        save_ratings(engine, args.ratings)
+    print(format_leaderboard(engine.leaderboard(args.top, args.conservative)))
+
+
+if __name__ == '__main__':
+    __main__()
@@ -0,0 +1,209 @@
+import gzip
+import json
+import os
+import queue
+import threading
+from Simulation.GameRecord import GameRecord
+from Simulation.ReplayFormat import DEFAULT_KEYFRAME_INTERVAL, archive_header, archive_trailer, frame_record, \
+    iter_archive
+
+
+# File extension of each record format
+FORMATS = {"jsonl": ".jsonl", "replay": ".replay"}
+
+
+class RecordWriter:
+    """
+    Class to stream GameRecords to disk with bounded memory. Records are pushed onto a bounded
+    queue and a background thread writes them out in batches, as JSON lines or as binary replay
+    archives (see Simulation.ReplayFormat), rotating to a new file every records_per_file records.
+    When the writer falls behind, push blocks until there is room again (backpressure) instead
+    of letting the queue grow.
+    Use as a context manager, or call close() to flush the last batch.
+    @author sahil1105
+    """
+    # Sentinel pushed by close to stop the writer thread
+    _STOP = object()
+
+    def __init__(self, directory: str, prefix: str="games", records_per_file: int=100000,
+                 queue_size: int=10000, batch_size: int=1000, compress: bool=False, format: str="jsonl",
+                 keyframe_interval: int=DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Constructor for RecordWriter. Creates the directory if needed and starts the writer thread.
+        :param directory: Directory to write the files to.
+        :param prefix: Prefix of the file names, files are named <prefix>-<index>.<format>[.gz].
+        :param records_per_file: Number of records after which to start a new file.
+        :param queue_size: Maximum number of records waiting to be written.
+        :param batch_size: Maximum number of records written at once.
+        :param compress: Whether to gzip the files.
+        :param format: Key of FORMATS, "jsonl" or "replay".
+        :param keyframe_interval: Number of moves between the keyframes of replay records. 0 stores none.
+        :raises ValueError: If the format is unknown.
+        """
+        if format not in FORMATS:
+            raise ValueError("Unknown record format: {}".format(format))
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.records_per_file = records_per_file
+        self.batch_size = batch_size
+        self.compress = compress
+        self.format = format
+        self.keyframe_interval = keyframe_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.files = []  # Paths of the files written so far
+        self.records_written = 0
+        self.error = None
+        self._file = None
+        self._file_records = 0
+        self._file_offsets = []  # Offsets of the records in the current replay archive, for its index
+        self._file_bytes = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def push(self, record: GameRecord, timeout: float=None):
+        """
+        Function to hand a record to the writer. Blocks while the queue is full.
+        :param record: The GameRecord to write.
+        :param timeout: Maximum number of seconds to wait for room, None waits forever.
+        :return: None
+        :raises queue.Full: If there was no room before the timeout.
+        """
+        self._check_error()
+        self.queue.put(record, timeout=timeout)
+
+    def close(self):
+        """
+        Function to write out everything pushed so far and stop the writer thread.
+        :return: None
+        """
+        if self._thread.is_alive():
+            self.queue.put(RecordWriter._STOP)
+            self._thread.join()
+        self._check_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _check_error(self):
+        """
+        Utility function to re-raise an error the writer thread ran into.
+        :return: None
+        """
+        if self.error is not None:
+            raise IOError("Writing game records failed") from self.error
+
+    def _run(self):
+        """
+        Body of the writer thread. Collects up to batch_size queued records and writes them.
+        :return: None
+        """
+        done = False
+        try:
+            while not done:
+                batch = [self.queue.get()]
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get())
+                if batch[-1] is RecordWriter._STOP:
+                    batch.pop()
+                    done = True
+                self._write_batch(batch)
+        except Exception as error:
+            self.error = error
+            while not done:  # Keep draining so producers blocked on a full queue don't hang
+                done = self.queue.get() is RecordWriter._STOP
+        finally:
+            self._close_file()
+
+    def _write_batch(self, batch: list):
+        """
+        Utility function to write a batch of records, rotating files as needed.
+        :param batch: List of GameRecords.
+        :return: None
+        """
+        if self.format == "replay":
+            lines = [frame_record(record, self.keyframe_interval) for record in batch]
+        else:
+            lines = [(json.dumps(record.to_dict(), separators=(",", ":")) + "\n").encode("utf-8")
+                     for record in batch]
+        while len(lines) > 0:
+            if self._file is None or self._file_records >= self.records_per_file:
+                self._open_next_file()
+            count = min(len(lines), self.records_per_file - self._file_records)
+            for line in lines[:count]:
+                self._file_offsets.append(self._file_bytes)
+                self._file_bytes += len(line)
+            self._file.write(b"".join(lines[:count]))
+            lines = lines[count:]
+            self._file_records += count
+            self.records_written += count
+        if self._file is not None:
+            self._file.flush()
+
+    def _open_next_file(self):
+        """
+        Utility function to close the current file and start the next one.
+        :return: None
+        """
+        self._close_file()
+        name = "{}-{:05d}{}{}".format(self.prefix, len(self.files), FORMATS[self.format],
+                                      ".gz" if self.compress else "")
+        path = os.path.join(self.directory, name)
+        self._file = gzip.open(path, "wb") if self.compress else open(path, "wb")
+        self._file_records = 0
+        self._file_offsets = []
+        self._file_bytes = 0
+        if self.format == "replay":
+            self._file.write(archive_header())
+            self._file_bytes = len(archive_header())
+        self.files.append(path)
+
+    def _close_file(self):
+        """
+        Utility function to finish the current file, writing the index of a replay archive.
+        :return: None
+        """
+        if self._file is None:
+            return
+        try:
+            if self.format == "replay":
+                self._file.write(archive_trailer(self._file_offsets, self._file_bytes))
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def record_files(path: str, prefix: str="games") -> list:
+    """
+    Utility function to list the record files in a directory, in the order they were written.
+    :param path: A record file or a directory written by RecordWriter.
+    :param prefix: Prefix of the file names to pick up in a directory.
+    :return: List of file paths.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if name.startswith(prefix + "-") and any(name.endswith(ext) or name.endswith(ext + ".gz")
+                                                     for ext in FORMATS.values())]
+
+
+def read_records(path: str, prefix: str="games"):
+    """
+    Generator to lazily iterate over the records in a file or a directory written by
+    RecordWriter, in either format. Only one record is held in memory at a time.
+    :param path: A record file or a directory.
+    :param prefix: Prefix of the file names to pick up in a directory.
+    :return: Generator of GameRecords.
+    """
+    for file_path in record_files(path, prefix):
+        if file_path.endswith(FORMATS["replay"]) or file_path.endswith(FORMATS["replay"] + ".gz"):
+            yield from iter_archive(file_path)
+            continue
+        opener = gzip.open if file_path.endswith(".gz") else open
+        with opener(file_path, "rt") as record_file:
+            for line in record_file:
+                if line.strip():
+                    yield GameRecord.from_dict(json.loads(line))
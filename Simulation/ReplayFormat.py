@@ -0,0 +1,687 @@
+import argparse
+import gzip
+import mmap
+import sys
+import struct
+import time
+import numpy as np
+from Model.BattleshipBoard import BattleshipBoard
+from Simulation.GameRecord import GameRecord
+
+
+# First bytes of every replay archive, followed by one byte of format version
+ARCHIVE_MAGIC = b"BSREPLAY"
+FORMAT_VERSION = 1
+# Last bytes of an archive with an index
+INDEX_MAGIC = b"BSRINDEX"
+# Default number of moves between two keyframes of a record
+DEFAULT_KEYFRAME_INTERVAL = 64
+# Ship directions as stored in the two low bits of a placement
+DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+# Most bytes of a varint of up to 63 bits
+MAX_VARINT_BYTES = 9
+# Response recorded for a move at a block already struck, stored as a miss plus its index
+INVALID_RESPONSE = -1
+# Number of varints from which ByteCursor.varints decodes in NumPy, below it NumPy's overhead dominates
+BULK_VARINTS = 160
+
+# Compact binary format of a GameRecord. Every number is an unsigned LEB128 varint (7 bits per
+# byte, high bit set on all bytes but the last), so the usual small values take one byte.
+# Signed values are zigzag encoded first (0, -1, 1, -2, ... as 0, 1, 2, 3, ...):
+#     rows, cols
+#     number of fleet entries, then (ship length, count) per entry
+#     seed (signed), first
+#     number of strategies, then (byte length, UTF-8 name) per strategy
+#     per player: number of ships, then (cell << 2 | direction code, length) per ship
+#     number of moves, then (cell << 2 | response) per move, INVALID_RESPONSE stored as 0
+#     number of invalid moves, then the differences between their successive indices
+#     keyframe interval (0 for none), then one keyframe per interval moves
+# where cell = x * cols + y.
+# A keyframe is both players' boards after keyframe number * interval moves, each packed two
+# cells per byte (cell value + 3 in each nibble). They all have the same size, so the keyframe
+# for any move is found without reading the others.
+# An archive is ARCHIVE_MAGIC, the version byte, then every record prefixed with its byte length
+# as a varint. A length of 0 ends the records and starts the optional index: the number of
+# records and the deltas between their offsets as varints, then the offset of the 0 as 8 bytes
+# little endian and INDEX_MAGIC.
+
+
+def write_varint(out: bytearray, value: int):
+    """
+    Utility function to append an unsigned varint.
+    :param out: Buffer to append to.
+    :param value: Non-negative integer.
+    :return: None
+    :raises ValueError: If the value is negative.
+    """
+    if value < 0:
+        raise ValueError("Varints can't be negative: {}".format(value))
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def zigzag(value: int) -> int:
+    """
+    Utility function to map a signed integer to an unsigned one, small magnitudes to small values.
+    :param value: Integer.
+    :return: 2 * value for non-negative values, -2 * value - 1 for negative ones.
+    """
+    return 2 * value if value >= 0 else -2 * value - 1
+
+
+def unzigzag(value: int) -> int:
+    """
+    Utility function to undo zigzag.
+    :param value: Non-negative integer.
+    :return: The signed integer.
+    """
+    return (value >> 1) ^ -(value & 1)
+
+
+class ByteCursor:
+    """
+    Class to read varints and byte strings from a buffer (bytes, memoryview or mmap) one after
+    the other, without copying the buffer as a whole.
+    @author sahil1105
+    """
+    def __init__(self, buffer, offset: int=0, end: int=None):
+        """
+        Constructor for ByteCursor.
+        :param buffer: Buffer to read from.
+        :param offset: Position of the first byte to read.
+        :param end: Position after the last byte that may be read. Defaults to the end of the buffer.
+        """
+        self.buffer = buffer
+        self.offset = offset
+        self.end = len(buffer) if end is None else end
+
+    def varint(self) -> int:
+        """
+        Function to read the next varint.
+        :return: The value.
+        :raises ValueError: If the buffer ends in the middle of the varint.
+        """
+        value = 0
+        shift = 0
+        while True:
+            if self.offset >= self.end:
+                raise ValueError("Truncated varint at byte {}".format(self.offset))
+            byte = self.buffer[self.offset]
+            self.offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def varints(self, count: int) -> list:
+        """
+        Function to read the next count varints at once. Short runs are decoded in one loop over
+        a copy of their bytes, long ones in NumPy: the bytes ending a varint are those below
+        0x80, and the 7 bit groups of each are summed with their shifts.
+        :param count: Number of varints.
+        :return: List of the values. Values must fit in 63 bits.
+        :raises ValueError: If the buffer ends before the last varint.
+        """
+        if count == 0:
+            return []
+        size = min(self.end - self.offset, count * MAX_VARINT_BYTES)
+        if count < BULK_VARINTS:
+            values = []
+            value = shift = 0
+            for used, byte in enumerate(bytes(self.buffer[self.offset:self.offset + size]), 1):
+                if byte >= 0x80:
+                    value |= (byte & 0x7F) << shift
+                    shift += 7
+                    continue
+                values.append(value | byte << shift)
+                if len(values) == count:
+                    self.offset += used
+                    return values
+                value = shift = 0
+            raise ValueError("Truncated varint at byte {}".format(self.offset + size))
+        window = np.frombuffer(self.buffer, dtype=np.uint8, count=size, offset=self.offset)
+        ends = np.flatnonzero(window < 0x80)[:count]
+        if len(ends) < count:
+            raise ValueError("Truncated varint at byte {}".format(self.offset + size))
+        size = int(ends[-1]) + 1
+        starts = np.empty(count, dtype=np.int64)
+        starts[0] = 0
+        starts[1:] = ends[:-1] + 1
+        shifts = 7 * (np.arange(size) - np.repeat(starts, ends - starts + 1))
+        values = np.add.reduceat((window[:size] & 0x7F).astype(np.int64) << shifts, starts)
+        self.offset += size
+        return values.tolist()
+
+    def read(self, length: int) -> bytes:
+        """
+        Function to read the next bytes.
+        :param length: Number of bytes.
+        :return: The bytes.
+        :raises ValueError: If there aren't that many bytes left.
+        """
+        if self.offset + length > self.end:
+            raise ValueError("Truncated data at byte {}".format(self.offset))
+        data = bytes(self.buffer[self.offset:self.offset + length])
+        self.offset += length
+        return data
+
+
+def encode_record(record: GameRecord, keyframe_interval: int=DEFAULT_KEYFRAME_INTERVAL) -> bytes:
+    """
+    Function to encode a record in the binary replay format. Keyframes are computed by replaying
+    the moves on the boards, so smaller intervals mean faster seeking but larger records.
+    :param record: The GameRecord.
+    :param keyframe_interval: Number of moves between keyframes. 0 stores no keyframes.
+    :return: The encoded record.
+    :raises ValueError: If a response is neither INVALID_RESPONSE nor 0 to 3.
+    """
+    out = bytearray()
+    rows, cols = record.game_dims
+    write_varint(out, rows)
+    write_varint(out, cols)
+    write_varint(out, len(record.ship_types))
+    for ship_len, freq in sorted(record.ship_types.items()):
+        write_varint(out, ship_len)
+        write_varint(out, freq)
+    write_varint(out, zigzag(record.seed))
+    write_varint(out, record.first)
+    write_varint(out, len(record.strategies))
+    for strategy in record.strategies:
+        name = strategy.encode("utf-8")
+        write_varint(out, len(name))
+        out += name
+    for ships in record.placements:
+        write_varint(out, len(ships))
+        for x, y, length, dir_x, dir_y in ships:
+            write_varint(out, (x * cols + y) << 2 | DIRECTIONS.index((dir_x, dir_y)))
+            write_varint(out, length)
+    write_varint(out, len(record.moves))
+    invalid = []
+    for index, (x, y, response) in enumerate(record.moves):
+        if response == INVALID_RESPONSE:
+            invalid.append(index)
+            response = 0
+        elif not 0 <= response <= 3:
+            raise ValueError("Response {} of move {} can't be stored".format(response, (x, y)))
+        write_varint(out, (x * cols + y) << 2 | response)
+    write_varint(out, len(invalid))
+    for index, previous in zip(invalid, [0] + invalid):
+        write_varint(out, index - previous)
+    write_varint(out, keyframe_interval)
+    if keyframe_interval > 0 and len(record.moves) >= keyframe_interval:
+        boards, _ = replay_boards(record)
+        for move_index, ((x, y, _), shooter) in enumerate(zip(record.moves, record.shooters())):
+            boards[1 - shooter].respond_to_move((x, y))
+            if (move_index + 1) % keyframe_interval == 0:
+                out += pack_board(boards[0].board) + pack_board(boards[1].board)
+    return bytes(out)
+
+
+def pack_board(board: np.ndarray) -> bytes:
+    """
+    Utility function to pack a board array two cells per byte.
+    :param board: Board array with values from BattleshipBoard.REDUNDANT to BattleshipBoard.SHIP.
+    :return: The packed cells, row-major.
+    """
+    cells = (board.ravel() - BattleshipBoard.REDUNDANT).astype(np.uint8)
+    if len(cells) % 2 == 1:
+        cells = np.append(cells, np.uint8(0))
+    return (cells[0::2] << 4 | cells[1::2]).tobytes()
+
+
+def unpack_board(data: bytes, board_dims: tuple) -> np.ndarray:
+    """
+    Utility function to unpack a board packed by pack_board.
+    :param data: The packed cells.
+    :param board_dims: Dimensions of the board.
+    :return: The board array.
+    """
+    packed = np.frombuffer(data, dtype=np.uint8)
+    cells = np.empty(2 * len(packed), dtype=int)
+    cells[0::2] = packed >> 4
+    cells[1::2] = packed & 0x0F
+    return cells[:board_dims[0] * board_dims[1]].reshape(board_dims) + BattleshipBoard.REDUNDANT
+
+
+def packed_board_size(board_dims: tuple) -> int:
+    """
+    Utility function to get the number of bytes of a packed board.
+    :param board_dims: Dimensions of the board.
+    :return: Number of bytes.
+    """
+    return (board_dims[0] * board_dims[1] + 1) // 2
+
+
+def decode_record(cursor: ByteCursor) -> GameRecord:
+    """
+    Function to decode a record written by encode_record. The ships and the moves, most of the
+    record, are read with a ByteCursor.varints each.
+    :param cursor: ByteCursor positioned at the start of the record. Left after its last byte.
+    :return: The GameRecord.
+    :raises ValueError: If the record is truncated.
+    """
+    rows, cols = cursor.varint(), cursor.varint()
+    ship_types = {}
+    for _ in range(cursor.varint()):
+        ship_len = cursor.varint()
+        ship_types[ship_len] = cursor.varint()
+    seed = unzigzag(cursor.varint())
+    first = cursor.varint()
+    strategies = [cursor.read(cursor.varint()).decode("utf-8") for _ in range(cursor.varint())]
+    placements = []
+    for _ in range(2):
+        ships = cursor.varints(2 * cursor.varint())
+        placements.append([((packed >> 2) // cols, (packed >> 2) % cols, length) + DIRECTIONS[packed & 3]
+                           for packed, length in zip(ships[0::2], ships[1::2])])
+    moves = [((packed >> 2) // cols, (packed >> 2) % cols, packed & 3) for packed in cursor.varints(cursor.varint())]
+    index = 0
+    for gap in cursor.varints(cursor.varint()):
+        index += gap
+        moves[index] = moves[index][:2] + (INVALID_RESPONSE,)
+    return GameRecord(seed, (rows, cols), ship_types, strategies, first, placements, moves)
+
+
+def archive_header() -> bytes:
+    """
+    Utility function to get the bytes every archive starts with.
+    :return: The header.
+    """
+    return ARCHIVE_MAGIC + bytes([FORMAT_VERSION])
+
+
+def frame_record(record: GameRecord, keyframe_interval: int=DEFAULT_KEYFRAME_INTERVAL) -> bytes:
+    """
+    Utility function to encode a record prefixed with its length, as stored in an archive.
+    :param record: The GameRecord.
+    :param keyframe_interval: Number of moves between keyframes. 0 stores no keyframes.
+    :return: The framed record.
+    """
+    body = encode_record(record, keyframe_interval)
+    out = bytearray()
+    write_varint(out, len(body))
+    return bytes(out) + body
+
+
+def archive_trailer(offsets: list, end: int) -> bytes:
+    """
+    Utility function to get the bytes closing an archive: the end marker and the index.
+    :param offsets: Offsets of the records in the archive, in order.
+    :param end: Offset the trailer will be written at.
+    :return: The trailer.
+    """
+    out = bytearray()
+    write_varint(out, 0)
+    write_varint(out, len(offsets))
+    previous = 0
+    for offset in offsets:
+        write_varint(out, offset - previous)
+        previous = offset
+    return bytes(out) + struct.pack("<Q", end) + INDEX_MAGIC
+
+
+def write_archive(path: str, records: list, keyframe_interval: int=DEFAULT_KEYFRAME_INTERVAL):
+    """
+    Utility function to write a whole archive with an index at once. Use RecordWriter to stream
+    records instead.
+    :param path: Path of the archive, gzipped if it ends with .gz.
+    :param records: Iterable of GameRecords.
+    :param keyframe_interval: Number of moves between keyframes. 0 stores no keyframes.
+    :return: None
+    """
+    out = bytearray(archive_header())
+    offsets = []
+    for record in records:
+        offsets.append(len(out))
+        out += frame_record(record, keyframe_interval)
+    out += archive_trailer(offsets, len(out))
+    with (gzip.open(path, "wb") if path.endswith(".gz") else open(path, "wb")) as archive:
+        archive.write(out)
+
+
+def check_header(header: bytes):
+    """
+    Utility function to validate the header of an archive.
+    :param header: The first bytes of the archive.
+    :return: None
+    :raises ValueError: If it isn't a replay archive of FORMAT_VERSION.
+    """
+    if header[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC or len(header) <= len(ARCHIVE_MAGIC):
+        raise ValueError("Not a replay archive")
+    if header[len(ARCHIVE_MAGIC)] != FORMAT_VERSION:
+        raise ValueError("Unsupported replay format version {}".format(header[len(ARCHIVE_MAGIC)]))
+
+
+def iter_archive(path: str):
+    """
+    Generator to iterate over the records of an archive. Uncompressed archives are memory-mapped
+    and decoded in place, compressed ones are streamed one record at a time.
+    :param path: Path of the archive (.replay or .replay.gz).
+    :return: Generator of GameRecords.
+    :raises ValueError: If the file isn't a valid archive.
+    """
+    if path.endswith(".gz"):
+        yield from _iter_stream(path)
+        return
+    with open(path, "rb") as archive:
+        if archive.seek(0, 2) == 0:
+            raise ValueError("Not a replay archive")
+        with mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            check_header(buffer[:len(ARCHIVE_MAGIC) + 1])
+            cursor = ByteCursor(buffer, len(ARCHIVE_MAGIC) + 1)
+            while cursor.offset < cursor.end:
+                length = cursor.varint()
+                if length == 0:  # Start of the index
+                    return
+                end = cursor.offset + length
+                yield decode_record(ByteCursor(buffer, cursor.offset, end))
+                cursor.offset = end
+
+
+def _iter_stream(path: str):
+    """
+    Generator to iterate over the records of a gzipped archive.
+    :param path: Path of the archive.
+    :return: Generator of GameRecords.
+    """
+    with gzip.open(path, "rb") as archive:
+        check_header(archive.read(len(ARCHIVE_MAGIC) + 1))
+        while True:
+            length = 0
+            shift = 0
+            byte = archive.read(1)
+            if len(byte) == 0:
+                return
+            while byte[0] >= 0x80:
+                length |= (byte[0] & 0x7F) << shift
+                shift += 7
+                byte = archive.read(1)
+                if len(byte) == 0:
+                    raise ValueError("Truncated record length")
+            length |= byte[0] << shift
+            if length == 0:  # Start of the index
+                return
+            yield decode_record(ByteCursor(archive.read(length)))
+
+
+class Divergence:
+    """
+    Class to describe where replaying a record stopped matching what was recorded.
+    @author sahil1105
+    """
+    def __init__(self, record_index: int, seed: int, move_index: int, reason: str):
+        """
+        Constructor for Divergence.
+        :param record_index: Position of the record in the archive.
+        :param seed: Seed of the game.
+        :param move_index: Index of the diverging move, -1 if the placement itself is invalid.
+        :param reason: Description of the mismatch.
+        """
+        self.record_index = record_index
+        self.seed = seed
+        self.move_index = move_index
+        self.reason = reason
+
+    def __str__(self):
+        return "record {} (seed {}), move {}: {}".format(self.record_index, self.seed, self.move_index, self.reason)
+
+
+def replay_boards(record: GameRecord, record_index: int=0) -> tuple:
+    """
+    Function to rebuild both players' boards from a record's placements.
+    :param record: The GameRecord.
+    :param record_index: Position of the record in its archive, for the Divergence.
+    :return: (list of the two BattleshipBoards, Divergence or None if the placements are valid).
+    """
+    boards = [BattleshipBoard(record.game_dims), BattleshipBoard(record.game_dims)]
+    for player in range(2):
+        lengths = {}
+        for ship in record.ships(player):
+            if not boards[player].add_ship(ship):
+                return boards, Divergence(record_index, record.seed, -1, "ship at {} of player {} can't be placed"
+                                          .format(ship.start_loc, player))
+            lengths[ship.length] = lengths.get(ship.length, 0) + 1
+        if lengths != {ship_len: freq for ship_len, freq in record.ship_types.items() if freq > 0}:
+            return boards, Divergence(record_index, record.seed, -1, "fleet of player {} doesn't match".format(player))
+    return boards, None
+
+
+def verify_record(record: GameRecord, record_index: int=0) -> Divergence:
+    """
+    Function to replay a record on freshly built boards and check every recorded response
+    against the one the board engine gives now (hit, ship_destroyed and all_ships_destroyed,
+    through respond_to_move).
+    :param record: The GameRecord.
+    :param record_index: Position of the record in its archive, for the Divergence.
+    :return: The first Divergence, or None if the whole record replays identically.
+    """
+    boards, divergence = replay_boards(record, record_index)
+    if divergence is not None:
+        return divergence
+    shooter = record.first
+    game_over = False
+    for move_index, (x, y, response) in enumerate(record.moves):
+        if game_over:
+            return Divergence(record_index, record.seed, move_index, "move after the game ended")
+        replayed = boards[1 - shooter].respond_to_move((x, y))
+        if replayed != response:
+            return Divergence(record_index, record.seed, move_index, "player {} struck {}: recorded {}, replayed {}"
+                              .format(shooter, (x, y), response, replayed))
+        if response == 3:  # All ships destroyed
+            game_over = True
+        elif response not in [1, 2]:  # Missed, change of turn
+            shooter = 1 - shooter
+    return None
+
+
+def verify_archive(path: str, prefix: str="games") -> tuple:
+    """
+    Function to verify every record of an archive (or a directory of archives), stopping at the
+    first divergence.
+    :param path: An archive or a directory written by RecordWriter.
+    :param prefix: Prefix of the file names to pick up in a directory.
+    :return: (number of records verified, the first Divergence or None).
+    """
+    from Simulation.RecordStream import read_records
+    count = 0
+    for record in read_records(path, prefix):
+        divergence = verify_record(record, count)
+        if divergence is not None:
+            return count, divergence
+        count += 1
+    return count, None
+
+
+def knowledge_board(board: BattleshipBoard) -> BattleshipBoard:
+    """
+    Utility function to get what the opponent knows about a board: the board with the ships
+    that haven't been hit hidden. This is the opponent's Player.opp_board at the same point.
+    :param board: A player's board.
+    :return: New BattleshipBoard with the knowledge.
+    """
+    knowledge = BattleshipBoard(board.board.shape)
+    knowledge.board = np.where(board.board == BattleshipBoard.SHIP, BattleshipBoard.EMPTY, board.board)
+    return knowledge
+
+
+class ReplaySeeker:
+    """
+    Class to jump to any point of an encoded record. The boards are restored from the closest
+    keyframe at or before the requested move and only the moves after it are re-applied, so
+    seeking takes at most keyframe interval - 1 moves whatever the length of the game.
+    @author sahil1105
+    """
+    def __init__(self, buffer, offset: int=0, end: int=None):
+        """
+        Constructor for ReplaySeeker. Decodes the record, but none of its keyframes.
+        :param buffer: Buffer holding the encoded record (bytes or mmap).
+        :param offset: Position of the record in the buffer.
+        :param end: Position after the record. Defaults to the end of the buffer.
+        """
+        cursor = ByteCursor(buffer, offset, end)
+        self.record = decode_record(cursor)
+        self.keyframe_interval = cursor.varint()
+        self.buffer = buffer
+        self.keyframes_offset = cursor.offset
+        self.keyframe_size = 2 * packed_board_size(self.record.game_dims)
+        self.num_keyframes = 0
+        if self.keyframe_interval > 0:
+            self.num_keyframes = min(len(self.record.moves) // self.keyframe_interval,
+                                     (cursor.end - cursor.offset) // self.keyframe_size)
+        self.shooters = self.record.shooters()
+
+    def __len__(self):
+        return len(self.record.moves)
+
+    def state_at(self, move_index: int) -> list:
+        """
+        Function to get both players' boards after the first move_index moves.
+        :param move_index: Number of moves played, from 0 (the placements) to len(self).
+        :return: List of the two BattleshipBoards.
+        :raises IndexError: If the move index is out of range.
+        """
+        if not 0 <= move_index <= len(self.record.moves):
+            raise IndexError("Move {} out of range 0..{}".format(move_index, len(self.record.moves)))
+        keyframe = min(move_index // self.keyframe_interval, self.num_keyframes) if self.keyframe_interval > 0 else 0
+        if keyframe == 0:
+            boards, _ = replay_boards(self.record)
+        else:
+            start = self.keyframes_offset + (keyframe - 1) * self.keyframe_size
+            half = self.keyframe_size // 2
+            boards = []
+            for player in range(2):
+                board = BattleshipBoard(self.record.game_dims)
+                board.board = unpack_board(bytes(self.buffer[start + player * half:start + (player + 1) * half]),
+                                           self.record.game_dims)
+                boards.append(board)
+        for index in range(keyframe * self.keyframe_interval, move_index):
+            x, y, _ = self.record.moves[index]
+            boards[1 - self.shooters[index]].respond_to_move((x, y))
+        return boards
+
+
+class ReplayArchive:
+    """
+    Class for random access to the records of an archive through its index. Uncompressed
+    archives are memory-mapped, compressed ones are decompressed into memory. Archives without
+    an index (e.g. from an interrupted writer) are scanned once when opened.
+    @author sahil1105
+    """
+    def __init__(self, path: str):
+        """
+        Constructor for ReplayArchive. Opens the archive and reads its index.
+        :param path: Path of the archive.
+        :raises ValueError: If the file isn't a valid archive.
+        """
+        self._file = None
+        self._mmap = None
+        if path.endswith(".gz"):
+            with gzip.open(path, "rb") as archive:
+                self.buffer = archive.read()
+        else:
+            self._file = open(path, "rb")
+            if self._file.seek(0, 2) == 0:
+                self._file.close()
+                raise ValueError("Not a replay archive")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.buffer = self._mmap
+        check_header(self.buffer[:len(ARCHIVE_MAGIC) + 1])
+        self.offsets = self._read_index()
+
+    def _read_index(self) -> list:
+        """
+        Utility function to get the offsets of the records, from the index if there is one.
+        :return: List of offsets.
+        """
+        size = len(self.buffer)
+        trailer_size = 8 + len(INDEX_MAGIC)
+        if size >= len(ARCHIVE_MAGIC) + 1 + trailer_size and self.buffer[size - len(INDEX_MAGIC):] == INDEX_MAGIC:
+            index_offset = struct.unpack("<Q", self.buffer[size - trailer_size:size - len(INDEX_MAGIC)])[0]
+            cursor = ByteCursor(self.buffer, index_offset, size - trailer_size)
+            if cursor.varint() == 0:
+                offsets = []
+                offset = 0
+                for _ in range(cursor.varint()):
+                    offset += cursor.varint()
+                    offsets.append(offset)
+                return offsets
+        offsets = []  # No index, find the records by skipping from one to the next
+        cursor = ByteCursor(self.buffer, len(ARCHIVE_MAGIC) + 1)
+        while cursor.offset < cursor.end:
+            start = cursor.offset
+            length = cursor.varint()
+            if length == 0:
+                break
+            offsets.append(start)
+            cursor.offset += length
+        return offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _bounds(self, index: int) -> tuple:
+        """
+        Utility function to locate a record.
+        :param index: Position of the record in the archive.
+        :return: (offset of the first byte, offset after the last byte).
+        """
+        cursor = ByteCursor(self.buffer, self.offsets[index])
+        length = cursor.varint()
+        return cursor.offset, cursor.offset + length
+
+    def record(self, index: int) -> GameRecord:
+        """
+        Function to decode a single record.
+        :param index: Position of the record in the archive.
+        :return: The GameRecord.
+        """
+        start, end = self._bounds(index)
+        return decode_record(ByteCursor(self.buffer, start, end))
+
+    def seeker(self, index: int) -> ReplaySeeker:
+        """
+        Function to get a ReplaySeeker for a single record.
+        :param index: Position of the record in the archive.
+        :return: The ReplaySeeker.
+        """
+        start, end = self._bounds(index)
+        return ReplaySeeker(self.buffer, start, end)
+
+    def close(self):
+        """
+        Function to release the archive.
+        :return: None
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def __main__():
+    """
+    Command line entry point. Verifies archives and exits with status 1 on a divergence.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Verify replay archives against the current board engine.")
+    parser.add_argument("path", help="Archive, or directory of archives written by a tournament.")
+    parser.add_argument("--prefix", default="games", help="Prefix of the archive names in a directory.")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    count, divergence = verify_archive(args.path, args.prefix)
+    elapsed = time.perf_counter() - start
+    print("{} records verified in {:.2f}s ({:.0f} records/s)".format(count, elapsed, count / max(elapsed, 1e-9)))
+    if divergence is not None:
+        print("DIVERGENCE {}".format(divergence))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    __main__()
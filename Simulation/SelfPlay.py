@@ -0,0 +1,74 @@
+from random import Random
+from Model.Player import Player
+from Model.Targeter import make_targeter
+from Simulation.GameRecord import GameRecord, placement_of
+
+
+class GameResult:
+    """
+    Class to store the outcome of a headless game between two strategies.
+    Player 0 always plays strategy A and player 1 strategy B.
+    @author sahil1105
+    """
+    def __init__(self, seed: int, first: int, winner: int, shots: list, record: GameRecord=None):
+        """
+        Constructor for GameResult.
+        :param seed: Seed the game was played with.
+        :param first: Index of the player who moved first.
+        :param winner: Index of the player who won.
+        :param shots: Number of shots each player fired.
+        :param record: Full GameRecord of the game, if it was recorded.
+        """
+        self.seed = seed
+        self.first = first
+        self.winner = winner
+        self.shots = shots
+        self.record = record
+
+
+def play_game(strategy_a: str, strategy_b: str, seed: int, game_dims: tuple=(10, 10),
+              ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}, record: bool=False) -> GameResult:
+    """
+    Function to play a whole game between two strategies without any input or output.
+    Both fleets are placed at random and each player responds to the other's moves with the
+    same logic the interactive game uses. The seed fixes the fleets, the tie-breaks of the
+    strategies and who moves first (even seeds: player 0), so a game can always be replayed.
+    :param strategy_a: Strategy of player 0, see Model.Targeter.make_targeter.
+    :param strategy_b: Strategy of player 1.
+    :param seed: Seed for the game.
+    :param game_dims: Dimensions of the boards.
+    :param ship_types: Dictionary of ship lengths to number of ships of that length in each fleet.
+    :param record: Whether to keep a GameRecord of the placements and every move.
+    :return: The GameResult.
+    """
+    rng = Random(seed)
+    players = [Player(strategy_a, game_dims), Player(strategy_b, game_dims)]
+    targeters = []
+    for player, strategy in zip(players, [strategy_a, strategy_b]):
+        player.my_board.generate_random_board(ship_types, rng)
+        for ship_len, freq in ship_types.items():
+            for _ in range(freq):
+                player.add_opp_ship(ship_len)
+        targeters.append(make_targeter(strategy, ship_types, Random(rng.getrandbits(64)), player.opp_fleet))
+
+    first = seed % 2
+    game_record = None
+    if record:
+        game_record = GameRecord(seed, game_dims, ship_types, [strategy_a, strategy_b], first,
+                                 [placement_of(player.my_board.get_ships()) for player in players])
+    shooter = first
+    shots = [0, 0]
+    max_shots = 2 * game_dims[0] * game_dims[1]  # Guards against strategies that never finish
+    while True:
+        move = targeters[shooter].choose_move(players[shooter].opp_board)
+        if move is None or shots[shooter] >= max_shots:
+            raise RuntimeError("Strategy {} ran out of moves.".format(players[shooter].name))
+        response = players[1 - shooter].respond_to_opp_move(move)
+        players[shooter].record_response(move, response)
+        shots[shooter] += 1
+        if game_record is not None:
+            game_record.add_move(move, response)
+        if response == 3:  # All ships destroyed
+            return GameResult(seed, first, shooter, shots, game_record)
+        if response not in [1, 2]:  # Missed, change of turn
+            shooter = 1 - shooter
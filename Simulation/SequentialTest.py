@@ -0,0 +1,220 @@
+import math
+
+
+class Decision:
+    """
+    Class to describe a settled conclusion of a sequential test.
+    @author sahil1105
+    """
+    # Outcomes
+    A_BETTER = "A better"
+    B_BETTER = "B better"
+    EQUIVALENT = "equivalent"
+
+    def __init__(self, metric: str, outcome: str, games: int, detail: str=""):
+        """
+        Constructor for Decision.
+        :param metric: Name of the metric tested, "win_rate" or "shots".
+        :param outcome: One of A_BETTER, B_BETTER or EQUIVALENT.
+        :param games: Number of games the conclusion was reached after.
+        :param detail: Human readable evidence, e.g. the final log-likelihood ratio.
+        """
+        self.metric = metric
+        self.outcome = outcome
+        self.games = games
+        self.detail = detail
+
+    def __str__(self):
+        return "{}: {} after {} games ({})".format(self.metric, self.outcome, self.games, self.detail)
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable description of the decision.
+        :return: Dictionary describing the decision.
+        """
+        return {"metric": self.metric, "outcome": self.outcome, "games": self.games, "detail": self.detail}
+
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        Utility function to rebuild a decision from to_dict output.
+        :param data: Dictionary describing the decision.
+        :return: The Decision.
+        """
+        return Decision(data["metric"], data["outcome"], data["games"], data["detail"])
+
+
+class WinRateSPRT:
+    """
+    Class to run Wald's sequential probability ratio test on strategy A's win rate p, as two
+    one-sided tests against p = 0.5: one for p = 0.5 + delta (A better) and one for
+    p = 0.5 - delta (B better). A is better (or worse) once its test accepts the alternative,
+    and the strategies are equivalent within delta once both accept p = 0.5.
+    Each side runs at alpha / 2, so that declaring a difference when there is none, either way,
+    has probability alpha overall. The error rates hold however often the test is checked.
+    @author sahil1105
+    """
+    def __init__(self, delta: float=0.05, alpha: float=0.05, beta: float=0.05):
+        """
+        Constructor for WinRateSPRT.
+        :param delta: Smallest difference of A's win rate from 0.5 worth detecting.
+        :param alpha: Probability of declaring a difference, either way, when there is none.
+        :param beta: Probability of missing a difference of delta.
+        """
+        self.delta = delta
+        self.alpha = alpha
+        self.beta = beta
+        self.upper = math.log((1 - beta) / (alpha / 2))  # Accept the alternative at or above
+        self.lower = math.log(beta / (1 - alpha / 2))  # Accept p = 0.5 at or below
+
+    def log_likelihood_ratio(self, wins: int, losses: int, p1: float) -> float:
+        """
+        Utility function to get the log-likelihood ratio of win rate p1 against 0.5.
+        :param wins: Number of games A won.
+        :param losses: Number of games A lost.
+        :param p1: Alternative win rate.
+        :return: The log-likelihood ratio.
+        """
+        return wins * math.log(p1 / 0.5) + losses * math.log((1 - p1) / 0.5)
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable description of the test's parameters.
+        :return: Dictionary describing the test.
+        """
+        return {"type": type(self).__name__, "delta": self.delta, "alpha": self.alpha, "beta": self.beta}
+
+    def check(self, stats) -> Decision:
+        """
+        Function to check whether the test is settled.
+        :param stats: TournamentStats of the games so far.
+        :return: The Decision, or None if more games are needed.
+        """
+        wins, losses = stats.wins[0], stats.wins[1]
+        better = self.log_likelihood_ratio(wins, losses, 0.5 + self.delta)
+        worse = self.log_likelihood_ratio(wins, losses, 0.5 - self.delta)
+        detail = "LLR {:.2f} / {:.2f}, bounds {:.2f} / {:.2f}".format(better, worse, self.lower, self.upper)
+        if better >= self.upper:
+            return Decision("win_rate", Decision.A_BETTER, stats.games, detail)
+        if worse >= self.upper:
+            return Decision("win_rate", Decision.B_BETTER, stats.games, detail)
+        if better <= self.lower and worse <= self.lower:
+            return Decision("win_rate", Decision.EQUIVALENT, stats.games, detail)
+        return None
+
+
+class ShotsConfidenceSequence:
+    """
+    Class to track a confidence sequence for the difference of the mean shots each strategy
+    needs to win (A minus B): a sequence of intervals which all cover the true difference with
+    probability 1 - alpha, so it may be checked after every game. Each side's mean gets a
+    normal-mixture boundary with the plugged-in sample variance (an asymptotic confidence
+    sequence). The two boundaries are two-sided at alpha / 2 each, so that both hold at once
+    with probability 1 - alpha. Settled once the interval excludes 0, or lies within +-margin
+    (equivalent).
+    @author sahil1105
+    """
+    def __init__(self, alpha: float=0.05, margin: float=1.0, rho: float=100.0, min_wins: int=30):
+        """
+        Constructor for ShotsConfidenceSequence.
+        :param alpha: Probability that any interval of the sequence misses the true difference.
+        :param margin: Difference in shots small enough to call the strategies equivalent.
+        :param rho: Tuning of the mixture, the boundary is tightest after about rho wins.
+        :param min_wins: Wins each side needs before its variance estimate is trusted.
+        """
+        self.alpha = alpha
+        self.margin = margin
+        self.rho = rho
+        self.min_wins = min_wins
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable description of the test's parameters.
+        :return: Dictionary describing the test.
+        """
+        return {"type": type(self).__name__, "alpha": self.alpha, "margin": self.margin, "rho": self.rho,
+                "min_wins": self.min_wins}
+
+    def radius(self, n: int, variance: float, alpha: float) -> float:
+        """
+        Utility function to get the half width of the two-sided normal-mixture boundary of a mean:
+        sqrt(variance * (n + rho) * log((n + rho) / (rho * alpha^2))) / n.
+        :param n: Number of observations.
+        :param variance: Variance of an observation.
+        :param alpha: Probability that the mean ever leaves the boundary, on either side.
+        :return: The half width.
+        """
+        return math.sqrt(variance * (n + self.rho) * math.log((n + self.rho) / (self.rho * alpha ** 2))) / n
+
+    def interval(self, stats) -> tuple:
+        """
+        Function to get the current interval of the difference.
+        :param stats: TournamentStats of the games so far.
+        :return: (low, high) bounds, infinite until both sides have min_wins wins.
+        """
+        if min(stats.wins) < max(self.min_wins, 2):
+            return -math.inf, math.inf
+        difference = stats.mean_shots_to_win(0) - stats.mean_shots_to_win(1)
+        radius = sum(self.radius(stats.wins[side], stats.shots_to_win_variance(side), self.alpha / 2)
+                     for side in (0, 1))  # The alpha / 2 of each side is the only split
+        return difference - radius, difference + radius
+
+    def check(self, stats) -> Decision:
+        """
+        Function to check whether the comparison is settled.
+        :param stats: TournamentStats of the games so far.
+        :return: The Decision, or None if more games are needed.
+        """
+        low, high = self.interval(stats)
+        detail = "difference in [{:.2f}, {:.2f}]".format(low, high)
+        if high < 0:  # A needs fewer shots
+            return Decision("shots", Decision.A_BETTER, stats.games, detail)
+        if low > 0:
+            return Decision("shots", Decision.B_BETTER, stats.games, detail)
+        if -self.margin < low and high < self.margin:
+            return Decision("shots", Decision.EQUIVALENT, stats.games, detail)
+        return None
+
+
+class SequentialTest:
+    """
+    Class to decide when a tournament can stop: once every configured test is settled.
+    Each test's first Decision is kept, later games don't overturn it.
+    @author sahil1105
+    """
+    def __init__(self, tests: list, min_games: int=100):
+        """
+        Constructor for SequentialTest.
+        :param tests: List of tests with a check(stats) function, e.g. WinRateSPRT and ShotsConfidenceSequence.
+        :param min_games: Number of games to play before stopping at all.
+        """
+        self.tests = list(tests)
+        self.min_games = min_games
+        self.decisions = [None] * len(self.tests)
+
+    def update(self, stats) -> bool:
+        """
+        Function to check the tests against the games so far.
+        :param stats: TournamentStats of the games so far.
+        :return: True if every test is settled and the tournament can stop.
+        """
+        for index, test in enumerate(self.tests):
+            if self.decisions[index] is None:
+                self.decisions[index] = test.check(stats)
+        return stats.games >= self.min_games and self.settled()
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable description of the parameters of the tests,
+        for tests without to_dict their class name.
+        :return: Dictionary describing the tests.
+        """
+        return {"tests": [test.to_dict() if hasattr(test, "to_dict") else {"type": type(test).__name__}
+                          for test in self.tests], "min_games": self.min_games}
+
+    def settled(self) -> bool:
+        """
+        Utility function to check if every test reached a decision.
+        :return: True if settled, False otherwise.
+        """
+        return all(decision is not None for decision in self.decisions)
@@ -0,0 +1,290 @@
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Simulation.RecordStream import read_records, record_files
+
+
+def flat_array(rows, size: int) -> np.ndarray:
+    """
+    Utility function to gather tuples of ints into one flat array, without a NumPy object per tuple.
+    :param rows: Iterable of tuples of ints.
+    :param size: Total number of ints.
+    :return: int64 array of the ints, in order.
+    """
+    return np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=size)
+
+
+class TournamentAnalytics:
+    """
+    Class to aggregate per-cell statistics of many recorded games in NumPy arrays, indexed by
+    player (0: strategy A, 1: strategy B) and board cell:
+        hits, misses: shots the player fired at each cell of the opponent's board, by outcome
+        first_shots: how often each cell was the player's opening shot
+        ship_cells: how often each cell of the player's own board held a ship
+        shots_to_win: histogram of the shots the player fired in the games it won
+    Invalid moves (response -1, e.g. at a block already struck or off the board) pass the turn
+    but aren't counted as shots.
+    Records are consumed in chunks, and each count of a whole chunk is a single bincount.
+    Only integer counts are kept, so partial aggregates (e.g. from different workers) merge
+    to exactly the same totals in any order.
+    @author sahil1105
+    """
+    def __init__(self, game_dims: tuple=(10, 10)):
+        """
+        Constructor for TournamentAnalytics. Starts out with no games.
+        :param game_dims: Dimensions of the boards of the games to aggregate.
+        """
+        self.game_dims = tuple(game_dims)
+        cells = self.game_dims[0] * self.game_dims[1]
+        self.games = 0
+        self.hits = np.zeros((2,) + self.game_dims, dtype=np.int64)
+        self.misses = np.zeros((2,) + self.game_dims, dtype=np.int64)
+        self.first_shots = np.zeros((2,) + self.game_dims, dtype=np.int64)
+        self.ship_cells = np.zeros((2,) + self.game_dims, dtype=np.int64)
+        self.shots_to_win = np.zeros((2, cells + 1), dtype=np.int64)  # A winner fires at most one shot per cell
+
+    def add_records(self, records, chunk_size: int=10000):
+        """
+        Function to add games, consuming the records lazily chunk_size at a time.
+        :param records: Iterable of GameRecords played on boards of game_dims.
+        :param chunk_size: Number of records counted at once.
+        :return: self, for chaining.
+        :raises ValueError: If a record was played on other boards.
+        """
+        records = iter(records)
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if len(chunk) == 0:
+                return self
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, chunk: list):
+        """
+        Utility function to count a chunk of records. The moves and ships of the whole chunk
+        are gathered into flat arrays once, and every count follows from those in NumPy.
+        :param chunk: List of GameRecords.
+        :return: None
+        :raises ValueError: If a record was played on other boards.
+        """
+        rows, cols = self.game_dims
+        cells = rows * cols
+        for record in chunk:
+            if tuple(record.game_dims) != self.game_dims:
+                raise ValueError("Record of seed {} was played on {} boards, not {}"
+                                 .format(record.seed, record.game_dims, self.game_dims))
+        self.games += len(chunk)
+        # Ships: one row per ship, then one key per ship block
+        ship_counts = np.array([len(record.placements[player]) for record in chunk for player in range(2)],
+                               dtype=np.int64)
+        ships = flat_array(itertools.chain.from_iterable(record.placements[player] for record in chunk
+                                                         for player in range(2)),
+                           5 * int(ship_counts.sum())).reshape(-1, 5)
+        owners = np.repeat(np.tile([0, 1], len(chunk)), ship_counts)
+        lengths = ships[:, 2]
+        block = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)  # k along its ship
+        ship_keys = np.repeat(owners * cells + ships[:, 0] * cols + ships[:, 1], lengths) + \
+            block * np.repeat(ships[:, 3] * cols + ships[:, 4], lengths)
+        self.ship_cells += np.bincount(ship_keys, minlength=2 * cells).reshape(self.ship_cells.shape)
+        # Moves: the shooter changes after every miss, so it follows from the misses before each
+        # move in its game, a cumulative sum restarted at every game
+        move_counts = np.array([len(record.moves) for record in chunk], dtype=np.int64)
+        moves = flat_array(itertools.chain.from_iterable(record.moves for record in chunk),
+                           3 * int(move_counts.sum())).reshape(-1, 3)
+        if len(moves) == 0:
+            return
+        played = np.flatnonzero(move_counts > 0)
+        starts = (np.cumsum(move_counts) - move_counts)[played]
+        game = np.repeat(np.arange(len(chunk)), move_counts)
+        missed = moves[:, 2] <= 0  # Invalid moves (-1) pass the turn too, like GameRecord.shooters
+        misses_before = np.cumsum(missed) - missed
+        misses_before -= np.repeat(misses_before[starts], move_counts[played])
+        firsts = np.array([record.first for record in chunk], dtype=np.int64)
+        shooters = (firsts[game] + misses_before) % 2
+        # Only the valid moves are shots, invalid ones may even be off the board
+        valid = np.flatnonzero(moves[:, 2] >= 0)
+        keys = shooters[valid] * cells + moves[valid, 0] * cols + moves[valid, 1]
+        self.hits += np.bincount(keys[~missed[valid]], minlength=2 * cells).reshape(self.hits.shape)
+        self.misses += np.bincount(keys[missed[valid]], minlength=2 * cells).reshape(self.misses.shape)
+        # A player's first shot is its first valid move of the game
+        shot_groups = game[valid] * 2 + shooters[valid]
+        _, first_valid = np.unique(shot_groups, return_index=True)
+        self.first_shots += np.bincount(keys[first_valid], minlength=2 * cells).reshape(self.first_shots.shape)
+        # Games ending in a win: the winner fired the last shot, count the shots it fired
+        lasts = starts + move_counts[played] - 1
+        won = lasts[moves[lasts, 2] == 3]
+        winners = shooters[won]
+        fired = np.bincount(shot_groups, minlength=2 * len(chunk))
+        win_keys = winners * (cells + 1) + fired[game[won] * 2 + winners]
+        self.shots_to_win += np.bincount(win_keys, minlength=2 * (cells + 1)).reshape(self.shots_to_win.shape)
+
+    def merge(self, other):
+        """
+        Utility function to add another aggregate into this one.
+        :param other: TournamentAnalytics of games on the same boards.
+        :return: self, for chaining.
+        :raises ValueError: If the aggregates are of different boards.
+        """
+        if other.game_dims != self.game_dims:
+            raise ValueError("Can't merge analytics of {} and {} boards".format(self.game_dims, other.game_dims))
+        self.games += other.games
+        self.hits += other.hits
+        self.misses += other.misses
+        self.first_shots += other.first_shots
+        self.ship_cells += other.ship_cells
+        self.shots_to_win += other.shots_to_win
+        return self
+
+    def shot_frequency(self, player: int=0) -> np.ndarray:
+        """
+        Utility function to get how often a player fired at each cell per game.
+        :param player: 0 for strategy A, 1 for strategy B.
+        :return: float array of the board's shape.
+        """
+        return (self.hits[player] + self.misses[player]) / max(self.games, 1)
+
+    def hit_rate(self, player: int=0) -> np.ndarray:
+        """
+        Utility function to get the fraction of a player's shots at each cell that hit.
+        :param player: 0 for strategy A, 1 for strategy B.
+        :return: float array of the board's shape, nan where the player never fired.
+        """
+        shots = self.hits[player] + self.misses[player]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(shots > 0, self.hits[player] / shots, np.nan)
+
+    def over_targeting(self, player: int=0) -> np.ndarray:
+        """
+        Utility function to find the cells a player over-targets: the share of its shots that
+        went to each cell minus the share of the opponent's ship blocks that were there.
+        :param player: 0 for strategy A, 1 for strategy B.
+        :return: float array of the board's shape, positive where the player fires too often.
+        """
+        shots = (self.hits[player] + self.misses[player]).astype(float)
+        ships = self.ship_cells[1 - player].astype(float)
+        return shots / max(shots.sum(), 1) - ships / max(ships.sum(), 1)
+
+    def mean_shots_to_win(self, player: int=0) -> float:
+        """
+        Utility function to get the mean number of shots a player needed in the games it won.
+        :param player: 0 for strategy A, 1 for strategy B.
+        :return: Mean shots to win, nan if the player never won.
+        """
+        wins = self.shots_to_win[player].sum()
+        if wins == 0:
+            return float("nan")
+        return float(np.dot(np.arange(self.shots_to_win.shape[1]), self.shots_to_win[player]) / wins)
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable description of the aggregate.
+        :return: Dictionary describing the aggregate.
+        """
+        return {"game_dims": list(self.game_dims), "games": self.games, "hits": self.hits.tolist(),
+                "misses": self.misses.tolist(), "first_shots": self.first_shots.tolist(),
+                "ship_cells": self.ship_cells.tolist(), "shots_to_win": self.shots_to_win.tolist()}
+
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        Utility function to rebuild an aggregate from to_dict output.
+        :param data: Dictionary describing the aggregate.
+        :return: The TournamentAnalytics.
+        """
+        analytics = TournamentAnalytics(tuple(data["game_dims"]))
+        analytics.games = data["games"]
+        for name in ["hits", "misses", "first_shots", "ship_cells", "shots_to_win"]:
+            setattr(analytics, name, np.array(data[name], dtype=np.int64))
+        return analytics
+
+
+def analyze_file(path: str, game_dims: tuple, chunk_size: int=10000) -> TournamentAnalytics:
+    """
+    Function to aggregate the records of one file. Top level so that worker processes can run it.
+    :param path: Record file written by RecordWriter, in either format.
+    :param game_dims: Dimensions of the boards.
+    :param chunk_size: Number of records counted at once.
+    :return: The TournamentAnalytics of the file.
+    """
+    return TournamentAnalytics(game_dims).add_records(read_records(path), chunk_size)
+
+
+def analyze(path: str, game_dims: tuple=(10, 10), workers: int=1, prefix: str="games",
+            chunk_size: int=10000) -> TournamentAnalytics:
+    """
+    Function to aggregate all the records of a file or directory, one file per worker process.
+    :param path: A record file or a directory written by RecordWriter.
+    :param game_dims: Dimensions of the boards.
+    :param workers: Number of worker processes. 1 reads every file in this process.
+    :param prefix: Prefix of the file names to pick up in a directory.
+    :param chunk_size: Number of records counted at once.
+    :return: Merged TournamentAnalytics of all files.
+    """
+    analytics = TournamentAnalytics(game_dims)
+    files = record_files(path, prefix)
+    if workers <= 1:
+        for file_path in files:
+            analytics.merge(analyze_file(file_path, game_dims, chunk_size))
+        return analytics
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(analyze_file, files, [game_dims] * len(files), [chunk_size] * len(files)):
+            analytics.merge(partial)
+    return analytics
+
+
+def heatmap_color(value: float, color: tuple=(255, 0, 0)) -> str:
+    """
+    Utility function to blend from white to a color.
+    :param value: Intensity from 0 (white) to 1 (the color).
+    :param color: RGB tuple of the full intensity color.
+    :return: Tk color string.
+    """
+    value = min(max(value, 0.0), 1.0)
+    return "#{:02x}{:02x}{:02x}".format(*(int(round(255 - (255 - channel) * value)) for channel in color))
+
+
+def render_heatmap(grid, heatmap: np.ndarray, color: tuple=(255, 0, 0)):
+    """
+    Function to paint a heatmap onto a BattleshipGrid, scaled so its largest value gets the full color.
+    :param grid: BattleshipGrid with the dimensions of the heatmap.
+    :param heatmap: 2D array of non-negative values, e.g. TournamentAnalytics.hits[0].
+    :param color: RGB tuple of the full intensity color.
+    :return: None
+    """
+    heatmap = np.nan_to_num(np.asarray(heatmap, dtype=float))
+    peak = heatmap.max() if heatmap.size > 0 and heatmap.max() > 0 else 1.0
+    for x in range(heatmap.shape[0]):
+        for y in range(heatmap.shape[1]):
+            grid.set_tile_color(x, y, heatmap_color(heatmap[x, y] / peak, color))
+
+
+def __main__():
+    """
+    Command line entry point. Aggregates a tournament's records and prints the heatmaps.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Per-cell statistics of recorded tournament games.")
+    parser.add_argument("path", help="Record file or directory written by the tournament runner.")
+    parser.add_argument("--dims", type=int, nargs=2, default=(10, 10), help="Board dimensions.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--show", type=int, choices=[0, 1], help="Open the heatmap of a player's shots in a window.")
+    args = parser.parse_args()
+    analytics = analyze(args.path, tuple(args.dims), args.workers)
+    np.set_printoptions(linewidth=160, precision=3, suppress=True)
+    print("{} games".format(analytics.games))
+    for player in range(2):
+        print("Player {}: mean shots to win {:.2f}".format(player, analytics.mean_shots_to_win(player)))
+        print("Shots per game\n{}".format(analytics.shot_frequency(player)))
+        print("Over-targeting\n{}".format(analytics.over_targeting(player)))
+    if args.show is not None:
+        import tkinter
+        from View.BattleshipGrid import BattleshipGrid
+        app = tkinter.Tk()
+        grid = BattleshipGrid(app, analytics.game_dims)
+        grid.pack()
+        render_heatmap(grid, analytics.hits[args.show] + analytics.misses[args.show])
+        app.mainloop()
+
+
+if __name__ == '__main__':
+    __main__()
@@ -0,0 +1,475 @@
+import argparse
+import contextlib
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Model.Profiling import Profiler, active_profiler, enable_from_env
+from Simulation.Checkpoint import TournamentCheckpoint
+from Simulation.RatingEngine import format_leaderboard, load_ratings, save_ratings
+from Simulation.RecordStream import RecordWriter
+from Simulation.ReplayFormat import DEFAULT_KEYFRAME_INTERVAL
+from Simulation.SelfPlay import GameResult, play_game
+from Simulation.SequentialTest import Decision, SequentialTest, ShotsConfidenceSequence, WinRateSPRT
+
+
+class TournamentConfig:
+    """
+    Class to describe a tournament between two strategies: who plays and on what boards.
+    Kept to plain values so that it can be sent to worker processes.
+    @author sahil1105
+    """
+    def __init__(self, strategy_a: str, strategy_b: str, game_dims: tuple=(10, 10),
+                 ship_types: dict={4: 1, 3: 2, 2: 3, 1: 4}):
+        """
+        Constructor for TournamentConfig.
+        :param strategy_a: Strategy of player A, see Model.Targeter.make_targeter.
+        :param strategy_b: Strategy of player B.
+        :param game_dims: Dimensions of the boards.
+        :param ship_types: Dictionary of ship lengths to number of ships of that length in each fleet.
+        """
+        self.strategy_a = strategy_a
+        self.strategy_b = strategy_b
+        self.game_dims = tuple(game_dims)
+        self.ship_types = dict(ship_types)
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable description of the config.
+        :return: Dictionary describing the config.
+        """
+        return {"strategy_a": self.strategy_a, "strategy_b": self.strategy_b, "game_dims": list(self.game_dims),
+                "ship_types": [[ship_len, freq] for ship_len, freq in sorted(self.ship_types.items())]}
+
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        Utility function to rebuild a config from to_dict output.
+        :param data: Dictionary describing the config.
+        :return: The TournamentConfig.
+        """
+        return TournamentConfig(data["strategy_a"], data["strategy_b"], tuple(data["game_dims"]),
+                                {ship_len: freq for ship_len, freq in data["ship_types"]})
+
+
+class TournamentStats:
+    """
+    Class to aggregate the results of many games between strategy A (side 0) and B (side 1).
+    Only integer counters are kept, so partial aggregates from different workers merge to
+    exactly the same totals in any order.
+    @author sahil1105
+    """
+    def __init__(self):
+        """
+        Constructor for TournamentStats. Starts out with no games.
+        """
+        self.games = 0
+        self.wins = [0, 0]
+        self.first_mover_wins = 0
+        # Sums of the shots fired by each side in the games it won, and of their squares
+        self.win_shots = [0, 0]
+        self.win_shots_sq = [0, 0]
+
+    def add_result(self, result: GameResult):
+        """
+        Utility function to add the outcome of one game.
+        :param result: The GameResult to add.
+        :return: None
+        """
+        shots = result.shots[result.winner]
+        self.games += 1
+        self.wins[result.winner] += 1
+        self.first_mover_wins += 1 if result.winner == result.first else 0
+        self.win_shots[result.winner] += shots
+        self.win_shots_sq[result.winner] += shots * shots
+
+    def merge(self, other):
+        """
+        Utility function to add another aggregate into this one.
+        :param other: TournamentStats to add.
+        :return: self, for chaining.
+        """
+        self.games += other.games
+        self.first_mover_wins += other.first_mover_wins
+        for side in (0, 1):
+            self.wins[side] += other.wins[side]
+            self.win_shots[side] += other.win_shots[side]
+            self.win_shots_sq[side] += other.win_shots_sq[side]
+        return self
+
+    def win_rate(self, side: int=0) -> float:
+        """
+        Utility function to get the fraction of games a side won.
+        :param side: 0 for strategy A, 1 for strategy B.
+        :return: Win rate, 0 if no games were played.
+        """
+        return self.wins[side] / self.games if self.games > 0 else 0.0
+
+    def win_rate_interval(self, side: int=0, z: float=1.96) -> tuple:
+        """
+        Utility function to get the Wilson score confidence interval of a side's win rate.
+        :param side: 0 for strategy A, 1 for strategy B.
+        :param z: Normal quantile of the confidence level. Defaults to 95%.
+        :return: (low, high) bounds.
+        """
+        if self.games == 0:
+            return 0.0, 1.0
+        p = self.win_rate(side)
+        denom = 1 + z * z / self.games
+        centre = (p + z * z / (2 * self.games)) / denom
+        half_width = z * math.sqrt(p * (1 - p) / self.games + z * z / (4 * self.games * self.games)) / denom
+        return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+    def mean_shots_to_win(self, side: int=0) -> float:
+        """
+        Utility function to get the mean number of shots a side needed in the games it won.
+        :param side: 0 for strategy A, 1 for strategy B.
+        :return: Mean shots to win, nan if the side never won.
+        """
+        return self.win_shots[side] / self.wins[side] if self.wins[side] > 0 else float("nan")
+
+    def shots_to_win_variance(self, side: int=0) -> float:
+        """
+        Utility function to get the sample variance of the shots a side needed in the games it won.
+        :param side: 0 for strategy A, 1 for strategy B.
+        :return: Sample variance, nan with fewer than two wins.
+        """
+        n = self.wins[side]
+        if n < 2:
+            return float("nan")
+        return (self.win_shots_sq[side] - self.win_shots[side] * self.win_shots[side] / n) / (n - 1)
+
+    def shots_to_win_interval(self, side: int=0, z: float=1.96) -> tuple:
+        """
+        Utility function to get the normal confidence interval of a side's mean shots to win.
+        :param side: 0 for strategy A, 1 for strategy B.
+        :param z: Normal quantile of the confidence level. Defaults to 95%.
+        :return: (low, high) bounds, nan with fewer than two wins.
+        """
+        mean = self.mean_shots_to_win(side)
+        half_width = z * math.sqrt(self.shots_to_win_variance(side) / self.wins[side]) if self.wins[side] > 1 \
+            else float("nan")
+        return mean - half_width, mean + half_width
+
+    def to_dict(self) -> dict:
+        """
+        Utility function to get a JSON serializable copy of the counters.
+        :return: Dictionary of the counters.
+        """
+        return {"games": self.games, "wins": list(self.wins), "first_mover_wins": self.first_mover_wins,
+                "win_shots": list(self.win_shots), "win_shots_sq": list(self.win_shots_sq)}
+
+    @staticmethod
+    def from_dict(data: dict):
+        """
+        Utility function to rebuild an aggregate from to_dict output.
+        :param data: Dictionary of the counters.
+        :return: The TournamentStats.
+        """
+        stats = TournamentStats()
+        stats.games = data["games"]
+        stats.wins = list(data["wins"])
+        stats.first_mover_wins = data["first_mover_wins"]
+        stats.win_shots = list(data["win_shots"])
+        stats.win_shots_sq = list(data["win_shots_sq"])
+        return stats
+
+    def summary(self, names: tuple=("A", "B")) -> str:
+        """
+        Utility function to describe the aggregate in a few human readable lines.
+        :param names: Names of the two strategies.
+        :return: The summary.
+        """
+        lines = ["{} games, first mover won {:.1%}".format(self.games, self.first_mover_wins / max(self.games, 1))]
+        for side in (0, 1):
+            low, high = self.win_rate_interval(side)
+            shots_low, shots_high = self.shots_to_win_interval(side)
+            lines.append("{}: win rate {:.3f} [{:.3f}, {:.3f}], shots to win {:.2f} [{:.2f}, {:.2f}]".format(
+                names[side], self.win_rate(side), low, high, self.mean_shots_to_win(side), shots_low, shots_high))
+        return "\n".join(lines)
+
+
+def play_seed_range(config: TournamentConfig, start_seed: int, num_games: int, record: bool=False,
+                    profile: bool=False) -> tuple:
+    """
+    Function to play the games of a contiguous range of seeds. This is the unit of work handed
+    to the worker processes.
+    :param config: The tournament being played.
+    :param start_seed: First seed of the range.
+    :param num_games: Number of seeds in the range.
+    :param record: Whether to return the GameRecords of the games too.
+    :param profile: Whether to measure the games with the process's profiler: the enabled one, e.g. inherited
+                    from the parent process, or else a new one timing calls, left enabled for the next ranges.
+                    It is reset first, so only for worker processes.
+    :return: (TournamentStats of the range, list of GameRecords in seed order or empty list,
+              Profiler snapshot of the range or None)
+    """
+    profiler = None
+    if profile:
+        profiler = active_profiler() or Profiler()
+        profiler.enable()
+        profiler.reset()
+    stats = TournamentStats()
+    records = []
+    for seed in range(start_seed, start_seed + num_games):
+        result = play_game(config.strategy_a, config.strategy_b, seed, config.game_dims, config.ship_types, record)
+        stats.add_result(result)
+        if record:
+            records.append(result.record)
+    return stats, records, profiler.snapshot() if profiler is not None else None
+
+
+def seed_ranges(start_seed: int, num_games: int, chunk_size: int) -> list:
+    """
+    Utility function to split the seeds of a tournament into ranges.
+    :param start_seed: First seed of the tournament.
+    :param num_games: Number of games in the tournament.
+    :param chunk_size: Number of games per range.
+    :return: List of (start seed, number of games) tuples in seed order.
+    """
+    return [(seed, min(chunk_size, start_seed + num_games - seed))
+            for seed in range(start_seed, start_seed + num_games, chunk_size)]
+
+
+def tournament_key(config: TournamentConfig, num_games: int, start_seed: int, chunk_size: int,
+                   sequential_test: SequentialTest=None) -> dict:
+    """
+    Utility function to describe everything the result of a tournament depends on, so that a
+    checkpoint is only resumed by the same tournament.
+    :param config: The tournament.
+    :param num_games: Number of games.
+    :param start_seed: First seed.
+    :param chunk_size: Number of games per range, the sequential test is checked after every range.
+    :param sequential_test: Optional SequentialTest.
+    :return: JSON serializable dictionary.
+    """
+    return {"config": config.to_dict(), "num_games": num_games, "start_seed": start_seed, "chunk_size": chunk_size,
+            "sequential_test": sequential_test.to_dict() if sequential_test is not None else None}
+
+
+def resume_tournament(checkpoint: TournamentCheckpoint, key: dict, sequential_test: SequentialTest=None) -> tuple:
+    """
+    Utility function to pick a tournament up from its checkpoint, restoring the sequential test's decisions.
+    :param checkpoint: TournamentCheckpoint, or None to start from scratch.
+    :param key: tournament_key of the tournament.
+    :param sequential_test: Optional SequentialTest.
+    :return: (TournamentStats of the ranges done, number of ranges done, whether the tournament is finished)
+    """
+    if checkpoint is None or not checkpoint.load(key):
+        return TournamentStats(), 0, False
+    if sequential_test is not None:
+        sequential_test.decisions = [Decision.from_dict(decision) if decision is not None else None
+                                     for decision in checkpoint.decisions]
+    return TournamentStats.from_dict(checkpoint.stats), checkpoint.ranges_done, checkpoint.finished
+
+
+def checkpoint_progress(checkpoint: TournamentCheckpoint, ranges_done: int, stats: TournamentStats,
+                        sequential_test: SequentialTest=None, finished: bool=False):
+    """
+    Utility function to hand the progress of a tournament to its checkpoint.
+    :param checkpoint: TournamentCheckpoint, or None.
+    :param ranges_done: Number of ranges collected, in seed order.
+    :param stats: TournamentStats of those ranges.
+    :param sequential_test: Optional SequentialTest.
+    :param finished: Whether the tournament is done.
+    :return: None
+    """
+    if checkpoint is None:
+        return
+    decisions = None
+    if sequential_test is not None:
+        decisions = [decision.to_dict() if decision is not None else None for decision in sequential_test.decisions]
+    checkpoint.update(ranges_done, stats.to_dict(), decisions, finished)
+
+
+def run_tournament(config: TournamentConfig, num_games: int, workers: int=1, start_seed: int=0,
+                   chunk_size: int=50, record_sink: RecordWriter=None,
+                   sequential_test: SequentialTest=None, checkpoint: TournamentCheckpoint=None,
+                   profiler: Profiler=None) -> TournamentStats:
+    """
+    Function to play a tournament, distributing ranges of seeds over a pool of worker processes.
+    At most two ranges per worker are in flight at a time, and they are collected in seed order,
+    so memory stays bounded however many games are played. The result only depends on the
+    config and the seeds, not on the number of workers.
+    With a sequential test, the tournament stops as soon as the test is settled after a range
+    is collected: ranges not started yet are cancelled and their games never played.
+    With a checkpoint, the progress is saved as ranges are collected and a killed tournament
+    resumes after the last range saved, with the same result as an uninterrupted run.
+    With a profiler, the games played in this process are measured with it, enabled for the
+    tournament if it isn't already, and those of worker processes by a profiler of their own
+    whose snapshots are merged into it.
+    :param config: The tournament to play.
+    :param num_games: Number of games to play.
+    :param workers: Number of worker processes. 1 plays every game in this process.
+    :param start_seed: First seed, games use seeds start_seed .. start_seed + num_games - 1.
+    :param chunk_size: Number of games handed to a worker at a time.
+    :param record_sink: Optional RecordWriter which receives the GameRecord of every game, in seed order.
+    :param sequential_test: Optional SequentialTest to stop early with. Holds the decisions afterwards.
+    :param checkpoint: Optional TournamentCheckpoint to resume from and save progress to.
+    :param profiler: Optional Profiler collecting the calls of the games.
+    :return: Merged TournamentStats of all games played.
+    :raises ValueError: If both a record sink and a checkpoint are given, or the checkpoint is of another tournament.
+    :raises RuntimeError: If the profiler has to be enabled while another one is.
+    """
+    if record_sink is not None and checkpoint is not None:
+        raise ValueError("Records written after the last checkpoint would be written again on resume")
+    ranges = seed_ranges(start_seed, num_games, chunk_size)
+    record = record_sink is not None
+    stats, ranges_done, finished = resume_tournament(
+        checkpoint, tournament_key(config, num_games, start_seed, chunk_size, sequential_test), sequential_test)
+    if finished:
+        return stats
+    remaining = ranges[ranges_done:]
+
+    def collect(range_result: tuple) -> bool:
+        nonlocal ranges_done
+        range_stats, records, profile = range_result
+        stats.merge(range_stats)
+        if profile is not None:
+            profiler.merge(profile)
+        for game_record in records:
+            record_sink.push(game_record)
+        ranges_done += 1
+        stop = sequential_test is not None and sequential_test.update(stats)
+        checkpoint_progress(checkpoint, ranges_done, stats, sequential_test, stop or ranges_done == len(ranges))
+        return stop  # Whether to stop
+
+    if workers <= 1:
+        with profiler if profiler is not None and not profiler.enabled() else contextlib.nullcontext():
+            for seed, count in remaining:
+                if collect(play_seed_range(config, seed, count, record)):
+                    break
+        return stats
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        stop = False
+        for seed, count in remaining:
+            pending.append(pool.submit(play_seed_range, config, seed, count, record, profiler is not None))
+            if len(pending) >= 2 * workers:
+                stop = collect(pending.popleft().result())
+                if stop:
+                    break
+        while len(pending) > 0 and not stop:
+            stop = collect(pending.popleft().result())
+        for future in pending:  # Only the ranges already running are played to the end, and ignored
+            future.cancel()
+    return stats
+
+
+def parse_fleet(fleet: str) -> dict:
+    """
+    Utility function to parse a fleet given on the command line as 'length:count,...'.
+    :param fleet: Fleet description, e.g. '4:1,3:2,2:3,1:4'.
+    :return: Dictionary of ship lengths to number of ships of that length.
+    """
+    ship_types = {}
+    for item in fleet.split(","):
+        ship_len, freq = item.split(":")
+        ship_types[int(ship_len)] = int(freq)
+    return ship_types
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Utility function to build the command line parser of the tournament runner.
+    :return: The parser.
+    """
+    parser = argparse.ArgumentParser(description="Headless self-play tournament between two strategies.")
+    parser.add_argument("strategy_a", help="Strategy A: random, density or policy:<weights.npz>.")
+    parser.add_argument("strategy_b", help="Strategy B.")
+    parser.add_argument("--games", type=int, default=1000, help="Number of games to play.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--seed", type=int, default=0, help="First seed.")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Games handed to a worker at a time.")
+    parser.add_argument("--dims", type=int, nargs=2, default=(10, 10), help="Board dimensions.")
+    parser.add_argument("--fleet", type=parse_fleet, default={4: 1, 3: 2, 2: 3, 1: 4},
+                        help="Fleet as length:count pairs, e.g. 4:1,3:2,2:3,1:4.")
+    parser.add_argument("--record-dir", help="Directory to stream the record of every game to.")
+    parser.add_argument("--records-per-file", type=int, default=100000, help="Records per file before rotating.")
+    parser.add_argument("--compress", action="store_true", help="Gzip the record files.")
+    parser.add_argument("--record-format", choices=["jsonl", "replay"], default="jsonl",
+                        help="Write the records as JSON lines or binary replay archives.")
+    parser.add_argument("--keyframe-interval", type=int, default=DEFAULT_KEYFRAME_INTERVAL,
+                        help="Moves between the keyframes of replay records, 0 for none.")
+    parser.add_argument("--sequential", choices=["win_rate", "shots", "both"],
+                        help="Stop as soon as a sequential test of this metric is settled.")
+    parser.add_argument("--delta", type=float, default=0.05, help="Win rate difference from 0.5 worth detecting.")
+    parser.add_argument("--shots-margin", type=float, default=1.0,
+                        help="Difference in mean shots to win small enough to call equivalent.")
+    parser.add_argument("--alpha", type=float, default=0.05, help="False positive rate of the sequential tests.")
+    parser.add_argument("--beta", type=float, default=0.05, help="False negative rate of the win rate test.")
+    parser.add_argument("--checkpoint", help="File to save progress to, and to resume from if it exists.")
+    parser.add_argument("--checkpoint-interval", type=float, default=60.0, help="Seconds between checkpoints.")
+    parser.add_argument("--ratings", help="Ratings file to rate the tournament's games into.")
+    parser.add_argument("--profile-output",
+                        help="Profile the games, in the workers too, and write the calls of every Model method to "
+                             "this JSON file.")
+    return parser
+
+
+def build_sequential_test(args: argparse.Namespace) -> SequentialTest:
+    """
+    Utility function to build the sequential test asked for on the command line.
+    :param args: Parsed command line arguments.
+    :return: The SequentialTest, or None if the tournament plays every game.
+    """
+    if args.sequential is None:
+        return None
+    tests = []
+    if args.sequential in ["win_rate", "both"]:
+        tests.append(WinRateSPRT(args.delta, args.alpha, args.beta))
+    if args.sequential in ["shots", "both"]:
+        tests.append(ShotsConfidenceSequence(args.alpha, args.shots_margin))
+    return SequentialTest(tests)
+
+
+def __main__():
+    """
+    Command line entry point. Plays the tournament and reports the results and games per second.
+    :return: None
+    """
+    parser = build_arg_parser()
+    args = parser.parse_args()
+    if args.checkpoint and args.record_dir:
+        parser.error("--checkpoint can't be combined with --record-dir")
+    profiler = enable_from_env()
+    if args.profile_output and profiler is None:
+        profiler = Profiler()
+    config = TournamentConfig(args.strategy_a, args.strategy_b, tuple(args.dims), args.fleet)
+    sequential_test = build_sequential_test(args)
+    record_sink = None
+    if args.record_dir:
+        record_sink = RecordWriter(args.record_dir, records_per_file=args.records_per_file, compress=args.compress,
+                                   format=args.record_format, keyframe_interval=args.keyframe_interval)
+    checkpoint = TournamentCheckpoint(args.checkpoint, args.checkpoint_interval) if args.checkpoint else None
+    start = time.perf_counter()
+    try:
+        stats = run_tournament(config, args.games, args.workers, args.seed, args.chunk_size, record_sink,
+                               sequential_test, checkpoint, profiler)
+    finally:
+        if record_sink is not None:
+            record_sink.close()
+    elapsed = time.perf_counter() - start
+    print(stats.summary((args.strategy_a, args.strategy_b)))
+    played = stats.games - (checkpoint.resumed_games if checkpoint is not None else 0)
+    print("{:.1f} games/s ({} games in {:.2f}s)".format(played / elapsed, played, elapsed))
+    if checkpoint is not None and checkpoint.resumed_games > 0:
+        print("Resumed from {} games in {}".format(checkpoint.resumed_games, checkpoint.path))
+    if sequential_test is not None:
+        for decision in sequential_test.decisions:
+            print(decision if decision is not None else "not settled")
+        print("{} games saved".format(args.games - stats.games))
+    if args.ratings:
+        engine = load_ratings(args.ratings)
+        engine.add_stats(args.strategy_a, args.strategy_b, stats)
+        save_ratings(engine, args.ratings)
+        print(format_leaderboard(engine.leaderboard()))
+    if args.profile_output:
+        with open(args.profile_output, "w") as output_file:
+            json.dump({"games": played, "seconds": elapsed, "profile": profiler.snapshot()}, output_file, indent=2,
+                      sort_keys=True)
+
+
+if __name__ == '__main__':
+    __main__()
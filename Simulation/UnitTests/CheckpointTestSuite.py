@@ -0,0 +1,111 @@
+import unittest
+import os
+import shutil
+import tempfile
+from Simulation.Checkpoint import *
+from Simulation.SequentialTest import SequentialTest, WinRateSPRT
+from Simulation.TournamentRunner import TournamentConfig, run_tournament
+
+
+class KilledCheckpoint(TournamentCheckpoint):
+    """
+    Stand-in for a tournament killed right after its saves_before_kill-th save.
+    """
+    def __init__(self, path: str, saves_before_kill: int):
+        super().__init__(path, interval=0)
+        self.saves_before_kill = saves_before_kill
+
+    def save(self):
+        super().save()
+        if self.saves == self.saves_before_kill:
+            raise KeyboardInterrupt
+
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    UnitTest class to check that tournaments resume from their checkpoints with the same
+    results as uninterrupted runs.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Use a small board and fleet so that games are quick.
+        :return: None
+        """
+        self.config = TournamentConfig("density", "random", (6, 6), {3: 1, 2: 2, 1: 2})
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "tournament.json")
+
+    def tearDown(self):
+        """
+        Remove the checkpoints written.
+        :return: None
+        """
+        shutil.rmtree(self.directory)
+
+    def test_atomic_write_json(self):
+        """
+        Test that the file is replaced as a whole and no temporary file is left behind.
+        :return: None
+        """
+        atomic_write_json(self.path, {"a": 1})
+        atomic_write_json(self.path, {"b": 2})
+        with open(self.path) as checkpoint_file:
+            assert json.load(checkpoint_file) == {"b": 2}
+        assert os.listdir(self.directory) == ["tournament.json"]
+
+    def test_resume(self):
+        """
+        Test that a killed tournament resumes where it left off, for one and two workers.
+        :return: None
+        """
+        expected = run_tournament(self.config, 70, start_seed=3, chunk_size=10).to_dict()
+        for workers in [1, 2]:
+            self.assertRaises(KeyboardInterrupt, run_tournament, self.config, 70, workers, 3, 10,
+                              checkpoint=KilledCheckpoint(self.path, 3))
+            checkpoint = TournamentCheckpoint(self.path, interval=0)
+            stats = run_tournament(self.config, 70, workers, 3, 10, checkpoint=checkpoint)
+            assert checkpoint.resumed_games == 30
+            assert stats.to_dict() == expected
+            # Finished: nothing is played again
+            checkpoint = TournamentCheckpoint(self.path)
+            assert run_tournament(self.config, 70, workers, 3, 10, checkpoint=checkpoint).to_dict() == expected
+            assert checkpoint.saves == 0
+            os.remove(self.path)
+
+    def test_resume_sequential_test(self):
+        """
+        Test that the decisions of a sequential test are restored, so the tournament stops at the same game.
+        :return: None
+        """
+        def sequential_test():
+            return SequentialTest([WinRateSPRT(delta=0.2)], min_games=20)
+
+        expected = run_tournament(self.config, 1000, chunk_size=5, sequential_test=sequential_test()).to_dict()
+        self.assertRaises(KeyboardInterrupt, run_tournament, self.config, 1000, chunk_size=5,
+                          sequential_test=sequential_test(), checkpoint=KilledCheckpoint(self.path, 4))
+        test = sequential_test()
+        stats = run_tournament(self.config, 1000, chunk_size=5, sequential_test=test,
+                               checkpoint=TournamentCheckpoint(self.path, interval=0))
+        assert stats.to_dict() == expected and test.settled()
+
+    def test_other_tournament(self):
+        """
+        Test that a checkpoint isn't resumed by a different tournament.
+        :return: None
+        """
+        run_tournament(self.config, 20, chunk_size=10, checkpoint=TournamentCheckpoint(self.path))
+        self.assertRaises(ValueError, run_tournament, self.config, 20, chunk_size=5,
+                          checkpoint=TournamentCheckpoint(self.path))
+        self.assertRaises(ValueError, run_tournament, TournamentConfig("random", "random", (6, 6), {2: 1}), 20,
+                          chunk_size=10, checkpoint=TournamentCheckpoint(self.path))
+        os.remove(self.path)
+        run_tournament(self.config, 20, chunk_size=10, sequential_test=SequentialTest([WinRateSPRT(delta=0.2)]),
+                       checkpoint=TournamentCheckpoint(self.path))
+        for test in [SequentialTest([WinRateSPRT(delta=0.1)]), SequentialTest([WinRateSPRT(delta=0.2)], min_games=50)]:
+            self.assertRaises(ValueError, run_tournament, self.config, 20, chunk_size=10, sequential_test=test,
+                              checkpoint=TournamentCheckpoint(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import os
+import tempfile
+import threading
+from Simulation.DistributedTournament import *
+from Model.Profiling import active_profiler
+from Simulation.SequentialTest import SequentialTest, WinRateSPRT
+from Simulation.UnitTests.CheckpointTestSuite import KilledCheckpoint
+
+
+class TestDistributedTournament(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the coordinator and workers over localhost,
+    including a worker that crashes in the middle of a task.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Use a small board and fleet so that games are quick.
+        :return: None
+        """
+        self.config = TournamentConfig("density", "random", (6, 6), {3: 1, 2: 2, 1: 2})
+
+    def start_workers(self, coordinator: TournamentCoordinator, count: int) -> list:
+        """
+        Helper to start workers on threads.
+        :param coordinator: Started coordinator to connect to.
+        :param count: Number of workers.
+        :return: List of the threads.
+        """
+        host, port = coordinator.address
+        threads = [threading.Thread(target=run_worker, args=(host, port), kwargs={"name": "worker{}".format(i)},
+                                    daemon=True) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def test_matches_single_node(self):
+        """
+        Test that the merged result is identical to a single-node run with the same seeds.
+        :return: None
+        """
+        coordinator = TournamentCoordinator(self.config, 60, start_seed=5, chunk_size=7)
+        coordinator.start()
+        threads = self.start_workers(coordinator, 3)
+        assert coordinator.wait(60)
+        coordinator.close()
+        for thread in threads:
+            thread.join(10)
+        assert coordinator.stats.to_dict() == run_tournament(self.config, 60, workers=1, start_seed=5).to_dict()
+        assert coordinator.workers_seen == 3 and coordinator.reassigned == 0
+
+    def test_profile(self):
+        """
+        Test that the coordinator merges the profiles of the workers' tasks.
+        :return: None
+        """
+        coordinator = TournamentCoordinator(self.config, 30, chunk_size=7, profiler=Profiler())
+        coordinator.start()
+        threads = self.start_workers(coordinator, 1)  # Workers on threads of one process share its profiler
+        assert coordinator.wait(60)
+        coordinator.close()
+        for thread in threads:
+            thread.join(10)
+        active_profiler().disable()  # Enabled by the worker
+        single = Profiler()
+        run_tournament(self.config, 30, profiler=single)
+        assert {name: stats["calls"] for name, stats in coordinator.profiler.snapshot().items()} == \
+            {name: stats["calls"] for name, stats in single.snapshot().items()}
+
+    def test_worker_crash(self):
+        """
+        Test that the range of a worker that disconnects after taking it is played by another worker.
+        :return: None
+        """
+        coordinator = TournamentCoordinator(self.config, 40, chunk_size=10)
+        coordinator.start()
+        crashing = socket.create_connection(coordinator.address)
+        send_message(crashing, {"type": "hello", "worker": "crashing"})
+        with crashing.makefile("rb") as reader:
+            task = read_message(reader)
+        assert task["type"] == "task" and task["start"] == 0
+        crashing.close()
+        self.start_workers(coordinator, 2)
+        assert coordinator.wait(60)
+        coordinator.close()
+        assert coordinator.reassigned == 1
+        assert coordinator.stats.to_dict() == run_tournament(self.config, 40, workers=1).to_dict()
+
+    def test_sequential_test(self):
+        """
+        Test that the coordinator stops at the same game as a single-node run with the same sequential test.
+        :return: None
+        """
+        test = SequentialTest([WinRateSPRT(delta=0.2)], min_games=20)
+        coordinator = TournamentCoordinator(self.config, 1000, chunk_size=10, sequential_test=test)
+        coordinator.start()
+        self.start_workers(coordinator, 2)
+        assert coordinator.wait(60)
+        coordinator.close()
+        single = run_tournament(self.config, 1000, workers=1, chunk_size=10,
+                                sequential_test=SequentialTest([WinRateSPRT(delta=0.2)], min_games=20))
+        assert coordinator.stats.games < 1000
+        assert coordinator.stats.to_dict() == single.to_dict()
+
+    def test_resume_checkpoint(self):
+        """
+        Test that a coordinator resumes a tournament killed in the middle from its checkpoint.
+        :return: None
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tournament.json")
+            self.assertRaises(KeyboardInterrupt, run_tournament, self.config, 50, chunk_size=10,
+                              checkpoint=KilledCheckpoint(path, 2))
+            coordinator = TournamentCoordinator(self.config, 50, chunk_size=10,
+                                                checkpoint=TournamentCheckpoint(path, interval=0))
+            assert coordinator.merged_upto == 2
+            coordinator.start()
+            self.start_workers(coordinator, 2)
+            assert coordinator.wait(60)
+            coordinator.close()
+        assert coordinator.stats.to_dict() == run_tournament(self.config, 50, chunk_size=10).to_dict()
+
+
+if __name__ == '__main__':
+    unittest.main()
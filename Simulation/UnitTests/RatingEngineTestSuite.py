@@ -0,0 +1,84 @@
+import unittest
+from Simulation.RatingEngine import *
+from Simulation.SelfPlay import play_game
+from Simulation.TournamentRunner import TournamentConfig, run_tournament
+
+
+class TestRatingEngine(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the RatingEngine against Glickman's worked
+    example, its batch updates and its leaderboards.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Set up the players of the example in Glickman's description of Glicko.
+        :return: None
+        """
+        self.engine = RatingEngine(deviation_growth=0.0, capacity=2)
+        for name, rating, deviation in [("me", 1500, 200), ("a", 1400, 30), ("b", 1550, 100), ("c", 1700, 300)]:
+            player = self.engine.player_id(name)
+            self.engine.rating[player] = rating
+            self.engine.deviation[player] = deviation
+
+    def test_glicko_example(self):
+        """
+        Test one rating period against the published result: 1464 with deviation 151.4.
+        :return: None
+        """
+        me = self.engine.player_id("me")
+        self.engine.update_batch([me, me, me], [1, 2, 3], [1, 0, 0])
+        assert abs(self.engine.rating[me] - 1464.06) < 0.1
+        assert abs(self.engine.deviation[me] - 151.4) < 0.1
+        assert self.engine.games[:4].tolist() == [3, 1, 1, 1] and self.engine.score[:4].tolist() == [1, 0, 1, 1]
+        assert self.engine.num_players == 4 and len(self.engine.rating) == 4  # Grew from a capacity of 2
+        self.assertRaises(ValueError, self.engine.update, me, me, 1)
+        self.assertRaises(ValueError, self.engine.update_batch, [me], [1], [3], [2])
+
+    def test_series(self):
+        """
+        Test that a series of games counts the same as its games one by one in the same period.
+        :return: None
+        """
+        copy = RatingEngine.from_dict(self.engine.to_dict())
+        self.engine.update_batch([0, 1], [1, 2], [7, 3], [10, 4])
+        copy.update_batch([0] * 10 + [1] * 4, [1] * 10 + [2] * 4, [1] * 7 + [0] * 3 + [1] * 3 + [0])
+        assert np.allclose(self.engine.rating, copy.rating) and np.allclose(self.engine.deviation, copy.deviation)
+        assert self.engine.to_dict()["games"] == copy.to_dict()["games"]
+
+    def test_tournament(self):
+        """
+        Test rating self-play: from a tournament's stats in one period, and from its records in chunks.
+        :return: None
+        """
+        config = TournamentConfig("density", "random", (6, 6), {3: 1, 2: 2, 1: 2})
+        from_stats = RatingEngine()
+        from_stats.add_stats("density", "random", run_tournament(config, 40))
+        from_records = RatingEngine().add_records(
+            (play_game("density", "random", seed, (6, 6), config.ship_types, record=True).record
+             for seed in range(40)), chunk_size=10)
+        for engine in [from_stats, from_records]:
+            assert [row[0] for row in engine.leaderboard()] == ["density", "random"]
+            assert engine.games[:2].tolist() == [40, 40]
+        assert from_records.periods == 4
+
+    def test_leaderboard(self):
+        """
+        Test the partially sorted leaderboard against sorting everyone.
+        :return: None
+        """
+        engine = RatingEngine(capacity=1)
+        rng = np.random.default_rng(0)
+        for player in range(500):
+            engine.player_id("bot{}".format(player))
+        engine.rating[:500] = rng.normal(1500, 200, 500)
+        engine.deviation[:500] = rng.uniform(30, 350, 500)
+        for conservative in [False, True]:
+            keys = engine.rating[:500] - (2 * engine.deviation[:500] if conservative else 0)
+            expected = ["bot{}".format(player) for player in np.argsort(-keys)[:20]]
+            assert [row[0] for row in engine.leaderboard(20, conservative)] == expected
+        assert len(engine.leaderboard(1000)) == 500 and RatingEngine().leaderboard() == []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import queue
+import threading
+import tempfile
+from Simulation.RecordStream import *
+from Simulation.SelfPlay import play_game
+from Simulation.TournamentRunner import TournamentConfig, run_tournament
+from Model.BattleshipBoard import BattleshipBoard
+
+
+class TestRecordStream(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the game records, the streaming RecordWriter and
+    the lazy read_records generator.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Record a game on a small board and make a fresh output directory.
+        :return: None
+        """
+        self.record = play_game("density", "random", 0, (6, 6), {3: 1, 2: 2, 1: 2}, record=True).record
+        self.directory = tempfile.mkdtemp()
+
+    def test_game_record(self):
+        """
+        Test that a record holds the whole game and survives the round trip through a dict.
+        :return: None
+        """
+        board = BattleshipBoard((6, 6))
+        for ship in self.record.ships(0):
+            assert board.add_ship(ship) is True  # Placement is valid
+        assert len(self.record.ships(1)) == 5
+        assert self.record.moves[-1][2] == 3  # Ends in a win
+        assert self.record.winner() in [0, 1]
+        copy = GameRecord.from_dict(self.record.to_dict())
+        assert copy.to_dict() == self.record.to_dict()
+
+    def test_writer_rotation_and_reader(self):
+        """
+        Test that the writer rotates files and the reader gives back every record in order.
+        :return: None
+        """
+        with RecordWriter(self.directory, records_per_file=3, batch_size=2, compress=True) as writer:
+            for seed in range(7):
+                self.record.seed = seed
+                writer.push(GameRecord.from_dict(self.record.to_dict()))
+        assert len(writer.files) == 3  # 3 + 3 + 1 records
+        seeds = [record.seed for record in read_records(self.directory)]
+        assert seeds == list(range(7))
+
+    def test_backpressure(self):
+        """
+        Test that push blocks once the queue is full while the writer thread is busy.
+        :return: None
+        """
+        release = threading.Event()
+        record = self.record
+
+        class SlowRecord(GameRecord):
+            def to_dict(self):
+                release.wait()  # Keep the writer thread busy until released
+                return record.to_dict()
+
+        writer = RecordWriter(self.directory, queue_size=1, batch_size=1)
+        writer.push(SlowRecord(**vars(self.record)))
+        writer.push(self.record)  # Waits until the thread picked up the slow record, then fills the queue
+        with self.assertRaises(queue.Full):
+            writer.push(self.record, timeout=0.05)
+        release.set()
+        writer.close()
+        assert writer.records_written == 2
+
+    def test_tournament_sink(self):
+        """
+        Test that a tournament pushes a record of every game into the sink, in seed order.
+        :return: None
+        """
+        with RecordWriter(self.directory) as writer:
+            run_tournament(TournamentConfig("random", "random", (6, 6), {2: 1, 1: 1}), 6, workers=2,
+                           chunk_size=2, record_sink=writer)
+        assert [record.seed for record in read_records(self.directory)] == list(range(6))
+
+
+if __name__ == '__main__':
+    unittest.main()
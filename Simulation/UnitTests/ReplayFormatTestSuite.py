@@ -0,0 +1,161 @@
+import unittest
+import json
+import os
+import tempfile
+from Simulation.ReplayFormat import *
+from Simulation.RecordStream import RecordWriter, read_records
+from Simulation.SelfPlay import play_game
+from Model.Player import Player
+
+
+class TestReplayFormat(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the binary replay format, the archives and the
+    verifying replayer.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Record a few games on the standard board and make a fresh output directory.
+        :return: None
+        """
+        self.records = [play_game("density", "random", seed, record=True).record for seed in range(4)]
+        self.directory = tempfile.mkdtemp()
+
+    def test_varints(self):
+        """
+        Test the varint round trip, including multi-byte values.
+        :return: None
+        """
+        out = bytearray()
+        for value in [0, 1, 127, 128, 300, 2 ** 64 - 1]:
+            write_varint(out, value)
+        cursor = ByteCursor(out)
+        assert [cursor.varint() for _ in range(6)] == [0, 1, 127, 128, 300, 2 ** 64 - 1]
+        self.assertRaises(ValueError, cursor.varint)  # Nothing left
+        self.assertRaises(ValueError, write_varint, out, -1)
+        for count in [3, BULK_VARINTS + 5]:  # Decoded in a loop, then in NumPy
+            values = [(index * 7919) % 2 ** (index % 60 + 1) for index in range(count)]
+            out = bytearray()
+            for value in values:
+                write_varint(out, value)
+            cursor = ByteCursor(bytes(out) + b"\x05")
+            assert cursor.varints(count) == values and cursor.varint() == 5
+            self.assertRaises(ValueError, ByteCursor(out[:-1]).varints, count)
+
+    def test_round_trip(self):
+        """
+        Test that encoding and decoding gives back the same record, in far less space than JSON.
+        :return: None
+        """
+        for record in self.records:
+            encoded = encode_record(record, keyframe_interval=0)
+            assert decode_record(ByteCursor(encoded)).to_dict() == record.to_dict()
+            assert len(encoded) < 2 * len(record.moves) + 60  # At most two bytes per move on a 10x10 board
+            assert len(encoded) * 4 < len(json.dumps(record.to_dict()))
+        encoded = encode_record(self.records[0], keyframe_interval=0)
+        self.assertRaises(ValueError, decode_record, ByteCursor(encoded[:len(encoded) // 2]))
+
+    def test_invalid_moves(self):
+        """
+        Test that moves at blocks already struck (response -1) and negative seeds round trip,
+        and that other responses are rejected.
+        :return: None
+        """
+        record = self.records[0]
+        record.seed = -12345
+        record.moves.insert(0, record.moves[0][:2] + (INVALID_RESPONSE,))
+        record.moves.insert(3, record.moves[3][:2] + (INVALID_RESPONSE,))
+        encoded = encode_record(record, keyframe_interval=0)
+        assert decode_record(ByteCursor(encoded)).to_dict() == record.to_dict()
+        record.moves[1] = record.moves[1][:2] + (4,)
+        self.assertRaises(ValueError, encode_record, record)
+        record.moves[1] = record.moves[1][:2] + (-2,)
+        self.assertRaises(ValueError, encode_record, record)
+
+    def test_archives(self):
+        """
+        Test that plain and compressed archives written by RecordWriter read back and verify.
+        :return: None
+        """
+        for compress in [False, True]:
+            directory = os.path.join(self.directory, str(compress))
+            with RecordWriter(directory, records_per_file=3, compress=compress, format="replay") as writer:
+                for record in self.records:
+                    writer.push(record)
+            assert len(writer.files) == 2
+            assert [record.seed for record in read_records(directory)] == [0, 1, 2, 3]
+            assert verify_archive(directory) == (4, None)
+
+    def test_divergence(self):
+        """
+        Test that the replayer reports the first move whose recorded response no longer matches.
+        :return: None
+        """
+        assert verify_record(self.records[1]) is None
+        record = self.records[1]
+        x, y, response = record.moves[5]
+        record.moves[5] = (x, y, 0 if response != 0 else 1)
+        divergence = verify_record(record, 7)
+        assert divergence.record_index == 7 and divergence.seed == 1 and divergence.move_index == 5
+        record.placements[0][0] = record.placements[0][1]  # Two ships on top of each other
+        assert verify_record(record).move_index == -1
+
+    def test_not_an_archive(self):
+        """
+        Test that files which aren't archives are rejected.
+        :return: None
+        """
+        path = os.path.join(self.directory, "games-00000.replay")
+        with open(path, "wb") as archive:
+            archive.write(b"BSREPLAY\x63")
+        self.assertRaises(ValueError, list, iter_archive(path))
+
+    def test_seek(self):
+        """
+        Test that seeking through keyframes gives the same boards as replaying from the start, and
+        that the knowledge boards match what the players recorded.
+        :return: None
+        """
+        record = play_game("random", "random", 5, (12, 12), {3: 2, 2: 2, 1: 3}, record=True).record
+        sizes = [len(encode_record(record, interval)) for interval in [0, 64, 8]]
+        assert sizes[0] < sizes[1] < sizes[2]  # Denser keyframes, bigger records
+        seeker = ReplaySeeker(encode_record(record, 8))
+        assert seeker.num_keyframes == len(record.moves) // 8
+        players = [Player("a", (12, 12)), Player("b", (12, 12))]
+        boards, _ = replay_boards(record)
+        for move_index in range(len(record.moves) + 1):
+            state = seeker.state_at(move_index)
+            for player in range(2):
+                assert (state[player].board == boards[player].board).all()
+                assert (knowledge_board(state[player]).board == players[1 - player].opp_board.board).all()
+            if move_index < len(record.moves):
+                x, y, response = record.moves[move_index]
+                shooter = seeker.shooters[move_index]
+                boards[1 - shooter].respond_to_move((x, y))
+                players[shooter].record_response((x, y), response)
+        self.assertRaises(IndexError, seeker.state_at, len(record.moves) + 1)
+
+    def test_archive_index(self):
+        """
+        Test random access through the index of an archive, and through a scan when the index is missing.
+        :return: None
+        """
+        path = os.path.join(self.directory, "games.replay")
+        write_archive(path, self.records, keyframe_interval=16)
+        with open(path, "rb") as archive:
+            data = archive.read()
+        with open(path + ".noindex", "wb") as archive:
+            archive.write(data[:data.rindex(b"\x00", 0, len(data) - 16)])  # Cut at the end marker
+        for archive_path in [path, path + ".noindex"]:
+            with ReplayArchive(archive_path) as archive:
+                assert len(archive) == 4
+                assert archive.record(2).to_dict() == self.records[2].to_dict()
+                seeker = archive.seeker(3)
+                last = seeker.state_at(len(seeker))
+                assert last[1 - self.records[3].winner()].all_ships_destroyed()
+        assert [record.seed for record in iter_archive(path)] == [0, 1, 2, 3]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from Simulation.SequentialTest import *
+from Simulation.TournamentRunner import TournamentConfig, TournamentStats, run_tournament
+from Simulation.SelfPlay import GameResult
+
+
+class TestSequentialTest(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the sequential tests and the early stopping of
+    the tournament runner.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Use a small board and fleet so that games are quick.
+        :return: None
+        """
+        self.config = TournamentConfig("density", "random", (6, 6), {3: 1, 2: 2, 1: 2})
+
+    def make_stats(self, wins_a: int, wins_b: int, shots_a: list, shots_b: list) -> TournamentStats:
+        """
+        Helper to build stats from win counts, cycling through the given shots to win.
+        :param wins_a: Games won by A.
+        :param wins_b: Games won by B.
+        :param shots_a: Shots A needed in its wins, cycled.
+        :param shots_b: Shots B needed in its wins, cycled.
+        :return: The TournamentStats.
+        """
+        stats = TournamentStats()
+        for game in range(wins_a):
+            stats.add_result(GameResult(game, 0, 0, [shots_a[game % len(shots_a)], 0]))
+        for game in range(wins_b):
+            stats.add_result(GameResult(game, 0, 1, [0, shots_b[game % len(shots_b)]]))
+        return stats
+
+    def test_win_rate_sprt(self):
+        """
+        Test the three outcomes of the win rate test, and that it waits when the evidence is weak.
+        :return: None
+        """
+        sprt = WinRateSPRT(delta=0.1, alpha=0.05, beta=0.05)
+        assert sprt.check(self.make_stats(10, 8, [1], [1])) is None
+        assert sprt.check(self.make_stats(80, 20, [1], [1])).outcome == Decision.A_BETTER
+        assert sprt.check(self.make_stats(20, 80, [1], [1])).outcome == Decision.B_BETTER
+        assert sprt.check(self.make_stats(500, 500, [1], [1])).outcome == Decision.EQUIVALENT
+        assert math.isclose(sprt.upper, math.log(0.95 / 0.025))  # Each side at alpha / 2
+
+    def test_shots_confidence_sequence(self):
+        """
+        Test the confidence sequence of the mean shots difference.
+        :return: None
+        """
+        sequence = ShotsConfidenceSequence(alpha=0.05, margin=1.0, min_wins=30)
+        assert sequence.interval(self.make_stats(29, 100, [40], [50])) == (-math.inf, math.inf)
+        low, high = sequence.interval(self.make_stats(100, 100, [38, 42], [48, 52]))
+        assert low < -10 < high < 0
+        assert sequence.check(self.make_stats(100, 100, [38, 42], [48, 52])).outcome == Decision.A_BETTER
+        assert sequence.check(self.make_stats(50, 50, [30, 50], [30, 50])) is None
+        assert sequence.check(self.make_stats(5000, 5000, [39, 41], [39, 41])).outcome == Decision.EQUIVALENT
+        # Wider than a plain confidence interval, the price of checking after every game
+        stats = self.make_stats(100, 100, [30, 50], [30, 50])
+        assert high - low > 0 and -sequence.interval(stats)[0] > 1.96 * math.sqrt(2 * 100 / 100)
+        assert math.isclose(sequence.radius(100, 1.0, 0.05), math.sqrt(200 * math.log(200 / (100 * 0.05 ** 2))) / 100)
+
+    def test_early_stop(self):
+        """
+        Test that the tournament stops once the test is settled, with the same result for any number of workers.
+        :return: None
+        """
+        results = []
+        for workers in [1, 2]:
+            test = SequentialTest([WinRateSPRT(delta=0.2)], min_games=20)
+            stats = run_tournament(self.config, 1000, workers=workers, chunk_size=10, sequential_test=test)
+            assert stats.games < 1000
+            assert test.decisions[0].outcome == Decision.A_BETTER
+            results.append(stats.to_dict())
+        assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    unittest.main()
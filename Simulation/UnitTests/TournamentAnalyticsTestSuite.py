@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+from Simulation.TournamentAnalytics import *
+from Simulation.SelfPlay import play_game
+
+
+class TestTournamentAnalytics(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the TournamentAnalytics aggregates against a
+    straightforward count, their merging and the heatmap rendering.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Record a few games on a small board.
+        :return: None
+        """
+        self.records = [play_game("density", "random", seed, (6, 6), {3: 1, 2: 2, 1: 2}, record=True).record
+                        for seed in range(12)]
+
+    def test_counts(self):
+        """
+        Test the vectorized counts against counting every move one by one.
+        :return: None
+        """
+        analytics = TournamentAnalytics((6, 6)).add_records(self.records, chunk_size=5)
+        hits = np.zeros((2, 6, 6), dtype=int)
+        misses = np.zeros((2, 6, 6), dtype=int)
+        first_shots = np.zeros((2, 6, 6), dtype=int)
+        wins = [[], []]
+        for record in self.records:
+            shooters = record.shooters()
+            for player in range(2):
+                if player in shooters:
+                    x, y, _ = record.moves[shooters.index(player)]
+                    first_shots[player, x, y] += 1
+            for (x, y, response), shooter in zip(record.moves, shooters):
+                (hits if response > 0 else misses)[shooter, x, y] += 1
+            wins[record.winner()].append(shooters.count(record.winner()))
+        assert analytics.games == 12
+        assert (analytics.hits == hits).all() and (analytics.misses == misses).all()
+        assert (analytics.first_shots == first_shots).all()
+        assert analytics.ship_cells.sum() == 12 * 2 * 9  # 9 ship blocks per fleet
+        assert analytics.shots_to_win.sum() == 12
+        assert abs(analytics.mean_shots_to_win(0) - np.mean(wins[0])) < 1e-9
+        assert abs(analytics.over_targeting(0).sum()) < 1e-9
+
+    def test_invalid_moves(self):
+        """
+        Test that invalid moves, also off the board, pass the turn but aren't counted as shots.
+        :return: None
+        """
+        valid = TournamentAnalytics((6, 6)).add_records(self.records)
+        for record in self.records:
+            moves = []
+            for index, move in enumerate(record.moves):
+                if index % 5 == 0:  # An even number of them, so the turn comes back before the move
+                    moves += [(6, 0, -1)] * 40 + [move[:2] + (-1,)] * 40
+                moves.append(move)
+            record.moves = moves
+        analytics = TournamentAnalytics((6, 6)).add_records(self.records, chunk_size=5)
+        assert analytics.to_dict() == valid.to_dict()
+
+    def test_merge(self):
+        """
+        Test that merging partial aggregates gives the same totals, also after a round trip through a dict.
+        :return: None
+        """
+        whole = TournamentAnalytics((6, 6)).add_records(self.records)
+        first = TournamentAnalytics((6, 6)).add_records(self.records[:5])
+        second = TournamentAnalytics.from_dict(TournamentAnalytics((6, 6)).add_records(self.records[5:]).to_dict())
+        assert second.merge(first).to_dict() == whole.to_dict()
+        self.assertRaises(ValueError, whole.merge, TournamentAnalytics((5, 5)))
+        self.assertRaises(ValueError, TournamentAnalytics((5, 5)).add_records, self.records)
+
+    def test_render_heatmap(self):
+        """
+        Test the heatmap colors, using a stand-in for the grid.
+        :return: None
+        """
+        colors = {}
+
+        class FakeGrid:
+            def set_tile_color(self, x, y, color):
+                colors[(x, y)] = color
+
+        render_heatmap(FakeGrid(), np.array([[0, 2], [4, 1]]))
+        assert colors == {(0, 0): "#ffffff", (0, 1): "#ff8080", (1, 0): "#ff0000", (1, 1): "#ffbfbf"}
+
+
+if __name__ == '__main__':
+    unittest.main()
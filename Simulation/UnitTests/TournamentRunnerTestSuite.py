@@ -0,0 +1,78 @@
+import unittest
+from Simulation.TournamentRunner import *
+from Model.Profiling import Profiler, active_profiler
+
+
+class TestTournamentRunner(unittest.TestCase):
+    """
+    UnitTest class to check functionality of the headless self-play games and the tournament
+    runner, including the merging of partial results.
+    @author sahil1105
+    """
+    def setUp(self):
+        """
+        Setup the test suite. Use a small board and fleet so that games are quick.
+        :return: None
+        """
+        self.config = TournamentConfig("density", "random", (6, 6), {3: 1, 2: 2, 1: 2})
+
+    def test_play_game(self):
+        """
+        Test that a game is played to the end and is reproducible from its seed.
+        :return: None
+        """
+        result = play_game("density", "random", 3, (6, 6), {3: 1, 2: 2, 1: 2})
+        assert result.first == 1  # Odd seed, so player 1 moved first
+        assert result.winner in [0, 1]
+        assert result.shots[result.winner] >= 8  # At least one shot per ship block
+        again = play_game("density", "random", 3, (6, 6), {3: 1, 2: 2, 1: 2})
+        assert (again.winner, again.shots) == (result.winner, result.shots)
+
+    def test_stats(self):
+        """
+        Test the aggregation and merging of results.
+        :return: None
+        """
+        stats = TournamentStats()
+        stats.add_result(GameResult(0, 0, 0, [20, 15]))
+        stats.add_result(GameResult(1, 1, 0, [30, 25]))
+        other = TournamentStats()
+        other.add_result(GameResult(2, 0, 1, [10, 40]))
+        stats.merge(other)
+        assert stats.games == 3
+        assert stats.wins == [2, 1]
+        assert stats.first_mover_wins == 1
+        assert stats.mean_shots_to_win(0) == 25
+        assert stats.shots_to_win_variance(0) == 50
+        low, high = stats.win_rate_interval(0)
+        assert low < 2 / 3 < high
+        assert TournamentStats.from_dict(stats.to_dict()).to_dict() == stats.to_dict()
+
+    def test_run_tournament(self):
+        """
+        Test that the results don't depend on the number of workers or the chunk size.
+        :return: None
+        """
+        single = run_tournament(self.config, 12, workers=1, chunk_size=5)
+        pooled = run_tournament(self.config, 12, workers=2, chunk_size=4)
+        assert single.games == 12
+        assert single.to_dict() == pooled.to_dict()
+        assert seed_ranges(10, 7, 3) == [(10, 3), (13, 3), (16, 1)]
+
+    def test_profile(self):
+        """
+        Test that a profiled tournament counts the same calls whether its games are played in
+        this process or in worker processes, whose snapshots are merged.
+        :return: None
+        """
+        single, pooled = Profiler(), Profiler()
+        run_tournament(self.config, 12, workers=1, chunk_size=5, profiler=single)
+        run_tournament(self.config, 12, workers=2, chunk_size=4, profiler=pooled)
+        assert not single.enabled() and active_profiler() is None
+        calls = {name: stats["calls"] for name, stats in single.snapshot().items()}
+        assert calls["BattleshipBoard.respond_to_move"] > 12
+        assert calls == {name: stats["calls"] for name, stats in pooled.snapshot().items()}
+
+
+if __name__ == '__main__':
+    unittest.main()
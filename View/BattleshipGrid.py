@@ -1,4 +1,5 @@
 import tkinter
+from Model.BattleshipBoard import BattleshipBoard
 
 
 class BattleshipGrid(tkinter.Canvas):
@@ -10,6 +11,18 @@ class BattleshipGrid(tkinter.Canvas):
     BLOCK_MAIN_TAG = 'tile'
     # DIMENSIONS
     SQUARE_SIZE = 30
+    # Color constants
+    COLOR_SHIP = "blue"
+    COLOR_EMPTY = "white"
+    COLOR_SHIP_HIT = "red"
+    COLOR_EMPTY_HIT = "#e5cd77"
+    COLOR_REDUNDANT = "#eae0cc"
+    # Color mapping for block state to color
+    COLOR_MAP = {BattleshipBoard.SHIP: COLOR_SHIP,
+                 BattleshipBoard.EMPTY: COLOR_EMPTY,
+                 BattleshipBoard.SHIP_HIT: COLOR_SHIP_HIT,
+                 BattleshipBoard.EMPTY_HIT: COLOR_EMPTY_HIT,
+                 BattleshipBoard.REDUNDANT: COLOR_REDUNDANT}
 
     def __init__(self, master, init_dims: tuple=(10, 10)):
         """
@@ -23,6 +36,7 @@ class BattleshipGrid(tkinter.Canvas):
         self.width = (init_dims[1] + 2) * self.SQUARE_SIZE
         self.config(height=self.height, width=self.width)
         self.grid_tiles = [[] for _ in range(self.dims[0])]
+        self.tile_colors = {}  # Color last set on each tile
         self.draw_grid()
 
     def gen_tile_tag(self, x: int, y: int) -> str:
@@ -82,6 +96,7 @@ class BattleshipGrid(tkinter.Canvas):
             tile_tag = self.gen_tile_tag(x, y)
             tile_id = self.find_withtag(tile_tag)  # Find a reference to the tile
             self.itemconfigure(tile_id, fill=color)  # Change the color
+            self.tile_colors[(x, y)] = color
             return True
 
         return False
@@ -101,3 +116,18 @@ class BattleshipGrid(tkinter.Canvas):
             return True
 
         return False
+
+    def render_board(self, board, color_map: dict=None):
+        """
+        Utility function to show a whole board state at once, e.g. a state jumped to in a replay.
+        Only the tiles whose color changed since the last render are updated.
+        :param board: 2D array of block states with the dimensions of the grid.
+        :param color_map: Dictionary of block state to color. Defaults to COLOR_MAP.
+        :return: None
+        """
+        color_map = color_map if color_map is not None else BattleshipGrid.COLOR_MAP
+        for x in range(self.dims[0]):
+            for y in range(self.dims[1]):
+                color = color_map[board[x][y]]
+                if self.tile_colors.get((x, y)) != color:
+                    self.set_tile_color(x, y, color)
@@ -0,0 +1,76 @@
+import argparse
+import tkinter
+from Simulation.ReplayFormat import ReplayArchive, ReplaySeeker, knowledge_board
+from View.BattleshipGrid import BattleshipGrid
+
+
+class ReplayViewer(tkinter.Frame):
+    """
+    Class to step through a recorded game. Shows both players' boards at the move chosen on
+    the slider, jumping straight there through the keyframes of the record.
+    @author sahil1105
+    """
+    def __init__(self, master, seeker: ReplaySeeker, show_ships: bool=True):
+        """
+        Constructor for the ReplayViewer.
+        :param master: Frame to attach to.
+        :param seeker: ReplaySeeker of the record to show.
+        :param show_ships: Whether to show the ships that haven't been hit, or only what each
+                           player's opponent knew.
+        """
+        tkinter.Frame.__init__(self, master)
+        self.seeker = seeker
+        self.show_ships = show_ships
+        self.grids = []
+        for player, strategy in enumerate(seeker.record.strategies):
+            frame = tkinter.Frame(self)
+            tkinter.Label(frame, text="Player {} ({})".format(player, strategy)).pack()
+            grid = BattleshipGrid(frame, seeker.record.game_dims)
+            grid.pack()
+            frame.pack(side=tkinter.LEFT, padx=10)
+            self.grids.append(grid)
+        self.status = tkinter.Label(self, width=30)
+        self.status.pack(side=tkinter.BOTTOM)
+        self.slider = tkinter.Scale(self, from_=0, to=len(seeker), orient=tkinter.HORIZONTAL, length=300,
+                                    label="Move", command=lambda value: self.show_move(int(float(value))))
+        self.slider.pack(side=tkinter.BOTTOM)
+        self.show_move(0)
+
+    def show_move(self, move_index: int):
+        """
+        Function to render both boards after the given number of moves.
+        :param move_index: Number of moves played.
+        :return: None
+        """
+        boards = self.seeker.state_at(move_index)
+        for grid, board in zip(self.grids, boards):
+            shown = board if self.show_ships else knowledge_board(board)
+            grid.render_board(shown.board)
+        if move_index == 0:
+            self.status.config(text="Seed {}, player {} moves first".format(self.seeker.record.seed,
+                                                                            self.seeker.record.first))
+        else:
+            x, y, response = self.seeker.record.moves[move_index - 1]
+            self.status.config(text="Player {} struck ({}, {}): {}".format(self.seeker.shooters[move_index - 1],
+                                                                            x, y, response))
+
+
+def __main__():
+    """
+    Command line entry point. Opens a record of an archive in the viewer.
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Step through a recorded game.")
+    parser.add_argument("archive", help="Replay archive (.replay or .replay.gz).")
+    parser.add_argument("--index", type=int, default=0, help="Position of the record in the archive.")
+    parser.add_argument("--hide-ships", action="store_true", help="Only show what each opponent knew.")
+    args = parser.parse_args()
+    with ReplayArchive(args.archive) as archive:
+        app = tkinter.Tk()
+        app.title("Replay {} of {}".format(args.index, args.archive))
+        ReplayViewer(app, archive.seeker(args.index), not args.hide_ships).pack()
+        app.mainloop()
+
+
+if __name__ == '__main__':
+    __main__()
@@ -1,5 +1,8 @@
+import argparse
+import sys
 from Model.Ship import Ship
 from Model.Player import Player
+from Model.Profiling import enable_from_env
 
 
 def __main__():
@@ -8,139 +11,148 @@ def __main__():
     The basic structure of the game loop.
     :return: None
     """
+    enable_from_env()
+    run_game()
+
+
+def run_game(read=input, write=print) -> bool:
+    """
+    The game loop. Every answer is read with read and every message written with write, so the
+    same loop runs interactively (input and print) or from a script without any output.
+    :param read: Function taking a prompt and returning the answer, like input.
+    :param write: Function to show messages, like print.
+    :return: True if you won, False if you lost.
+    """
     # ask for dims
-    game_dims = get_dims()
+    game_dims = get_dims(read)
     player_name = get_player_name()
     # Create the player object
     player = Player(player_name, game_dims)
-    ships = get_ships()  # Get description of the fleet
+    ships = get_ships(read)  # Get description of the fleet
 
     for ship in ships:
         player.add_my_ship(ship)
 
     # transmit boat types to opponent
-    send_ship_types(ships)
+    send_ship_types(ships, write)
     # get enemy's boat types
-    opp_ship_types = get_ship_types()
-    print("Here are opp's ship_types:", opp_ship_types)
+    opp_ship_types = get_ship_types(read, write)
+    write("Here are opp's ship_types:", opp_ship_types)
+    for ship_len, freq in opp_ship_types.items():
+        for _ in range(freq):
+            player.add_opp_ship(ship_len)
 
     game_on = True
+    won = False
 
     while game_on:
         change_turn = False
         while not change_turn:
-            change_turn, game_on = your_move(player)  # Play a move
+            change_turn, game_on = your_move(player, read, write)  # Play a move
+        won = not game_on
 
         change_turn = False
         while game_on and not change_turn:
-            change_turn, game_on = opp_move(player)  # Respond to enemy's move
+            change_turn, game_on = opp_move(player, read, write)  # Respond to enemy's move
 
+    return won
 
-def your_move(player: Player) -> (bool, bool):
+
+def your_move(player: Player, read=input, write=print) -> (bool, bool):
     """
     Utility function to simulate your move on the opponent's board.
     :param player: Player object.
+    :param read: Function taking a prompt and returning the answer, like input.
+    :param write: Function to show messages, like print.
     :return: (Bool, Bool) : change_turn and game_on booleans indicating whether to
                             reverse the turn and whether the game is not over.
     """
     change_turn = False
     game_on = True
-    print("Opponent's Board\n", player.opp_board)
+    write("Opponent's Board\n", player.opp_board)
     # get a move from player and execute it
-    move = get_move()
+    move = get_move(read)
     # update opp board based on their response
-    response = get_response(move)
-    if response == 1:
-        # hit a ship, but not destroyed
-        player.opp_board.mark_ship_hit(move)
-        player.opp_board.update_redundant_squares(move, False)
-    elif response == 2:
-        # hit a ship and destroyed, but not won yet
-        player.opp_board.mark_ship_hit(move)
-        player.opp_board.update_redundant_squares(move, True)
+    response = get_response(move, read, write)
+    if not player.record_response(move, response):
+        # invalid move
+        write("Invalid Move")
     elif response == 3:
         # hit a ship and destroyed and won
-        player.opp_board.mark_ship_hit(move)
-        player.opp_board.update_redundant_squares(move, True)
         game_on = False
         change_turn = True
-        print("You Won")
+        write("You Won")
     elif response == 0:
         # missed
-        player.opp_board.mark_ship_miss(move)
         change_turn = True
-    else:
-        # invalid move
-        print("Invalid Move")
 
     return change_turn, game_on
 
 
-def opp_move(player: Player) -> (bool, bool):
+def opp_move(player: Player, read=input, write=print) -> (bool, bool):
     """
     Utility function to simulate opponent's moves on your board.
     :param player: Player object
+    :param read: Function taking a prompt and returning the answer, like input.
+    :param write: Function to show messages, like print.
     :return: (Bool, Bool) : change_turn and game_on booleans indicating whether to
                             reverse the turn and whether the game is not over.
     """
     change_turn = False
     game_on = True
-    print("Your Board\n", player.my_board)
-    opp_move = get_move()  # Get opponent's move
-    hit_resp = player.my_board.hit(opp_move)  # Execute the move
-    if hit_resp == 1:
-        if player.my_board.ship_destroyed(opp_move):
-            player.my_board.update_redundant_squares(opp_move, True)
-            if player.my_board.all_ships_destroyed():
-                hit_resp = 3
-                game_on = False
-                print("You Lost")
-            else:
-                hit_resp = 2
-        else:
-            player.my_board.update_redundant_squares(opp_move)
-    else:
+    write("Your Board\n", player.my_board)
+    opp_move = get_move(read)  # Get opponent's move
+    hit_resp = player.respond_to_opp_move(opp_move)  # Execute the move
+    if hit_resp == 3:
+        game_on = False
+        write("You Lost")
+    elif hit_resp not in [1, 2]:
         change_turn = True
 
     # send a response
-    send_response(hit_resp)
+    send_response(hit_resp, write)
 
     return change_turn, game_on
 
 
-def get_move() -> tuple:
+def get_move(read=input) -> tuple:
     """
     Utility function to get the player's move.
+    :param read: Function taking a prompt and returning the answer, like input.
     :return: tuple of the move
     """
-    return get_tuple('What move to make?')
+    return get_tuple('What move to make?', read)
 
 
-def get_response(move) -> int:
+def get_response(move, read=input, write=print) -> int:
     """
     Utility function to enter the response to a move.
     :param move: The move to which to respond.
+    :param read: Function taking a prompt and returning the answer, like input.
+    :param write: Function to show messages, like print.
     :return: 1: hit, 2: hit and ship destroyed, 3: game over, you win, -1: miss
     """
-    print("Move made:", move)
-    return int(input('What response to return?'))
+    write("Move made:", move)
+    return int(read('What response to return?'))
 
 
-def get_dims() -> tuple:
+def get_dims(read=input) -> tuple:
     """
     Utility function to get the dimensions of the board to use.
+    :param read: Function taking a prompt and returning the answer, like input.
     :return: tuple of the dimensions to use.
     """
-    return get_tuple('What dimensions to use?')
+    return get_tuple('What dimensions to use?', read)
 
 
-def get_tuple(prompt) -> tuple:
+def get_tuple(prompt, read=input) -> tuple:
     """
     Utility function to get user input in the form of a tuple.
     :param prompt: The prompt to display while asking for user input.
+    :param read: Function taking a prompt and returning the answer, like input.
     :return: tuple entered by the user in response to the prompt.
     """
-    resp = input(prompt)
+    resp = read(prompt)
     resp = resp.split(",")
     resp = list(map(str.strip, resp))
     resp = list(map(int, resp))
@@ -155,27 +167,29 @@ def get_player_name() -> str:
     return 'Sahil'
 
 
-def get_ships() -> list:
+def get_ships(read=input) -> list:
     """
     Utility function to get description of ships to place on the grid.
+    :param read: Function taking a prompt and returning the answer, like input.
     :return: list of ship objects.
     """
     done = False
     ships = []
     while not done:
-        ship_loc = get_tuple('Input ship location')
-        ship_len = int(input('Length?'))
-        ship_dir = get_tuple('Input direction')
+        ship_loc = get_tuple('Input ship location', read)
+        ship_len = int(read('Length?'))
+        ship_dir = get_tuple('Input direction', read)
         ships.append(Ship(ship_loc, ship_len, ship_dir))
-        done = True if int(input('Done?')) == 1 else False
+        done = True if int(read('Done?')) == 1 else False
 
     return ships
 
 
-def send_ship_types(ships: list):
+def send_ship_types(ships: list, write=print):
     """
     Utility function to transmit your ship types to the opponent.
     :param ships: List of ship objects
+    :param write: Function to show messages, like print.
     :return: None
     """
     ship_lens = {}
@@ -183,34 +197,122 @@ def send_ship_types(ships: list):
         if ship.length not in ship_lens:
             ship_lens[ship.length] = 0
         ship_lens[ship.length] += 1
-    print("Here are the ship types.", ship_lens)
+    write("Here are the ship types.", ship_lens)
 
 
-def get_ship_types() -> dict:
+def get_ship_types(read=input, write=print) -> dict:
     """
     Utility function to get the types of ships in opponent's fleet.
+    :param read: Function taking a prompt and returning the answer, like input.
+    :param write: Function to show messages, like print.
     :return: Dictionary of mappings from ship length to number of ships of that length
     """
-    print("Enter ship_len, ship_freqs")
+    write("Enter ship_len, ship_freqs")
     ship_types = {}
     done = False
     while not done:
-        resp = get_tuple("Enter ship_len, ship_freq")
+        resp = get_tuple("Enter ship_len, ship_freq", read)
         ship_types[resp[0]] = resp[1]
-        done = True if int(input("Done?")) == 1 else False
+        done = True if int(read("Done?")) == 1 else False
 
     return ship_types
 
 
-def send_response(response: int):
+def send_response(response: int, write=print):
     """
     Utility function to send a response to the user.
     :param response: int, 1 if hit, 2 if ship destroyed, 3 if win, -1 if miss
+    :param write: Function to show messages, like print.
+    :return: None
+    """
+    write("Received response", response)
+
+
+def to_batch_line(script: str) -> str:
+    """
+    Utility function to turn the answers of one game, one per line as typed interactively
+    (e.g. game_loop_test_input.txt), into a batch line.
+    :param script: The answers, one per line.
+    :return: The batch line: the answers separated by spaces.
+    """
+    return " ".join(answer.strip() for answer in script.split("\n") if answer.strip())
+
+
+def play_batch_line(line: str) -> bool:
+    """
+    Function to play a game from a batch line without prompts or any output.
+    :param line: The answers the interactive game loop would read, in order, separated by whitespace.
+    :return: True if you won, False if you lost.
+    :raises ValueError: If the answers run out before the game ends or are left over after it.
+    """
+    answers = iter(line.split())
+
+    def read(prompt: str=""):
+        answer = next(answers, None)
+        if answer is None:
+            raise ValueError("Ran out of answers before the end of the game")
+        return answer
+
+    won = run_game(read, lambda *args: None)
+    left_over = sum(1 for _ in answers)
+    if left_over > 0:
+        raise ValueError("{} answers left after the end of the game".format(left_over))
+    return won
+
+
+def run_batch(lines, out) -> tuple:
+    """
+    Function to play every game of a batch, writing one result line per game:
+    '<game number> won', '<game number> lost' or '<game number> error <reason>'.
+    Blank lines and lines starting with # are skipped.
+    :param lines: Iterable of batch lines, e.g. an open file.
+    :param out: File-like object to write the results to.
+    :return: (number of games, number won, number of errors)
+    """
+    games = won = errors = 0
+    for line in lines:
+        line = line.strip()
+        if len(line) == 0 or line.startswith("#"):
+            continue
+        games += 1
+        try:
+            if play_batch_line(line):
+                won += 1
+                out.write("{} won\n".format(games))
+            else:
+                out.write("{} lost\n".format(games))
+        except (ValueError, IndexError) as error:
+            errors += 1
+            out.write("{} error {}\n".format(games, error))
+    return games, won, errors
+
+
+def batch_main(argv: list):
+    """
+    Command line entry point of the batch mode.
+    :param argv: Command line arguments.
     :return: None
     """
-    print("Received response", response)
+    parser = argparse.ArgumentParser(description="Play scripted games without prompts or board printing.")
+    parser.add_argument("--batch", required=True, help="File with one game per line, - for stdin.")
+    parser.add_argument("--output", default="-", help="File for the result lines, - for stdout.")
+    args = parser.parse_args(argv)
+    enable_from_env()
+    lines = sys.stdin if args.batch == "-" else open(args.batch)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        games, won, errors = run_batch(lines, out)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        if out is not sys.stdout:
+            out.close()
+    print("{} games, {} won, {} lost, {} errors".format(games, won, games - won - errors, errors), file=sys.stderr)
 
 
 if __name__ == '__main__':
-    __main__()
+    if len(sys.argv) > 1:
+        batch_main(sys.argv[1:])
+    else:
+        __main__()
 